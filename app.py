@@ -2,20 +2,42 @@
 Aplicación principal Flask para el procesamiento de planillas SIU
 """
 import os
+import re
+import csv
+import io
+import json
 import logging
-import tempfile
-import uuid
+import multiprocessing
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from logging.handlers import RotatingFileHandler
-from flask import Flask, request, jsonify, render_template, send_file, session, url_for
+from flask import (
+    Flask, Response, request, jsonify, render_template, send_file, session, stream_with_context, url_for
+)
 from werkzeug.exceptions import RequestEntityTooLarge
 from datetime import datetime
-from io import BytesIO
+from pathlib import Path
 
-from config.settings import MAX_FILE_SIZE, ALLOWED_EXTENSIONS
-from utils.file_processor import FileProcessor
+from config.settings import (
+    MAX_FILE_SIZE, ASYNC_JOBS_ENABLED, METRICS_TRACK_MEMORY,
+    BATCH_MAX_FILES, BATCH_MAX_SIZE, BATCH_WORKERS
+)
+from utils.processor_base import SpreadsheetRules
+from utils.preflight import MissingRange, PartialFile
+from utils.result_cache import ResultCache
+from utils.artifact_store import ArtifactStore
+from utils.snapshot_store import SnapshotStore
+from utils.processing_backend import create_backend, create_processor, source_bytes, source_size
+from utils.upload_stream import UploadRequest, UploadSpool
+from utils.job_queue import JobQueue, QueueFullError, STATUS_QUEUED, STATUS_DONE, STATUS_FAILED
+from utils.metrics import MetricsRegistry, MEMORY_BUCKETS
+from utils.zip_stream import ZipStream, stream_zip
 
-# Diccionario global para almacenar archivos temporales
-temp_files = {}
+# Campos del formulario con los datos de la comisión
+REQUIRED_FORM_FIELDS = ['campo1', 'campo2', 'campo3', 'campo4', 'campo5', 'campo6']
+# Caracteres que no pueden formar parte de un nombre de archivo
+UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|]')
 
 def setup_logging(app):
     """Configurar logging de la aplicación"""
@@ -26,6 +48,8 @@ def setup_logging(app):
 def create_app():
     """Factory function para crear la aplicación Flask"""
     app = Flask(__name__)
+    # Los archivos subidos se reciben por bloques, con hash y límite de tamaño
+    app.request_class = UploadRequest
     
     # Configuración básica
     app.config['SECRET_KEY'] = 'simple-secret-key-for-public-app'
@@ -37,7 +61,224 @@ def create_app():
     return app
 
 app = create_app()
-file_processor = FileProcessor()
+# Solo valida extensión y tamaño; el motor de procesamiento se carga en el primer archivo
+spreadsheet_rules = SpreadsheetRules()
+# Con PROCESSING_BACKEND=process los trabajadores arrancan, con el motor importado, antes de la
+# primera subida; no en los procesos trabajadores, que con 'spawn' pueden volver a importar este módulo
+processing_backend = create_backend(warm_up=multiprocessing.parent_process() is None)
+result_cache = ResultCache()
+artifact_store = ArtifactStore()
+artifact_store.start_sweeper()
+snapshot_store = SnapshotStore()
+_delta_exporter = None
+job_queue = JobQueue()
+
+# Métricas de rendimiento expuestas en /metrics
+metrics = MetricsRegistry()
+stage_duration = metrics.histogram(
+    'adecuador_stage_duration_seconds', 'Duración de cada etapa del procesamiento', ['stage']
+)
+upload_duration = metrics.histogram(
+    'adecuador_upload_duration_seconds', 'Duración total del procesamiento de una subida', ['outcome']
+)
+preflight_duration = metrics.histogram(
+    'adecuador_preflight_duration_seconds', 'Duración de la revisión del encabezado (/preflight)', ['outcome']
+)
+rows_total = metrics.counter('adecuador_rows_total', 'Filas leídas y exportadas', ['kind'])
+bytes_total = metrics.counter('adecuador_bytes_total', 'Bytes recibidos y generados', ['direction'])
+peak_memory = metrics.histogram(
+    'adecuador_peak_memory_bytes', 'Pico aproximado de memoria asignada por procesamiento', buckets=MEMORY_BUCKETS
+)
+cache_state = metrics.gauge('adecuador_result_cache', 'Contadores de la caché de resultados', ['stat'])
+job_queue_depth = metrics.gauge('adecuador_job_queue_depth', 'Trabajos asíncronos en espera')
+
+if METRICS_TRACK_MEMORY:
+    tracemalloc.start()
+
+def record_pipeline_stats(stats: dict):
+    """Registrar en las métricas las mediciones de un procesamiento"""
+    if not stats:
+        return
+    for stage, seconds in stats['stages'].items():
+        stage_duration.observe(seconds, stage=stage)
+    rows_total.inc(stats['rows_in'], kind='read')
+    rows_total.inc(stats['rows_skipped'], kind='skipped')
+    rows_total.inc(stats['rows_out'], kind='exported')
+    bytes_total.inc(stats['bytes_out'], direction='out')
+    if stats.get('peak_memory_bytes') is not None:
+        peak_memory.observe(stats['peak_memory_bytes'])
+
+def run_processing(file_source, filename: str, form_data) -> tuple:
+    """Procesar un archivo, o tomar el resultado de la caché, y registrar sus métricas.
+    
+    ``file_source`` son los bytes del archivo o el ``UploadSpool`` en el que
+    se recibió, que se procesa sin copiarlo. Retorna el resultado de
+    ``process_excel_file`` y el desenlace ('success', 'error' o 'cache_hit').
+    """
+    bytes_total.inc(source_size(file_source), direction='in')
+    
+    # Reutilizar el resultado si el mismo archivo ya se procesó con los mismos datos
+    # (el hash de un archivo subido se calculó mientras se recibía)
+    content = file_source.digest if isinstance(file_source, UploadSpool) else file_source
+    cache_key = result_cache.make_key(content, filename, form_data)
+    result = result_cache.get(cache_key)
+    
+    if result is None:
+        # Procesar el archivo con los datos del formulario
+        result = processing_backend.process(file_source, filename, form_data)
+        record_pipeline_stats(result.get('stats'))
+        result_cache.put(cache_key, result)
+        outcome = 'success' if result['success'] else 'error'
+    else:
+        app.logger.info(f"Resultado obtenido de caché: {filename}")
+        outcome = 'cache_hit'
+    
+    return result, outcome
+
+def output_filenames(form_data, sheet: str = None, delta: bool = False) -> tuple:
+    """Nombres de los CSV de alumnos, de notas y del reporte de errores de una comisión"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    comision = form_data.get('campo2', '')
+    actividad = form_data.get('campo3', '')
+    # En un libro con varias hojas los archivos de cada hoja llevan su nombre
+    suffix = '_' + UNSAFE_FILENAME_CHARS.sub('_', sheet.strip()) if sheet else ''
+    # Los CSV del modo de cambios se distinguen de una exportación completa
+    if delta:
+        suffix += '_cambios'
+    
+    alumnos_filename = f"Subir_Alumnos_{comision}_{actividad}{suffix}_{timestamp}.csv"
+    notas_filename = f"Subir_Notas_{comision}_{actividad}{suffix}_{timestamp}.csv"
+    errores_filename = f"Errores_{comision}_{actividad}{suffix}_{timestamp}.csv"
+    return alumnos_filename, notas_filename, errores_filename
+
+def delta_exporter():
+    """Procesador con el que se arman los CSV del modo de cambios.
+    
+    La comparación con la instantánea ya requiere pandas, de modo que los CSV
+    se arman por columnas con el motor de pandas aunque se use el liviano.
+    """
+    global _delta_exporter
+    if _delta_exporter is None:
+        _delta_exporter = create_processor('pandas')
+    return _delta_exporter
+
+def store_outputs(csv_files: dict, artifacts: dict) -> str:
+    """Guardar los CSV generados y el reporte de errores en el almacén temporal"""
+    # Los CSV ya vienen codificados en UTF-8
+    write_start = time.perf_counter()
+    file_id = artifact_store.store({**csv_files, **artifacts})
+    stage_duration.observe(time.perf_counter() - write_start, stage='artifact_write')
+    return file_id
+
+def process_upload(file_source, filename: str, form_data) -> dict:
+    """Procesar un archivo subido y guardar los CSV generados.
+    
+    Retorna el resultado del procesamiento; si fue exitoso incluye el
+    ``file_id`` con el que se descargan los archivos del almacén temporal.
+    Con ``delta=1`` en el formulario los CSV solo tienen los alumnos nuevos y
+    las notas que cambiaron desde la última exportación de la comisión.
+    """
+    start = time.perf_counter()
+    result, outcome = run_processing(file_source, filename, form_data)
+    delta_mode = form_data.get('delta') == '1'
+    
+    # Generar nombres de archivos con timestamp
+    alumnos_filename, notas_filename, errores_filename = output_filenames(form_data, delta=delta_mode)
+    
+    # El reporte completo de errores se guarda también si no hubo registros válidos
+    artifacts = {}
+    error_report = result.get('error_report')
+    if error_report:
+        artifacts['errores'] = (errores_filename, error_report.iter_csv())
+    
+    if not result['success']:
+        response = {
+            'success': False,
+            'error': result['error'],
+            'detailed_errors': result.get('detailed_errors', [])
+        }
+        if artifacts:
+            response['file_id'] = artifact_store.store(artifacts)
+            response['has_error_report'] = True
+        upload_duration.observe(time.perf_counter() - start, outcome=outcome)
+        return response
+    
+    csv_files = {
+        'alumnos': (alumnos_filename, result['alumnos_csv']),
+        'notas': (notas_filename, result['notas_csv']),
+    }
+    total_records = result['total_records']
+    delta = None
+    if delta_mode:
+        # Comparar con la instantánea de la comisión y dejar solo los cambios; la
+        # instantánea se confirma recién cuando los CSV quedaron guardados
+        import numpy as np
+        
+        diff_start = time.perf_counter()
+        dnis, notas = (np.asarray(column, dtype=object) for column in result['export_columns'])
+        with snapshot_store.update(SnapshotStore.key(form_data), dnis, notas) as diff:
+            # Al CSV de alumnos van solo los nuevos: los demás ya están inscriptos en SIGEAD
+            alumnos_csv, notas_csv = delta_exporter().build_csv_outputs(
+                dnis[diff.mask], notas[diff.mask], form_data, enroll=diff.is_new[diff.mask]
+            )
+            stage_duration.observe(time.perf_counter() - diff_start, stage='snapshot_diff')
+            csv_files = {'alumnos': (alumnos_filename, alumnos_csv), 'notas': (notas_filename, notas_csv)}
+            file_id = store_outputs(csv_files, artifacts)
+        total_records = diff.new + diff.changed
+        delta = diff.as_dict()
+    else:
+        # La exportación completa también queda en la instantánea, para que la
+        # próxima exportación de cambios parta de ella
+        with snapshot_store.update(SnapshotStore.key(form_data), *result['export_columns'], compare=False):
+            file_id = store_outputs(csv_files, artifacts)
+    upload_duration.observe(time.perf_counter() - start, outcome=outcome)
+    
+    app.logger.info(f"Archivos procesados: {alumnos_filename}, {notas_filename}")
+    app.logger.info(f"File ID: {file_id}")
+    
+    response = {
+        'success': True,
+        'file_id': file_id,
+        'filename': filename,
+        'total_records': total_records,
+        'has_error_report': bool(artifacts)
+    }
+    if delta is not None:
+        response['delta'] = delta
+    return response
+
+def error_body(outcome: dict) -> dict:
+    """Cuerpo de respuesta para un procesamiento fallido"""
+    body = {
+        "error": outcome['error'],
+        "detailed_errors": outcome.get('detailed_errors', [])
+    }
+    if outcome.get('has_error_report'):
+        body["processed_file_errores"] = url_for('download_file', file_id=outcome['file_id'], file_type='errores')
+    return body
+
+def success_body(outcome: dict) -> dict:
+    """Cuerpo de respuesta con los enlaces de descarga de un procesamiento exitoso"""
+    file_id = outcome['file_id']
+    body = {
+        "success": f"Archivos procesados correctamente. Se procesaron {outcome['total_records']} registros.",
+        "uploaded_filename": outcome['filename'],
+        "processed_file_alumnos": url_for('download_file', file_id=file_id, file_type='alumnos'),
+        "processed_file_notas": url_for('download_file', file_id=file_id, file_type='notas'),
+        "processed_file_zip": url_for('download_zip', file_id=file_id),
+        "records_count": outcome['total_records']
+    }
+    if outcome.get('delta'):
+        delta = outcome['delta']
+        body["success"] = (
+            f"Archivos procesados correctamente. Se exportaron {outcome['total_records']} cambios: "
+            f"{delta['new']} alumnos nuevos y {delta['changed']} notas modificadas "
+            f"({delta['unchanged']} sin cambios)."
+        )
+        body["delta"] = delta
+    if outcome.get('has_error_report'):
+        body["processed_file_errores"] = url_for('download_file', file_id=file_id, file_type='errores')
+    return body
 
 @app.route('/', methods=['GET', 'POST'])
 def upload_file():
@@ -53,92 +294,39 @@ def upload_file():
             if file.filename == '':
                 return jsonify({"error": "Archivo no válido"}), 400
 
-            # Validar tamaño del archivo
-            if not file_processor.validate_file_size(file.content_length, MAX_FILE_SIZE):
-                return jsonify({"error": f"El archivo es demasiado grande. Máximo {MAX_FILE_SIZE // (1024*1024)}MB"}), 400
+            # El tamaño se controla mientras se recibe el archivo (UploadRequest)
 
             # Verificar extensión del archivo 
-            if not file_processor.validate_file_extension(file.filename):
-                return jsonify({"error": f"Archivo con formato incorrecto. Formatos permitidos: {', '.join(ALLOWED_EXTENSIONS)}"}), 400
+            if not spreadsheet_rules.validate_file_extension(file.filename):
+                return jsonify({"error": spreadsheet_rules.extension_error(file.filename, "Archivo con formato incorrecto")}), 400
 
             # Validar datos del formulario
             form_data = request.form
-            required_fields = ['campo1', 'campo2', 'campo3', 'campo4', 'campo5', 'campo6']
-            missing_fields = [field for field in required_fields if not form_data.get(field)]
+            missing_fields = [field for field in REQUIRED_FORM_FIELDS if not form_data.get(field)]
             
             if missing_fields:
                 return jsonify({"error": f"Campos requeridos faltantes: {', '.join(missing_fields)}"}), 400
 
-            # Procesar el archivo con los datos del formulario
-            result = file_processor.process_excel_file(file.stream, file.filename, form_data)
-            
-            if not result['success']:
-                error_response = {
-                    "error": result['error'],
-                    "detailed_errors": result.get('detailed_errors', [])
-                }
-                return jsonify(error_response), 400
-
-            # Generar nombres de archivos con timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            comision = form_data.get('campo2', '')
-            actividad = form_data.get('campo3', '')
-            
-            alumnos_filename = f"Subir_Alumnos_{comision}_{actividad}_{timestamp}.csv"
-            notas_filename = f"Subir_Notas_{comision}_{actividad}_{timestamp}.csv"
-
-            # Generar IDs únicos para los archivos
-            file_id = str(uuid.uuid4())
-            
-            # Crear archivos temporales para descarga
-            temp_dir = tempfile.gettempdir()
-            alumnos_temp_path = os.path.join(temp_dir, f"{file_id}_alumnos.csv")
-            notas_temp_path = os.path.join(temp_dir, f"{file_id}_notas.csv")
-            
-            # Guardar archivos temporales
-            with open(alumnos_temp_path, 'w', encoding='utf-8') as f:
-                f.write(result['alumnos_csv'])
-            with open(notas_temp_path, 'w', encoding='utf-8') as f:
-                f.write(result['notas_csv'])
-            
-            # Almacenar información en diccionario global
-            temp_files[file_id] = {
-                'alumnos_path': alumnos_temp_path,
-                'notas_path': notas_temp_path,
-                'alumnos_filename': alumnos_filename,
-                'notas_filename': notas_filename,
-                'timestamp': datetime.now()
-            }
-            
-            # Limpiar archivos antiguos (más de 1 hora)
-            current_time = datetime.now()
-            expired_files = []
-            for fid, file_info in temp_files.items():
-                if (current_time - file_info['timestamp']).total_seconds() > 3600:  # 1 hora
-                    expired_files.append(fid)
-            
-            for fid in expired_files:
+            # Modo asíncrono: encolar el trabajo y responder de inmediato
+            if ASYNC_JOBS_ENABLED and form_data.get('async') == '1':
                 try:
-                    os.remove(temp_files[fid]['alumnos_path'])
-                    os.remove(temp_files[fid]['notas_path'])
-                    del temp_files[fid]
-                except:
-                    pass
+                    # El trabajo sigue después de la solicitud, que cierra sus archivos: se copia el contenido
+                    job_id = job_queue.submit(process_upload, source_bytes(file.stream), file.filename, form_data.to_dict())
+                except QueueFullError:
+                    return jsonify({"error": "El servidor está ocupado. Por favor, intente nuevamente en unos minutos."}), 503
+                
+                return jsonify({
+                    "job_id": job_id,
+                    "status": STATUS_QUEUED,
+                    "status_url": url_for('job_status', job_id=job_id)
+                }), 202
+            
+            outcome = process_upload(file.stream, file.filename, form_data)
+            if not outcome['success']:
+                return jsonify(error_body(outcome)), 400
             
-            # Verificar que los datos se guardaron correctamente
-            app.logger.info(f"Archivos procesados: {alumnos_filename}, {notas_filename}")
-            app.logger.info(f"File ID: {file_id}")
-            app.logger.info(f"Archivos temporales creados: {alumnos_temp_path}, {notas_temp_path}")
-            app.logger.info(f"Archivos en memoria: {len(temp_files)}")
-
             # Devolver respuesta JSON con los archivos procesados
-            return jsonify({
-                "success": f"Archivos procesados correctamente. Se procesaron {result['total_records']} registros.",
-                "uploaded_filename": file.filename,
-                "processed_file_alumnos": url_for('download_file', file_id=file_id, file_type='alumnos'),
-                "processed_file_notas": url_for('download_file', file_id=file_id, file_type='notas'),
-                "records_count": result['total_records']
-            })
+            return jsonify(success_body(outcome))
 
         except RequestEntityTooLarge:
             return jsonify({"error": f"El archivo es demasiado grande. Máximo {MAX_FILE_SIZE // (1024*1024)}MB"}), 413
@@ -147,7 +335,269 @@ def upload_file():
             return jsonify({"error": "Error interno del servidor. Por favor, intente nuevamente."}), 500
     
     # Si es GET, renderizar la plantilla principal
-    return render_template('index.html')
+    return render_template('index.html', async_jobs=ASYNC_JOBS_ENABLED)
+
+def batch_form_data(form, file_count: int) -> list:
+    """Armar los datos de formulario de cada archivo de un lote.
+    
+    Los campos ``campo1``..``campo6`` del formulario se comparten entre todos
+    los archivos; el campo opcional ``metadata`` es una lista JSON, en el
+    orden de los archivos, con los campos propios de cada uno.
+    """
+    shared = {field: form.get(field, '') for field in REQUIRED_FORM_FIELDS}
+    overrides = [{}] * file_count
+    if form.get('metadata'):
+        try:
+            overrides = json.loads(form['metadata'])
+        except ValueError:
+            raise ValueError("El campo metadata no es un JSON válido")
+        if not isinstance(overrides, list) or len(overrides) != file_count \
+                or not all(isinstance(item, dict) for item in overrides):
+            raise ValueError("El campo metadata debe ser una lista con un objeto por archivo")
+    
+    form_data_list = []
+    for number, override in enumerate(overrides, start=1):
+        form_data = dict(shared)
+        form_data.update({field: str(override[field]) for field in REQUIRED_FORM_FIELDS if field in override})
+        missing_fields = [field for field in REQUIRED_FORM_FIELDS if not form_data[field]]
+        if missing_fields:
+            raise ValueError(f"Archivo {number}: campos requeridos faltantes: {', '.join(missing_fields)}")
+        form_data_list.append(form_data)
+    return form_data_list
+
+def process_batch_file(storage, form_data: dict) -> dict:
+    """Validar y procesar un archivo de un lote"""
+    if not spreadsheet_rules.validate_file_extension(storage.filename):
+        return {
+            'success': False,
+            'error': spreadsheet_rules.extension_error(storage.filename),
+            'detailed_errors': []
+        }
+    
+    # Los archivos de un lote que superan el límite se descartan al recibirlos
+    if storage.stream.oversized:
+        return {
+            'success': False,
+            'error': f"El archivo es demasiado grande. Máximo {MAX_FILE_SIZE // (1024*1024)}MB",
+            'detailed_errors': []
+        }
+    
+    result, _ = run_processing(storage.stream, storage.filename, form_data)
+    return result
+
+def batch_report_rows(filename: str, result: dict) -> list:
+    """Filas del reporte de un archivo del lote (o de una hoja): una por error informado"""
+    if result['success']:
+        details = result.get('content_errors') or ['']
+        return [[filename, 'procesado', result['total_records'], detail] for detail in details]
+    status = 'omitido' if result.get('skipped') else 'rechazado'
+    details = [result['error']] + list(result.get('detailed_errors', []))
+    return [[filename, status, 0, detail] for detail in details]
+
+def generate_batch_zip(files: list, form_data_list: list):
+    """Procesar los archivos de un lote en paralelo y entregar el ZIP por partes.
+    
+    Los CSV de cada archivo se agregan al ZIP apenas termina su procesamiento;
+    el reporte con el resultado de cada archivo se agrega al final.
+    """
+    archive = ZipStream()
+    report = {}
+    executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
+    try:
+        futures = {
+            executor.submit(process_batch_file, storage, form_data): (number, storage.filename, form_data)
+            for number, (storage, form_data) in enumerate(zip(files, form_data_list))
+        }
+        for future in as_completed(futures):
+            number, filename, form_data = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                app.logger.error(f"Error procesando {filename} del lote: {str(e)}")
+                result = {'success': False, 'error': "Error interno del servidor", 'detailed_errors': []}
+            
+            report[number] = batch_report_rows(filename, result)
+            alumnos_filename, notas_filename, errores_filename = output_filenames(form_data)
+            if result['success']:
+                yield archive.add(alumnos_filename, result['alumnos_csv'])
+                yield archive.add(notas_filename, result['notas_csv'])
+            if result.get('error_report'):
+                yield from archive.add_parts(errores_filename, result['error_report'].iter_csv())
+    finally:
+        # Si el cliente corta la descarga no se procesan los archivos pendientes
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['archivo', 'estado', 'registros', 'detalle'])
+    for number in sorted(report):
+        writer.writerows(report[number])
+    yield archive.add('Reporte_Lote.csv', output.getvalue().encode('utf-8'))
+    yield archive.close()
+
+@app.route('/batch', methods=['POST'])
+def batch_upload():
+    """Ruta para procesar varias planillas en una solicitud y descargar un único ZIP"""
+    # El límite general es el de un archivo; un lote admite más
+    request.max_content_length = BATCH_MAX_SIZE
+    # Un archivo demasiado grande se informa en el reporte del lote sin cortar la solicitud
+    request.abort_oversized_files = False
+    try:
+        files = [storage for storage in request.files.getlist('files') if storage.filename]
+        form = request.form
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"El lote es demasiado grande. Máximo {BATCH_MAX_SIZE // (1024*1024)}MB"}), 413
+    
+    if not files:
+        return jsonify({"error": "No se ha seleccionado ningún archivo"}), 400
+    if len(files) > BATCH_MAX_FILES:
+        return jsonify({"error": f"Demasiados archivos. Máximo {BATCH_MAX_FILES} por lote"}), 400
+    
+    try:
+        form_data_list = batch_form_data(form, len(files))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    app.logger.info(f"Lote recibido: {len(files)} archivos")
+    zip_filename = f"Planillas_SIGEAD_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return Response(
+        stream_with_context(generate_batch_zip(files, form_data_list)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{zip_filename}"'}
+    )
+
+def sheet_form_overrides(form) -> dict:
+    """Leer el campo opcional ``metadata`` de /sheets: campos propios de cada hoja por nombre"""
+    if not form.get('metadata'):
+        return {}
+    try:
+        overrides = json.loads(form['metadata'])
+    except ValueError:
+        raise ValueError("El campo metadata no es un JSON válido")
+    if not isinstance(overrides, dict) or not all(isinstance(item, dict) for item in overrides.values()):
+        raise ValueError("El campo metadata debe ser un objeto con los campos de cada hoja por nombre")
+    return {
+        sheet: {field: str(fields[field]) for field in REQUIRED_FORM_FIELDS if fields.get(field)}
+        for sheet, fields in overrides.items()
+    }
+
+def workbook_zip_entries(result: dict, form_data: dict, overrides: dict) -> list:
+    """Entradas del ZIP de /sheets: los CSV de cada hoja procesada y el reporte por hoja"""
+    entries = []
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['hoja', 'estado', 'registros', 'detalle'])
+    for sheet_result in result['sheets']:
+        sheet = sheet_result['sheet']
+        writer.writerows(batch_report_rows(sheet, sheet_result))
+        alumnos_filename, notas_filename, errores_filename = output_filenames(
+            {**form_data, **overrides.get(sheet, {})}, sheet
+        )
+        if sheet_result['success']:
+            entries.append((alumnos_filename, sheet_result['alumnos_csv']))
+            entries.append((notas_filename, sheet_result['notas_csv']))
+        if sheet_result.get('error_report'):
+            entries.append((errores_filename, sheet_result['error_report'].iter_csv()))
+    entries.append(('Reporte_Hojas.csv', output.getvalue().encode('utf-8')))
+    return entries
+
+@app.route('/sheets', methods=['POST'])
+def sheets_upload():
+    """Ruta para procesar cada hoja de un libro como una planilla y descargar un único ZIP"""
+    try:
+        file = request.files.get('file')
+        form = request.form
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"El archivo es demasiado grande. Máximo {MAX_FILE_SIZE // (1024*1024)}MB"}), 413
+    
+    if file is None or file.filename == '':
+        return jsonify({"error": "No se ha seleccionado ningún archivo"}), 400
+    if not spreadsheet_rules.validate_file_extension(file.filename):
+        return jsonify({"error": spreadsheet_rules.extension_error(file.filename, "Archivo con formato incorrecto")}), 400
+    
+    form_data = {field: form.get(field, '') for field in REQUIRED_FORM_FIELDS}
+    missing_fields = [field for field, value in form_data.items() if not value]
+    if missing_fields:
+        return jsonify({"error": f"Campos requeridos faltantes: {', '.join(missing_fields)}"}), 400
+    try:
+        overrides = sheet_form_overrides(form)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    bytes_total.inc(file.stream.size, direction='in')
+    start = time.perf_counter()
+    result = processing_backend.process_workbook(file.stream, file.filename, form_data, overrides)
+    record_pipeline_stats(result.get('stats'))
+    upload_duration.observe(time.perf_counter() - start, outcome='success' if result['success'] else 'error')
+    
+    if not result['success']:
+        return jsonify(error_body(result)), 400
+    
+    app.logger.info(f"Libro procesado: {file.filename}, {len(result['sheets'])} hojas, {result['total_records']} registros")
+    zip_filename = f"Planillas_SIGEAD_{Path(file.filename).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return Response(
+        stream_zip(workbook_zip_entries(result, form_data, overrides)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{zip_filename}"'}
+    )
+
+def preflight_source(files, form) -> tuple:
+    """Archivo a revisar en /preflight: completo (``file``) o en tramos (``part``, ``offset`` y ``size``)"""
+    file = files.get('file')
+    if file is not None and file.filename:
+        return file.stream, file.filename
+
+    parts = files.getlist('part')
+    offsets = form.getlist('offset', type=int)
+    size = form.get('size', type=int)
+    if not parts or len(offsets) != len(parts) or size is None:
+        raise ValueError("No se ha seleccionado ningún archivo")
+    return PartialFile(size, [(offset, part.stream.read()) for offset, part in zip(offsets, parts)]), form.get('filename', '')
+
+@app.route('/preflight', methods=['POST'])
+def preflight_upload():
+    """Ruta para revisar el encabezado de una planilla antes de procesarla (sin leer sus filas)"""
+    try:
+        file_stream, filename = preflight_source(request.files, request.form)
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"El archivo es demasiado grande. Máximo {MAX_FILE_SIZE // (1024*1024)}MB"}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    start = time.perf_counter()
+    try:
+        result = spreadsheet_rules.preflight_file(file_stream, filename)
+    except MissingRange as e:
+        # El navegador envía el tramo pedido y vuelve a consultar
+        preflight_duration.observe(time.perf_counter() - start, outcome='partial')
+        return jsonify({"missing_range": [e.offset, e.length]})
+    if not result['success']:
+        preflight_duration.observe(time.perf_counter() - start, outcome='error')
+        return jsonify(result), 400
+    preflight_duration.observe(time.perf_counter() - start, outcome='valid' if result['valid'] else 'invalid')
+    return jsonify(result)
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Ruta para consultar el estado de un trabajo asíncrono"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Trabajo no encontrado o expirado"}), 404
+    
+    response = {"job_id": job_id, "status": job['status']}
+    
+    if job['status'] == STATUS_DONE:
+        outcome = job['result']
+        if outcome['success']:
+            response.update(success_body(outcome))
+        else:
+            response['status'] = STATUS_FAILED
+            response.update(error_body(outcome))
+    elif job['status'] == STATUS_FAILED:
+        app.logger.error(f"Trabajo {job_id} fallido: {job['error']}")
+        response["error"] = "Error interno del servidor. Por favor, intente nuevamente."
+    
+    return jsonify(response)
 
 @app.route('/download')
 def download_file():
@@ -160,44 +610,41 @@ def download_file():
             return jsonify({"error": "Parámetros de descarga incompletos"}), 400
         
         app.logger.info(f"Solicitud de descarga: file_id={file_id}, file_type={file_type}")
-        app.logger.info(f"Archivos disponibles: {list(temp_files.keys())}")
         
-        # Verificar si el file_id existe
-        if file_id not in temp_files:
+        if file_type not in ('alumnos', 'notas', 'errores'):
+            app.logger.error(f"Tipo de archivo no válido: {file_type}")
+            return jsonify({"error": "Tipo de archivo no válido"}), 400
+        
+        # Verificar si el file_id existe y no venció
+        artifact = artifact_store.lookup(file_id, file_type)
+        if artifact is None:
             app.logger.error(f"File ID no encontrado: {file_id}")
             return jsonify({"error": "Archivo no encontrado o expirado"}), 404
         
-        file_info = temp_files[file_id]
-        
-        # Determinar qué archivo descargar
-        if file_type == 'alumnos':
-            file_path = file_info['alumnos_path']
-            filename = file_info['alumnos_filename']
-        elif file_type == 'notas':
-            file_path = file_info['notas_path']
-            filename = file_info['notas_filename']
-        else:
-            app.logger.error(f"Tipo de archivo no válido: {file_type}")
-            return jsonify({"error": "Tipo de archivo no válido"}), 400
+        file_path = artifact.path
+        filename = artifact.filename
         
         # Verificar que el archivo existe
         if not os.path.exists(file_path):
             app.logger.error(f"Archivo no encontrado en disco: {file_path}")
             return jsonify({"error": "Archivo no encontrado en disco"}), 404
             
-        app.logger.info(f"Descarga de archivo: {file_path} -> {filename}")
+        # Servir la copia comprimida si el cliente acepta gzip
+        use_gzip = request.accept_encodings['gzip'] > 0 and os.path.exists(artifact.gzip_path)
+        app.logger.info(f"Descarga de archivo: {file_path} -> {filename} (gzip: {use_gzip})")
         
         response = send_file(
-            file_path,
+            artifact.gzip_path if use_gzip else file_path,
             as_attachment=True,
             download_name=filename,
             mimetype='text/csv'
         )
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
         
-        # Agregar headers para evitar problemas de caché
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
+        # El contenido de un file_id no cambia: se puede reutilizar hasta que venza
+        response.headers['Cache-Control'] = f"private, max-age={max(int(artifact.expires_at - time.time()), 0)}"
         
         return response
         
@@ -205,6 +652,34 @@ def download_file():
         app.logger.error(f"Error en descarga: {str(e)}")
         return jsonify({"error": f"Error al descargar el archivo: {str(e)}"}), 500
 
+@app.route('/download-zip')
+def download_zip():
+    """Ruta para descargar ambos CSV de un procesamiento en un único ZIP"""
+    file_id = request.args.get('file_id')
+    if not file_id:
+        return jsonify({"error": "Parámetros de descarga incompletos"}), 400
+    
+    artifacts = [artifact_store.lookup(file_id, file_type) for file_type in ('alumnos', 'notas')]
+    if None in artifacts or not all(os.path.exists(artifact.path) for artifact in artifacts):
+        app.logger.error(f"File ID no encontrado: {file_id}")
+        return jsonify({"error": "Archivo no encontrado o expirado"}), 404
+    
+    alumnos = artifacts[0]
+    # El reporte de errores solo existe si alguna fila tuvo errores
+    errores = artifact_store.lookup(file_id, 'errores')
+    if errores is not None and os.path.exists(errores.path):
+        artifacts.append(errores)
+    zip_filename = alumnos.filename.replace('Subir_Alumnos_', 'Subir_SIGEAD_', 1).rsplit('.', 1)[0] + '.zip'
+    app.logger.info(f"Descarga de ZIP: {file_id} -> {zip_filename}")
+    
+    # Los CSV se copian del disco al ZIP por bloques mientras se envía la respuesta
+    entries = [(artifact.filename, Path(artifact.path)) for artifact in artifacts]
+    return Response(
+        stream_zip(entries),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{zip_filename}"'}
+    )
+
 @app.errorhandler(413)
 def too_large(e):
     return jsonify({"error": f"El archivo es demasiado grande. Máximo {MAX_FILE_SIZE // (1024*1024)}MB"}), 413
@@ -218,22 +693,35 @@ def internal_error(e):
     app.logger.error(f"Error interno: {str(e)}")
     return jsonify({"error": "Error interno del servidor"}), 500
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Ruta con las métricas de rendimiento en formato de texto de Prometheus"""
+    # Solo contadores en memoria: no se recorre el almacén de archivos
+    for stat, value in result_cache.stats().items():
+        cache_state.set(value, stat=stat)
+    job_queue_depth.set(job_queue.depth())
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache-stats')
+def cache_stats():
+    """Ruta para consultar los contadores de la caché de resultados"""
+    return jsonify(result_cache.stats())
+
 @app.route('/test-session')
 def test_session():
     """Ruta de prueba para verificar el estado de los archivos temporales"""
+    temp_files = {}
+    for artifact in artifact_store.entries():
+        info = temp_files.setdefault(artifact.file_id, {
+            "timestamp": datetime.fromtimestamp(artifact.created_at).isoformat()
+        })
+        info[f"{artifact.file_type}_filename"] = artifact.filename
+        info[f"{artifact.file_type}_exists"] = os.path.exists(artifact.path)
+    
     return jsonify({
         "temp_files_count": len(temp_files),
         "temp_files_ids": list(temp_files.keys()),
-        "temp_files_info": {
-            fid: {
-                "alumnos_filename": info['alumnos_filename'],
-                "notas_filename": info['notas_filename'],
-                "timestamp": info['timestamp'].isoformat(),
-                "alumnos_exists": os.path.exists(info['alumnos_path']),
-                "notas_exists": os.path.exists(info['notas_path'])
-            }
-            for fid, info in temp_files.items()
-        }
+        "temp_files_info": temp_files
     })
 
 if __name__ == '__main__':
@@ -0,0 +1,62 @@
+"""
+Benchmark de la validación de fechas.
+
+Compara ``DateValidator.find_invalid`` sobre una columna completa con la
+validación anterior valor por valor, para columnas de texto y de fechas nativas.
+
+Uso:
+    python -m benchmarks.bench_dates [filas]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_validation import legacy_is_valid_date_format  # noqa: E402
+from utils.date_validator import DateValidator  # noqa: E402
+
+TEXT_FORMATS = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%Y/%m/%d', '%B %d %Y']
+
+
+def build_columns(rows: int, seed: int = 42):
+    """Generar una columna de textos con formatos variados y otra de fechas nativas"""
+    rng = random.Random(seed)
+    start = datetime(2024, 3, 1)
+    dates = [start + timedelta(days=rng.randint(0, 30)) for _ in range(rows)]
+    text = pd.Series([d.strftime(rng.choice(TEXT_FORMATS)) for d in dates], dtype=object)
+    native = pd.Series(dates, dtype=object)
+    return text, native
+
+
+def legacy_find_invalid(values: pd.Series) -> list:
+    return [
+        not legacy_is_valid_date_format(str(value).strip())
+        for value in values
+    ]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    text, native = build_columns(rows)
+    print(f"{'columna':>10} {'filas':>8} {'por valor (s)':>14} {'columnar (ms)':>14}")
+    for name, values in (('texto', text), ('nativa', native)):
+        start = time.perf_counter()
+        expected = legacy_find_invalid(values)
+        legacy_time = time.perf_counter() - start
+
+        validator = DateValidator()
+        start = time.perf_counter()
+        result = validator.find_invalid(values)
+        columnar_time = time.perf_counter() - start
+
+        assert result.tolist() == expected, "La validación difiere de la versión por valor"
+        print(f"{name:>10} {rows:>8} {legacy_time:>14.3f} {columnar_time * 1000:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark de la detección de DNIs repetidos.
+
+Registra las filas exportadas de padrones de distintos tamaños, con una
+fracción de DNIs repetidos (la mitad con otra nota), en ``DniIndex``
+(columnar, motor de pandas) y en ``RowDniIndex`` (diccionario, motor
+liviano), y mide ``resolve`` con cada política. El tiempo por fila debe
+mantenerse constante al crecer el padrón. Verifica que ambos índices
+exporten las mismas filas e informen los mismos errores.
+
+Uso:
+    python -m benchmarks.bench_duplicates [fracción de repetidos]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.dni_index import DNI_DUPLICATE_POLICIES, DniIndex, RowDniIndex  # noqa: E402
+from utils.error_report import ErrorReport  # noqa: E402
+from utils.processor_base import BaseProcessor  # noqa: E402
+from utils.validation_rules import RowErrorReport  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def build_rows(rows: int, duplicate_fraction: float, seed: int = 42):
+    """Filas exportadas (número, DNI, nota) con ``duplicate_fraction`` de DNIs repetidos"""
+    rng = random.Random(seed)
+    dnis = [str(dni) for dni in rng.sample(range(20_000_000, 50_000_000), rows)]
+    notas = [str(rng.randint(1, 10)) for _ in range(rows)]
+    for index in rng.sample(range(1, rows), int(rows * duplicate_fraction)):
+        source = rng.randrange(index)
+        dnis[index] = dnis[source]
+        notas[index] = notas[source] if rng.random() < 0.5 else rng.choice(['ausente', str(rng.randint(1, 10))])
+    return np.arange(1, rows + 1), np.array(dnis, dtype=object), np.array(notas, dtype=object)
+
+
+def resolve_columnar(rows, dnis, notas, policy: str):
+    index = DniIndex(policy)
+    index.add(rows, dnis, notas)
+    report = ErrorReport({'dni_policy': DNI_DUPLICATE_POLICIES[policy]})
+    resolved = index.resolve(report, BaseProcessor._parse_grade)
+    return list(zip(*resolved)), b''.join(report.iter_csv())
+
+
+def resolve_rows(rows, dnis, notas, policy: str):
+    index = RowDniIndex(policy)
+    for row, dni, nota in zip(rows.tolist(), dnis.tolist(), notas.tolist()):
+        index.add(row, dni, nota)
+    report = RowErrorReport({'dni_policy': DNI_DUPLICATE_POLICIES[policy]})
+    resolved = index.resolve(report, BaseProcessor._parse_grade)
+    return resolved, b''.join(report.iter_csv())
+
+
+def main():
+    duplicate_fraction = float(sys.argv[1]) if len(sys.argv) > 1 else 0.01
+    print(f"DNIs repetidos: {duplicate_fraction:.1%} de las filas; tiempos en ms (µs por fila)")
+    print(f"{'filas':>9} {'política':>9} {'columnar':>18} {'diccionario':>18}")
+    for size in SIZES:
+        rows, dnis, notas = build_rows(size, duplicate_fraction)
+        for policy in DNI_DUPLICATE_POLICIES:
+            timings = []
+            results = []
+            for resolve in (resolve_columnar, resolve_rows):
+                start = time.perf_counter()
+                results.append(resolve(rows, dnis, notas, policy))
+                timings.append(time.perf_counter() - start)
+            assert results[0] == results[1], "Los índices difieren"
+            cells = [f"{seconds * 1000:>8.1f} ({seconds / size * 1e6:>5.2f})" for seconds in timings]
+            print(f"{size:>9} {policy:>9} {cells[0]:>18} {cells[1]:>18}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark de la generación de los CSV de salida.
+
+Compara ``FileProcessor.generate_csv_outputs`` (una sola pasada columnar que
+arma ambos archivos) con el par de bucles ``iterrows`` anteriores, verificando
+que el contenido generado sea idéntico cuando no hay valores a escapar.
+
+Uso:
+    python -m benchmarks.bench_export
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_validation import build_dataframe, time_call  # noqa: E402
+from utils.file_processor import FileProcessor  # noqa: E402
+
+ROW_COUNTS = [1_000, 10_000, 100_000]
+
+FORM_DATA = {
+    'campo1': 'Ingeniería', 'campo2': 'K1001', 'campo3': 'Matemática',
+    'campo4': '2024', 'campo5': '01/07/2024', 'campo6': '15/07/2024',
+}
+
+
+def legacy_generate(df, form_data):
+    """Par de bucles fila por fila previos a la exportación columnar"""
+    alumnos_lines = ["DNI,Propuesta,Comision,Actividad,Periodo Lectivo"]
+    for _, row in df.iterrows():
+        dni_value = str(row['DNI']).strip()
+        if dni_value and dni_value != 'nan':
+            alumnos_lines.append(
+                f"{dni_value},{form_data['campo1']},{form_data['campo2']},{form_data['campo3']},{form_data['campo4']}"
+            )
+    notas_lines = ["documento,nota_regularidad,fecha_regularidad,nota_promocion,fecha_promocion"]
+    for _, row in df.iterrows():
+        dni_value = str(row['DNI']).strip()
+        nota_value = str(row['Nota']).strip()
+        if dni_value and dni_value != 'nan':
+            notas_lines.append(f"{dni_value},{nota_value},{form_data['campo5']},{nota_value},{form_data['campo6']}")
+    return '\n'.join(alumnos_lines).encode('utf-8'), '\n'.join(notas_lines).encode('utf-8')
+
+
+def main():
+    processor = FileProcessor()
+    print(f"{'filas':>8} {'iterrows (s)':>14} {'columnar (s)':>14} {'aceleración':>12}")
+    for rows in ROW_COUNTS:
+        df, _ = processor.validate_data_content(build_dataframe(rows))
+        legacy_output, legacy_time = time_call(legacy_generate, df, FORM_DATA)
+        output, columnar_time = time_call(processor.generate_csv_outputs, df, FORM_DATA)
+
+        assert output == legacy_output, "Los CSV generados difieren de la versión fila por fila"
+
+        print(f"{rows:>8} {legacy_time:>14.3f} {columnar_time:>14.3f} {legacy_time / columnar_time:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
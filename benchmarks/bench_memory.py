@@ -0,0 +1,74 @@
+"""
+Benchmark de memoria de la carga de planillas.
+
+Compara la carga con todas las columnas como ``object`` contra la carga con
+categorías para ``CATEGORY_COLUMNS`` (Nota y Facultad regional, las columnas
+del procesamiento con pocos valores distintos): memoria del DataFrame que arma
+``read_excel_file``, pico de memoria asignada al leerlo y pico del
+procesamiento completo, verificando que los resultados coincidan.
+
+Uso:
+    python -m benchmarks.bench_memory [filas]
+"""
+import io
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_export import FORM_DATA  # noqa: E402
+from benchmarks.siu_generator import generate_siu_dataframe, write_workbook  # noqa: E402
+from utils.file_processor import FileProcessor  # noqa: E402
+
+
+def peak_memory(func, *args):
+    """Ejecutar una función y retornar (resultado, pico de memoria en bytes)"""
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(processor: FileProcessor, file_bytes: bytes, filename: str) -> dict:
+    df, read_peak = peak_memory(processor.read_excel_file, io.BytesIO(file_bytes))
+    filtered = processor.filter_faculty_data(df)
+    valid, errors = processor.validate_data_content(filtered)
+    result, process_peak = peak_memory(
+        processor.process_excel_file, io.BytesIO(file_bytes), filename, FORM_DATA
+    )
+    return {
+        'frame': df.memory_usage(deep=True).sum(),
+        'read_peak': read_peak,
+        'process_peak': process_peak,
+        'outputs': (len(valid), errors, result['alumnos_csv'], result['notas_csv']),
+    }
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    df = generate_siu_dataframe(rows)
+
+    for file_format in ['xlsx', 'csv']:
+        file_bytes = write_workbook(df, file_format)
+        filename = f"planilla.{file_format}"
+
+        baseline = FileProcessor()
+        baseline.category_columns = []
+        before = measure(baseline, file_bytes, filename)
+        after = measure(FileProcessor(), file_bytes, filename)
+        assert before['outputs'] == after['outputs'], "Los resultados difieren"
+
+        print(f"\n{rows} filas, .{file_format}")
+        print(f"{'medición':<28} {'object (MB)':>12} {'categorías (MB)':>16} {'reducción':>10}")
+        for key, label in [('frame', 'DataFrame de read_excel_file'),
+                           ('read_peak', 'pico de read_excel_file'),
+                           ('process_peak', 'pico de process_excel_file')]:
+            print(f"{label:<28} {before[key] / 2**20:>12.1f} {after[key] / 2**20:>16.1f} "
+                  f"{1 - after[key] / before[key]:>10.0%}")
+
+
+if __name__ == '__main__':
+    main()
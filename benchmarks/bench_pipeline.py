@@ -0,0 +1,168 @@
+"""
+Benchmark por etapas del pipeline de ``FileProcessor``.
+
+Genera planillas sintéticas de SIU Guaraní (ver ``siu_generator``) y mide por
+separado la lectura, la validación de estructura, el filtro de facultad, la
+validación de contenido, la generación de cada CSV y el procesamiento
+completo. De cada etapa se reporta el mejor tiempo de varias repeticiones y el
+pico de memoria asignada (medido con ``tracemalloc`` en una pasada aparte).
+
+Los resultados se guardan en JSON para compararlos entre commits; con
+``--compare`` se marca como regresión toda etapa que supere la referencia en
+más del umbral indicado y el proceso termina con código 1.
+
+Uso:
+    python -m benchmarks.bench_pipeline [--rows 1000 10000] [--output resultados.json]
+                                        [--compare referencia.json] [--threshold 0.2]
+"""
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_export import FORM_DATA  # noqa: E402
+from benchmarks.siu_generator import FORMATS, XLS_MAX_ROWS, generate_siu_dataframe, write_workbook  # noqa: E402
+from utils.file_processor import FileProcessor  # noqa: E402
+
+ROW_COUNTS = [1_000, 10_000, 50_000]
+REPEATS = 3
+REGRESSION_THRESHOLD = 0.2
+
+
+def measure(func, repeats: int = REPEATS) -> dict:
+    """Mejor tiempo de ``repeats`` ejecuciones y pico de memoria de una más"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': best, 'peak_memory_bytes': peak}
+
+
+def bench_file(processor: FileProcessor, file_bytes: bytes, filename: str, repeats: int) -> dict:
+    """Medir cada etapa del pipeline sobre un archivo"""
+    df = processor.read_excel_file(io.BytesIO(file_bytes))
+    if df is None:
+        return {'error': f"No se pudo leer {filename}"}
+    filtered = processor.filter_faculty_data(df)
+    valid, _ = processor.validate_data_content(filtered)
+
+    stages = {
+        'read_excel_file': lambda: processor.read_excel_file(io.BytesIO(file_bytes)),
+        'validate_excel_structure': lambda: processor.validate_excel_structure(df),
+        'filter_faculty_data': lambda: processor.filter_faculty_data(df),
+        'validate_data_content': lambda: processor.validate_data_content(filtered),
+        'generate_alumnos_csv': lambda: processor.generate_alumnos_csv(valid, FORM_DATA),
+        'generate_notas_csv': lambda: processor.generate_notas_csv(valid, FORM_DATA),
+        'process_excel_file': lambda: processor.process_excel_file(io.BytesIO(file_bytes), filename, FORM_DATA),
+    }
+    return {name: measure(func, repeats) for name, func in stages.items()}
+
+
+def git_revision() -> str:
+    """Commit actual del repositorio, o 'desconocido' fuera de git"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconocido'
+
+
+def run_suite(row_counts, repeats: int, error_rate: float, special_rate: float) -> dict:
+    processor = FileProcessor()
+    results = []
+    for rows in row_counts:
+        df = generate_siu_dataframe(rows, error_rate=error_rate, special_rate=special_rate)
+        for file_format in FORMATS:
+            if file_format == 'xls' and rows > XLS_MAX_ROWS:
+                continue
+            file_bytes = write_workbook(df, file_format)
+            stages = bench_file(processor, file_bytes, f"planilla.{file_format}", repeats)
+            results.append({'format': file_format, 'rows': rows, 'file_bytes': len(file_bytes), 'stages': stages})
+            print_result(results[-1])
+
+    return {
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'config': {'repeats': repeats, 'error_rate': error_rate, 'special_rate': special_rate},
+        'results': results,
+    }
+
+
+def print_result(result: dict):
+    print(f"\n{result['rows']} filas, .{result['format']} ({result['file_bytes'] / 1024:.0f} KB)")
+    if 'error' in result['stages']:
+        print(f"  {result['stages']['error']}")
+        return
+    print(f"  {'etapa':<26} {'tiempo (s)':>12} {'pico (MB)':>12}")
+    for name, stage in result['stages'].items():
+        print(f"  {name:<26} {stage['seconds']:>12.4f} {stage['peak_memory_bytes'] / 2**20:>12.1f}")
+
+
+def compare(current: dict, reference: dict, threshold: float) -> list:
+    """Retornar las etapas cuyo tiempo supera la referencia en más de ``threshold``"""
+    baseline = {(r['format'], r['rows']): r['stages'] for r in reference['results']}
+    regressions = []
+    for result in current['results']:
+        previous = baseline.get((result['format'], result['rows']))
+        if not previous or 'error' in previous or 'error' in result['stages']:
+            continue
+        for name, stage in result['stages'].items():
+            before = previous.get(name)
+            if before and stage['seconds'] > before['seconds'] * (1 + threshold):
+                regressions.append(
+                    f".{result['format']} {result['rows']} filas, {name}: "
+                    f"{before['seconds']:.4f}s -> {stage['seconds']:.4f}s"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark por etapas de FileProcessor")
+    parser.add_argument('--rows', type=int, nargs='+', default=ROW_COUNTS)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--special-rate', type=float, default=0.1)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="JSON de referencia de una corrida anterior")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    report = run_suite(args.rows, args.repeats, args.error_rate, args.special_rate)
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"\nResultados guardados en {args.output}")
+
+    if args.compare:
+        reference = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(report, reference, args.threshold)
+        print(f"Comparación contra {reference.get('revision', args.compare)}:")
+        for line in regressions:
+            print(f"  REGRESIÓN {line}")
+        if regressions:
+            sys.exit(1)
+        print("  sin regresiones")
+
+
+if __name__ == '__main__':
+    main()
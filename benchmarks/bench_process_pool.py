@@ -0,0 +1,64 @@
+"""
+Benchmark del backend de grupo de procesos.
+
+Envía varias subidas simultáneas al ``ProcessPoolBackend`` con 1, 2, 4 y 8
+trabajadores y reporta el rendimiento (archivos por segundo). La mejora
+esperada depende de los núcleos disponibles en la máquina.
+
+Uso:
+    python -m benchmarks.bench_process_pool [filas] [subidas]
+"""
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_export import FORM_DATA  # noqa: E402
+from benchmarks.bench_validation import build_dataframe  # noqa: E402
+from utils.processing_backend import ProcessPoolBackend  # noqa: E402
+
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def build_workbook(rows: int) -> bytes:
+    """Generar un .xlsx en memoria con la estructura de SIU Guaraní"""
+    buffer = io.BytesIO()
+    build_dataframe(rows).to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def run_uploads(backend: ProcessPoolBackend, file_bytes: bytes, uploads: int) -> float:
+    """Procesar ``uploads`` subidas simultáneas y retornar los segundos totales"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=uploads) as clients:
+        results = list(clients.map(
+            lambda i: backend.process(file_bytes, f"planilla_{i}.xlsx", FORM_DATA), range(uploads)
+        ))
+    elapsed = time.perf_counter() - start
+    assert all(result['success'] for result in results), "Alguna subida falló"
+    return elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    uploads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    file_bytes = build_workbook(rows)
+
+    print(f"{rows} filas por archivo, {uploads} subidas simultáneas, {os.cpu_count()} núcleos")
+    print(f"{'trabajadores':>12} {'tiempo (s)':>12} {'archivos/s':>12}")
+    for workers in WORKER_COUNTS:
+        backend = ProcessPoolBackend(max_workers=workers)
+        backend.warm_up()
+        try:
+            elapsed = run_uploads(backend, file_bytes, uploads)
+        finally:
+            backend.shutdown()
+        print(f"{workers:>12} {elapsed:>12.2f} {uploads / elapsed:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark de los motores de lectura de planillas.
+
+Lee la misma hoja sintética de SIU Guaraní con cada motor instalado (openpyxl,
+xlrd y python-calamine) en .xlsx y .xls, verificando que todos entreguen los
+mismos datos, para elegir el motor por defecto de cada formato. También mide
+la misma hoja exportada como CSV, que evita descomprimir e interpretar XML.
+
+Uso:
+    python -m benchmarks.bench_readers [filas]
+"""
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_validation import time_call  # noqa: E402
+from benchmarks.siu_generator import FORMATS, XLS_MAX_ROWS, generate_siu_dataframe, write_workbook  # noqa: E402
+from utils.spreadsheet_reader import available_engines, open_sheet_reader  # noqa: E402
+
+
+def read_all(file_bytes: bytes, engine: str) -> pd.DataFrame:
+    """Leer la hoja completa con un motor"""
+    with open_sheet_reader(io.BytesIO(file_bytes), engine=engine) as reader:
+        return pd.concat(list(reader.iter_chunks()))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    df = generate_siu_dataframe(min(rows, XLS_MAX_ROWS))
+
+    for file_format in FORMATS:
+        file_bytes = write_workbook(df, file_format)
+        engines = available_engines(file_format)
+        print(f"\n{len(df)} filas, .{file_format} ({len(file_bytes) / 1024:.0f} KB)")
+        print(f"{'motor':>10} {'tiempo (s)':>12} {'filas/s':>12}")
+
+        reference = None
+        for engine in engines:
+            result, elapsed = time_call(read_all, file_bytes, engine)
+            if reference is None:
+                reference = result
+            else:
+                assert result.equals(reference), f"{engine} difiere del primer motor"
+            print(f"{engine:>10} {elapsed:>12.3f} {len(result) / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark del procesamiento de libros con varias hojas.
+
+Arma un libro con una hoja por comisión y una hoja de resumen que no es una
+planilla de notas, y compara ``process_workbook`` en el mismo proceso (el
+libro se abre una vez y las hojas se procesan una tras otra) con el
+``ProcessPoolBackend``, que reparte las hojas entre 1, 2 y 4 trabajadores,
+verificando que los CSV de cada hoja coincidan. El análisis de las filas no
+libera el GIL: solo los procesos usan varios núcleos, de modo que la
+ganancia depende de los núcleos disponibles.
+
+Uso:
+    python -m benchmarks.bench_sheets [hojas] [filas_por_hoja]
+"""
+import io
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_export import FORM_DATA  # noqa: E402
+from benchmarks.bench_validation import time_call  # noqa: E402
+from benchmarks.siu_generator import FORMATS, generate_siu_dataframe, write_sheets  # noqa: E402
+from utils.file_processor import FileProcessor  # noqa: E402
+from utils.processing_backend import ProcessPoolBackend  # noqa: E402
+
+WORKER_COUNTS = [1, 2, 4]
+
+
+def outputs(sheets: list) -> list:
+    return [(sheet['sheet'], sheet.get('alumnos_csv'), sheet.get('notas_csv')) for sheet in sheets]
+
+
+def main():
+    sheet_count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    sheets = {f"Comision {i + 1}": generate_siu_dataframe(rows, seed=i) for i in range(sheet_count)}
+    sheets['Resumen'] = pd.DataFrame({'Comision': list(sheets), 'Inscriptos': [rows] * sheet_count})
+
+    backends = {}
+    for workers in WORKER_COUNTS:
+        backends[workers] = ProcessPoolBackend(max_workers=workers, sheet_workers=workers)
+        backends[workers].warm_up()
+    try:
+        print(f"{os.cpu_count()} núcleos")
+        for file_format in [fmt for fmt in FORMATS if fmt != 'csv']:
+            file_bytes = write_sheets(sheets, file_format)
+            filename = f"libro.{file_format}"
+            print(f"\n{sheet_count} hojas de {rows} filas + 1 hoja omitida, .{file_format} "
+                  f"({len(file_bytes) / 2**20:.1f} MB); tiempos en s")
+            print(f"{'inline':>8} " + ' '.join(f"{f'{workers} proc.':>8}" for workers in WORKER_COUNTS))
+
+            reference, inline_secs = time_call(
+                FileProcessor().process_workbook, io.BytesIO(file_bytes), filename, FORM_DATA
+            )
+            timings = []
+            for workers, backend in backends.items():
+                result, elapsed = time_call(backend.process_workbook, file_bytes, filename, FORM_DATA)
+                assert outputs(result['sheets']) == outputs(reference['sheets']), "Los resultados difieren"
+                timings.append(elapsed)
+            print(f"{inline_secs:>8.2f} " + ' '.join(f"{seconds:>8.2f}" for seconds in timings))
+    finally:
+        for backend in backends.values():
+            backend.shutdown()
+
+
+if __name__ == '__main__':
+    main()
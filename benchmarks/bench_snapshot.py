@@ -0,0 +1,103 @@
+"""
+Benchmark de la comparación con la instantánea de una comisión.
+
+Genera un padrón con DNIs únicos, lo guarda como instantánea y compara una
+nueva exportación con algunas notas cambiadas y alumnos agregados mediante
+``diff_columns`` (hash join vectorizado) y mediante un diccionario recorrido
+fila por fila. Informa ambos tiempos, el de carga de la instantánea, el de
+``SnapshotStore.update`` completo (carga, comparación y guardado), el de
+armar los CSV de los cambios con ``FileProcessor.build_csv_outputs`` y el
+tamaño de la instantánea guardada.
+
+Uso:
+    python -m benchmarks.bench_snapshot [filas] [cambios]
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.file_processor import FileProcessor  # noqa: E402
+from utils.snapshot_store import SnapshotStore, diff_columns  # noqa: E402
+
+KEY = ('INGENIERIA', 'K1001', 'Matemática', '2024')
+
+
+def build_roster(rows: int, changes: int, seed: int = 42):
+    """Padrón exportado y la exportación siguiente, con ``changes`` notas cambiadas y alumnos nuevos"""
+    rng = random.Random(seed)
+    dnis = np.array([str(dni) for dni in rng.sample(range(20_000_000, 50_000_000), rows + changes)], dtype=object)
+    notas = np.array([str(rng.randint(1, 10)) for _ in range(rows)], dtype=object)
+
+    new_notas = notas.copy()
+    for index in rng.sample(range(rows), changes):
+        new_notas[index] = str(int(new_notas[index]) % 10 + 1)
+    new_dnis = np.concatenate([dnis[:rows], dnis[rows:]])
+    new_notas = np.concatenate([new_notas, [str(rng.randint(1, 10)) for _ in range(changes)]])
+    return dnis[:rows], notas, new_dnis, new_notas
+
+
+def dict_diff(old_dnis, old_notas, dnis, notas) -> list:
+    """Comparación anterior: diccionario DNI -> nota y una consulta por fila"""
+    previous = dict(zip(old_dnis, old_notas))
+    return [previous.get(dni) != nota for dni, nota in zip(dnis, notas)]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    old_dnis, old_notas, dnis, notas = build_roster(rows, changes)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(Path(tmp) / 'snapshots.sqlite3')
+        with store.update(KEY, old_dnis, old_notas):
+            pass
+
+        start = time.perf_counter()
+        expected = dict_diff(old_dnis, old_notas, dnis, notas)
+        dict_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        snapshot = store.load(KEY)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        is_new, changed, _, _ = diff_columns(snapshot.dnis, snapshot.notas, dnis, notas)
+        join_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with store.update(KEY, dnis, notas) as diff:
+            pass
+        update_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        alumnos_csv, notas_csv = FileProcessor().build_csv_outputs(
+            dnis[diff.mask], notas[diff.mask], enroll=diff.is_new[diff.mask]
+        )
+        csv_time = time.perf_counter() - start
+
+        assert (is_new | changed).tolist() == expected, "La comparación difiere de la versión con diccionario"
+        assert diff.mask.tolist() == expected
+        assert (diff.new, diff.changed) == (changes, changes)
+        assert alumnos_csv.count(b'\n') == changes
+        assert notas_csv.count(b'\n') == 2 * changes
+        snapshot = store.load(KEY)
+        assert len(snapshot.dnis) == rows + changes
+
+        size = store._connection().execute(
+            "SELECT length(dnis) + length(notas) FROM snapshots"
+        ).fetchone()[0]
+
+    print(f"Padrón de {rows} alumnos, {changes} notas cambiadas y {changes} alumnos nuevos (tiempos en ms)")
+    print(f"{'diccionario':>12} {'hash join':>10} {'carga':>8} {'update':>8} {'CSV':>8} {'instantánea (KB)':>17}")
+    print(f"{dict_time * 1000:>12.1f} {join_time * 1000:>10.1f} {load_time * 1000:>8.1f} "
+          f"{update_time * 1000:>8.1f} {csv_time * 1000:>8.1f} {size / 1024:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark del arranque de la aplicación con cada motor de procesamiento.
+
+Para cada motor (``PROCESSING_ENGINE``) lanza un intérprete nuevo que importa
+la aplicación y atiende con el cliente de pruebas de Flask ``GET /``, un
+archivo estático, la primera subida y una segunda subida (de otra planilla,
+para no usar la caché de resultados). Informa el tiempo de importación, la
+latencia de cada solicitud y si pandas ya estaba cargado tras servir la
+página; la primera subida incluye la carga del motor. El motor liviano
+arranca antes pero lee cada fila más lento que los motores de pandas, de
+modo que conviene para planillas chicas y procesos de vida corta.
+
+Uso:
+    python -m benchmarks.bench_startup [filas]
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+ENGINES = ['pandas', 'lite']
+
+
+def measure_child(form_data: dict, file_paths: list) -> dict:
+    """Medir el arranque en este proceso (ejecutado en un intérprete nuevo).
+
+    No importa nada del benchmark que cargue pandas antes de medir.
+    """
+    start = time.perf_counter()
+    import app
+    timings = {'import': time.perf_counter() - start}
+    client = app.app.test_client()
+
+    def request(name, *args, **kwargs):
+        start = time.perf_counter()
+        response = client.open(*args, **kwargs)
+        timings[name] = time.perf_counter() - start
+        return response
+
+    assert request('index', '/').status_code == 200
+    assert request('static', '/static/js/main.js').status_code == 200
+    timings['pandas_after_index'] = 'pandas' in sys.modules
+
+    for name, file_path in zip(('first_upload', 'second_upload'), file_paths):
+        file_bytes = Path(file_path).read_bytes()
+        response = request(name, '/', method='POST', content_type='multipart/form-data',
+                           data={**form_data, 'file': (io.BytesIO(file_bytes), 'planilla.xlsx')})
+        assert response.status_code == 200, response.get_json()
+    return timings
+
+
+def run_engine(engine: str, form_data: dict, file_paths: list) -> dict:
+    """Medir un motor en un intérprete nuevo, sin módulos ya importados"""
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_startup', '--child', json.dumps(form_data), *file_paths],
+        cwd=ROOT, env={**os.environ, 'PROCESSING_ENGINE': engine, 'PROCESSING_BACKEND': 'inline'},
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        print(json.dumps(measure_child(json.loads(sys.argv[2]), sys.argv[3:])))
+        return
+
+    from benchmarks.bench_export import FORM_DATA
+    from benchmarks.siu_generator import generate_siu_dataframe, write_workbook
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        file_paths = []
+        for seed in range(2):
+            file_path = Path(tmp) / f"planilla_{seed}.xlsx"
+            file_path.write_bytes(write_workbook(generate_siu_dataframe(rows, seed=seed)))
+            file_paths.append(str(file_path))
+
+        print(f"Planilla de {rows} filas (.xlsx), tiempos en ms")
+        print(f"{'motor':>8} {'import':>8} {'GET /':>7} {'estático':>9} {'1ª subida':>10} "
+              f"{'2ª subida':>10} {'pandas tras GET /':>18}")
+        for engine in ENGINES:
+            timings = run_engine(engine, FORM_DATA, file_paths)
+            ms = {name: value * 1000 for name, value in timings.items() if name != 'pandas_after_index'}
+            print(f"{engine:>8} {ms['import']:>8.0f} {ms['index']:>7.1f} {ms['static']:>9.1f} "
+                  f"{ms['first_upload']:>10.0f} {ms['second_upload']:>10.0f} "
+                  f"{'sí' if timings['pandas_after_index'] else 'no':>18}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+Benchmark de la validación de contenido.
+
+Compara la validación columnar de ``FileProcessor.validate_data_content`` con la
+implementación anterior fila por fila (``iterrows``), verificando que ambas
+produzcan los mismos registros válidos y los mismos errores. Mide además la
+memoria que retienen los errores de una planilla con muchas filas inválidas:
+la lista de mensajes por fila anterior contra ``ErrorReport``.
+
+Uso:
+    python -m benchmarks.bench_validation
+"""
+import gc
+import random
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import REQUIRED_COLUMNS  # noqa: E402
+from utils.file_processor import FileProcessor  # noqa: E402
+from utils.schema import SchemaBinding  # noqa: E402
+
+ROW_COUNTS = [1_000, 10_000, 100_000]
+# Planilla de la medición de memoria de los errores
+MEMORY_ROWS = 50_000
+MEMORY_ERROR_RATE = 0.5
+
+
+def build_dataframe(rows: int, error_rate: float = 0.05, seed: int = 42) -> pd.DataFrame:
+    """Generar un DataFrame con la estructura de SIU Guaraní y errores aleatorios"""
+    rng = random.Random(seed)
+    notas = [str(n) for n in range(1, 11)] + ['Ausente', '-', 'Aprobado']
+    data = {column: [] for column in REQUIRED_COLUMNS}
+    for i in range(rows):
+        broken = rng.random() < error_rate
+        data['Legajo'].append(100000 + i)
+        data['Nota'].append(rng.choice(['15', 'abc']) if broken else rng.choice(notas))
+        data['Promocionado'].append(rng.choice(['Si', 'No']))
+        data['Apellido'].append('' if broken and rng.random() < 0.3 else f"Apellido{i}")
+        data['Nombre'].append(f"Nombre{i}")
+        data['DNI'].append(str(rng.randint(1000, 99999)) if broken else str(rng.randint(20000000, 45000000)))
+        data['Edicion'].append('2024')
+        data['Fecha de inicio'].append('fecha' if broken and rng.random() < 0.2 else '01/03/2024')
+        data['Facultad regional'].append('FRBA')
+    return pd.DataFrame(data)
+
+
+LEGACY_DATE_PATTERNS = [
+    r'^\d{1,2}/\d{1,2}/\d{4}$',
+    r'^\d{4}-\d{1,2}-\d{1,2}$',
+    r'^\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{1,2}:\d{1,2}$',
+    r'^\d{1,2}-\d{1,2}-\d{4}$',
+    r'^\d{1,2}/\d{1,2}/\d{2}$',
+    r'^\d{4}/\d{1,2}/\d{1,2}$',
+]
+
+
+def legacy_is_valid_date_format(date_str: str) -> bool:
+    """Validación de fecha por valor previa al validador por columna"""
+    if not date_str or date_str == 'nan' or date_str == 'None':
+        return True
+    for pattern in LEGACY_DATE_PATTERNS:
+        if re.match(pattern, date_str):
+            return True
+    try:
+        pd.to_datetime(date_str, errors='raise')
+        return True
+    except Exception:
+        return False
+
+
+def legacy_find_column(df: pd.DataFrame, column_name: str):
+    """Búsqueda lineal de columnas previa a SchemaBinding"""
+    for col in df.columns:
+        if col.lower() == column_name.lower():
+            return col
+    return None
+
+
+def legacy_validate_data_content(processor: FileProcessor, df: pd.DataFrame):
+    """Validación fila por fila previa a la versión columnar"""
+    errores = []
+    valid_records = []
+    special_values = ['-', 'ausente', 'equivalencia', 'equivalente', 'aprobado', 'desaprobado']
+    for idx, row in df.iterrows():
+        row_errors = []
+        faculty_col = legacy_find_column(df, 'Facultad regional')
+        if faculty_col:
+            faculty_value = str(row[faculty_col]).strip()
+            if not faculty_value or faculty_value == 'nan':
+                row_errors.append("Facultad está vacía")
+        nota_col = legacy_find_column(df, 'Nota')
+        if nota_col:
+            nota_value = str(row[nota_col]).strip()
+            if nota_value.lower() not in special_values:
+                try:
+                    grade = float(nota_value)
+                    if grade < processor.min_grade or grade > processor.max_grade:
+                        row_errors.append(f"Nota {grade} fuera del rango {processor.min_grade}-{processor.max_grade}")
+                except (ValueError, TypeError):
+                    row_errors.append(f"Nota '{nota_value}' no es un número válido ni un valor especial permitido")
+        dni_col = legacy_find_column(df, 'DNI')
+        if dni_col:
+            dni_value = str(row[dni_col]).strip()
+            if not dni_value or not dni_value.isdigit() or len(dni_value) < 7:
+                row_errors.append(f"DNI '{dni_value}' no es válido (debe ser numérico y tener al menos 7 dígitos)")
+        fecha_col = legacy_find_column(df, 'Fecha de inicio')
+        if fecha_col:
+            fecha_value = str(row[fecha_col]).strip()
+            if fecha_value and fecha_value != 'nan':
+                if not legacy_is_valid_date_format(fecha_value):
+                    row_errors.append(f"Fecha '{fecha_value}' no tiene formato válido (acepta DD/MM/YYYY, YYYY-MM-DD, etc.)")
+        for field in ['Apellido', 'Nombre']:
+            field_col = legacy_find_column(df, field)
+            if field_col:
+                field_value = str(row[field_col]).strip()
+                if not field_value or field_value == 'nan':
+                    row_errors.append(f"Campo '{field}' está vacío")
+        if row_errors:
+            errores.append({'fila': idx + 1, 'errores': row_errors})
+        else:
+            valid_records.append(row)
+    valid_df = pd.DataFrame(valid_records) if valid_records else pd.DataFrame()
+    if not valid_df.empty:
+        valid_df = valid_df.reset_index(drop=True)
+    return valid_df, legacy_consolidate_errors(errores)
+
+
+def legacy_consolidate_errors(errores: list) -> list:
+    """Consolidación previa de los errores por fila: un mensaje por texto de error"""
+    if not errores:
+        return []
+    error_types = {}
+    for error in errores:
+        for error_msg in error['errores']:
+            error_types.setdefault(error_msg, []).append(error['fila'])
+
+    consolidated = []
+    for error_msg, rows in error_types.items():
+        if len(rows) == 1:
+            consolidated.append(f"Fila {rows[0]}: {error_msg}")
+        elif len(rows) <= 5:
+            consolidated.append(f"Filas {', '.join(map(str, rows))}: {error_msg}")
+        else:
+            consolidated.append(f"Filas {', '.join(map(str, rows[:3]))} y {len(rows) - 3} más: {error_msg}")
+    if len(errores) > 10:
+        consolidated.insert(0, f"⚠️ Se encontraron errores en {len(errores)} filas del archivo.")
+    return consolidated
+
+
+def time_call(func, *args):
+    """Ejecutar una función y retornar (resultado, segundos)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def legacy_error_rows(report) -> list:
+    """Errores en la forma que retenía la validación anterior: mensajes por fila"""
+    errores = {}
+    rule_ids, rows, refs = report._columns()
+    for rule_id, row, ref in zip(rule_ids.tolist(), rows.tolist(), refs.tolist()):
+        errores.setdefault(row, []).append(report.message(rule_id, ref))
+    return [{'fila': row, 'errores': messages} for row, messages in errores.items()]
+
+
+def retained_bytes(func, *args):
+    """Retornar (resultado, bytes que siguen asignados al terminar la función)"""
+    tracemalloc.start()
+    result = func(*args)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained
+
+
+def measure_error_memory(processor: FileProcessor):
+    """Memoria de los errores de una planilla con muchas filas inválidas"""
+    df = build_dataframe(MEMORY_ROWS, error_rate=MEMORY_ERROR_RATE)
+    binding = SchemaBinding.resolve(df.columns)
+
+    def columnar():
+        report = processor.new_error_report()
+        processor._validate_rows(df, binding, report)
+        report.summary()  # compacta los bloques
+        return report
+
+    columnar()  # las conversiones que pandas guarda en el DataFrame no cuentan como errores
+    report, report_bytes = retained_bytes(columnar)
+    errores, legacy_bytes = retained_bytes(legacy_error_rows, report)
+    assert legacy_consolidate_errors(errores) == report.summary(), "El resumen difiere de la consolidación anterior"
+
+    print(f"\nErrores de {MEMORY_ROWS} filas ({MEMORY_ERROR_RATE:.0%} inválidas): {len(report)} errores en {len(errores)} filas")
+    print(f"  mensajes por fila: {legacy_bytes / 1024 ** 2:8.2f} MB")
+    print(f"  ErrorReport:       {report_bytes / 1024 ** 2:8.2f} MB ({legacy_bytes / max(report_bytes, 1):.1f}x menos)")
+    _, csv_time = time_call(lambda: sum(len(part) for part in report.iter_csv()))
+    print(f"  reporte CSV completo: {csv_time:.3f} s")
+
+
+def main():
+    processor = FileProcessor()
+    print(f"{'filas':>8} {'iterrows (s)':>14} {'columnar (s)':>14} {'aceleración':>12}")
+    for rows in ROW_COUNTS:
+        df = build_dataframe(rows)
+        (legacy_df, legacy_errors), legacy_time = time_call(legacy_validate_data_content, processor, df)
+        (valid_df, errors), columnar_time = time_call(processor.validate_data_content, df)
+
+        assert errors == legacy_errors, "Los errores consolidados difieren de la versión fila por fila"
+        assert valid_df.astype(str).equals(legacy_df.astype(str)), "Los registros válidos difieren"
+
+        print(f"{rows:>8} {legacy_time:>14.3f} {columnar_time:>14.3f} {legacy_time / columnar_time:>11.1f}x")
+
+    measure_error_memory(processor)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Generador de planillas sintéticas con la estructura de SIU Guaraní.
+
+Arma exportaciones con las columnas de ``REQUIRED_COLUMNS`` y permite variar
+la cantidad de filas, la proporción de errores, la mezcla de notas especiales,
+los formatos de fecha y los valores de facultad. Escribe .xlsx con openpyxl,
+.csv separado por ``;`` y .xls con xlwt (opcional: si no está instalado el
+formato .xls no se genera). ``write_sheets`` arma libros con varias hojas.
+
+Uso:
+    python -m benchmarks.siu_generator filas archivo.xlsx [archivo.xls ...]
+"""
+import io
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Sequence
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import REQUIRED_COLUMNS  # noqa: E402
+
+try:
+    import xlwt
+except ImportError:  # pragma: no cover - dependencia opcional
+    xlwt = None
+
+# Formatos de fecha de ``Fecha de inicio`` ('datetime' deja la celda como fecha nativa)
+DATE_FORMATS = ['%d/%m/%Y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d-%m-%Y', '%d/%m/%y', '%Y/%m/%d', 'datetime']
+
+# Valores de facultad con su peso relativo
+FACULTIES = {'FRBA': 0.7, 'UTN FRBA': 0.1, ' frba ': 0.05, 'FRC': 0.1, 'FRLP': 0.05}
+
+SPECIAL_NOTAS = ['-', 'Ausente', 'Equivalencia', 'Equivalente', 'Aprobado', 'Desaprobado']
+
+# Errores que se inyectan en una fila inválida
+ERROR_KINDS = ['nota_fuera_de_rango', 'nota_texto', 'dni_corto', 'fecha_invalida', 'apellido_vacio']
+
+# Máximo de filas de una hoja .xls
+XLS_MAX_ROWS = 65_535
+
+FORMATS = ['xlsx', 'xls', 'csv'] if xlwt is not None else ['xlsx', 'csv']
+
+
+def generate_siu_dataframe(rows: int, error_rate: float = 0.05, special_rate: float = 0.1,
+                           date_formats: Sequence[str] = DATE_FORMATS, faculties: dict = None,
+                           seed: int = 42) -> pd.DataFrame:
+    """Generar un DataFrame con la estructura de una exportación de SIU Guaraní.
+
+    ``error_rate`` es la proporción de filas con algún error de contenido y
+    ``special_rate`` la de notas no numéricas (Ausente, Aprobado, etc.).
+    """
+    rng = random.Random(seed)
+    faculties = faculties or FACULTIES
+    faculty_values, faculty_weights = list(faculties), list(faculties.values())
+    start_date = datetime(2024, 3, 1)
+    data = {column: [] for column in REQUIRED_COLUMNS}
+
+    for i in range(rows):
+        error = rng.choice(ERROR_KINDS) if rng.random() < error_rate else None
+
+        if error == 'nota_fuera_de_rango':
+            nota = str(rng.choice([0, 11, 15, -1]))
+        elif error == 'nota_texto':
+            nota = rng.choice(['abc', 'diez', '7,5x'])
+        elif rng.random() < special_rate:
+            nota = rng.choice(SPECIAL_NOTAS)
+        else:
+            nota = str(rng.randint(1, 10))
+
+        fecha = start_date + timedelta(days=rng.randint(0, 365))
+        date_format = rng.choice(date_formats)
+        if error == 'fecha_invalida':
+            fecha = rng.choice(['fecha', '32/13/2024', '2024.03.01'])
+        elif date_format != 'datetime':
+            fecha = fecha.strftime(date_format)
+
+        data['Legajo'].append(100000 + i)
+        data['Nota'].append(nota)
+        data['Promocionado'].append(rng.choice(['Si', 'No']))
+        data['Apellido'].append('' if error == 'apellido_vacio' else f"Apellido{i}")
+        data['Nombre'].append(f"Nombre{i}")
+        data['DNI'].append(str(rng.randint(1000, 99999)) if error == 'dni_corto'
+                           else str(rng.randint(20000000, 45000000)))
+        data['Edicion'].append('2024')
+        data['Fecha de inicio'].append(fecha)
+        data['Facultad regional'].append(rng.choices(faculty_values, faculty_weights)[0])
+
+    return pd.DataFrame(data)
+
+
+def write_workbook(df: pd.DataFrame, file_format: str = 'xlsx') -> bytes:
+    """Escribir el DataFrame como libro .xlsx, .xls o .csv y retornar los bytes"""
+    if file_format == 'xlsx':
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False)
+        return buffer.getvalue()
+    if file_format == 'xls':
+        return _write_xls({'Hoja1': df})
+    if file_format == 'csv':
+        # Como lo exporta Excel en una configuración regional en español
+        return df.to_csv(index=False, sep=';', date_format='%d/%m/%Y').encode('latin-1')
+    raise ValueError(f"Formato no soportado: {file_format}")
+
+
+def write_sheets(sheets: Dict[str, pd.DataFrame], file_format: str = 'xlsx') -> bytes:
+    """Escribir un libro .xlsx o .xls con una hoja por DataFrame y retornar los bytes"""
+    if file_format == 'xls':
+        return _write_xls(sheets)
+    if file_format != 'xlsx':
+        raise ValueError(f"Formato sin hojas múltiples: {file_format}")
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return buffer.getvalue()
+
+
+def _write_xls(sheets: Dict[str, pd.DataFrame]) -> bytes:
+    """Escribir un .xls con xlwt (pandas ya no escribe este formato)"""
+    if xlwt is None:
+        raise RuntimeError("Se requiere xlwt para generar archivos .xls")
+
+    workbook = xlwt.Workbook()
+    date_style = xlwt.easyxf(num_format_str='DD/MM/YYYY')
+    for name, df in sheets.items():
+        if len(df) > XLS_MAX_ROWS:
+            raise ValueError(f"Un .xls admite hasta {XLS_MAX_ROWS} filas de datos por hoja")
+        sheet = workbook.add_sheet(name)
+        for col, column in enumerate(df.columns):
+            sheet.write(0, col, column)
+        for row, values in enumerate(df.itertuples(index=False), start=1):
+            for col, value in enumerate(values):
+                if isinstance(value, datetime):
+                    sheet.write(row, col, value, date_style)
+                else:
+                    sheet.write(row, col, value)
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    rows = int(sys.argv[1])
+    df = generate_siu_dataframe(rows)
+    for target in sys.argv[2:]:
+        path = Path(target)
+        path.write_bytes(write_workbook(df, path.suffix.lstrip('.').lower()))
+        print(f"{path}: {rows} filas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+"""
+Procesamiento por lotes de planillas SIU desde la línea de comandos.
+
+Convierte todas las planillas de los directorios o patrones indicados sin pasar
+por la aplicación web: cada archivo se procesa con el motor de ``PROCESSING_ENGINE`` en un
+grupo de procesos y genera sus dos CSV en el directorio de salida, más un
+reporte ``Errores_<planilla>.csv`` si alguna fila no pasó la validación. Un índice
+local con el hash de cada planilla permite omitir en las siguientes
+ejecuciones las que no cambiaron.
+
+Los datos de la comisión se toman de un manifiesto JSON:
+
+    {
+        "defaults": {"campo1": "Ingeniería", "campo3": "Matemática", ...},
+        "files": {"k1001*.xlsx": {"campo2": "K1001"}, "k1002*.xlsx": {"campo2": "K1002"}}
+    }
+
+Los campos de ``files`` se aplican, en orden, a los archivos cuyo nombre
+coincide con el patrón.
+
+Uso:
+    python cli.py planillas/ --manifest manifiesto.json --output salida/
+    python cli.py 'exportaciones/**/*.xlsx' --manifest manifiesto.json --workers 8
+"""
+import argparse
+import fnmatch
+import glob
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+from config.settings import ALLOWED_EXTENSIONS, PROCESS_POOL_WORKERS
+from utils.hash_index import HashIndex
+from utils.processing_backend import InlineBackend, ProcessPoolBackend
+from utils.result_cache import FORM_FIELDS, ResultCache
+
+logger = logging.getLogger('cli')
+
+# Nombre del índice de hashes dentro del directorio de salida
+INDEX_FILENAME = '.indice_planillas.json'
+
+
+class FileOutcome(NamedTuple):
+    """Resultado del procesamiento de un archivo"""
+    path: Path
+    status: str  # 'procesado', 'omitido' o 'fallido'
+    rows_in: int = 0
+    rows_out: int = 0
+    detail: str = ''
+
+
+def collect_inputs(inputs: List[str]) -> List[Path]:
+    """Planillas de los directorios, patrones o archivos indicados, sin repetir"""
+    paths = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            candidates = sorted(path.iterdir())
+        elif path.exists():
+            candidates = [path]
+        else:
+            candidates = sorted(Path(match) for match in glob.glob(item, recursive=True))
+        paths.extend(
+            candidate for candidate in candidates
+            if candidate.is_file() and candidate.suffix.lower() in ALLOWED_EXTENSIONS
+        )
+
+    unique = {}
+    for path in paths:
+        unique.setdefault(path.resolve(), path)
+    return list(unique.values())
+
+
+def load_manifest(path: str) -> dict:
+    """Leer y validar el manifiesto con los datos de cada comisión"""
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('defaults', {}), dict) \
+            or not isinstance(manifest.get('files', {}), dict):
+        raise ValueError("El manifiesto debe tener la forma {\"defaults\": {...}, \"files\": {patrón: {...}}}")
+    return manifest
+
+
+def form_data_for(path: Path, manifest: dict) -> Dict[str, str]:
+    """Datos del formulario de un archivo: los valores por defecto y los de cada patrón que coincide"""
+    form_data = {field: str(manifest.get('defaults', {}).get(field, '')) for field in FORM_FIELDS}
+    for pattern, fields in manifest.get('files', {}).items():
+        if fnmatch.fnmatch(path.name, pattern) or fnmatch.fnmatch(str(path), pattern):
+            form_data.update({field: str(fields[field]) for field in FORM_FIELDS if field in fields})
+    return form_data
+
+
+def output_paths(path: Path, output_dir: Path) -> tuple:
+    """CSV de alumnos y de notas de una planilla"""
+    return (output_dir / f"Subir_Alumnos_{path.stem}.csv", output_dir / f"Subir_Notas_{path.stem}.csv")
+
+
+def error_report_path(path: Path, output_dir: Path) -> Path:
+    """Reporte completo de errores de validación de una planilla"""
+    return output_dir / f"Errores_{path.stem}.csv"
+
+
+def write_error_report(result: dict, path: Path, output_dir: Path) -> list:
+    """Escribir el reporte de errores si lo hay (o borrar el de una ejecución anterior)"""
+    report_path = error_report_path(path, output_dir)
+    error_report = result.get('error_report')
+    if not error_report:
+        report_path.unlink(missing_ok=True)
+        return []
+    with open(report_path, 'wb') as f:
+        f.writelines(error_report.iter_csv())
+    return [report_path]
+
+
+def process_file(path: Path, form_data: dict, backend, index: HashIndex,
+                 output_dir: Path, force: bool) -> tuple:
+    """Procesar una planilla si cambió desde la última ejecución.
+
+    Retorna el resultado y, si se procesó o su contenido no cambió, los datos
+    para actualizar el índice (el índice solo se modifica desde el hilo
+    principal).
+    """
+    missing_fields = [field for field in FORM_FIELDS if not form_data[field]]
+    if missing_fields:
+        return FileOutcome(path, 'fallido', detail=f"Campos faltantes en el manifiesto: {', '.join(missing_fields)}"), None
+
+    stat = path.stat()
+    if not force and index.is_unchanged(path, stat, form_data):
+        return FileOutcome(path, 'omitido', detail="Sin cambios"), None
+
+    file_bytes = path.read_bytes()
+    key = ResultCache.make_key(file_bytes, path.name, form_data)
+    if not force and index.has_key(path, key):
+        return FileOutcome(path, 'omitido', detail="Sin cambios (mismo hash)"), ('touch', stat)
+
+    result = backend.process(file_bytes, path.name, form_data)
+    stats = result.get('stats') or {}
+    error_outputs = write_error_report(result, path, output_dir)
+    if not result['success']:
+        details = [result['error']] + list(result.get('detailed_errors', []))[:3]
+        return FileOutcome(path, 'fallido', stats.get('rows_in', 0), detail='; '.join(details)), None
+
+    outputs = output_paths(path, output_dir)
+    for output, content in zip(outputs, (result['alumnos_csv'], result['notas_csv'])):
+        output.write_bytes(content)
+    outputs = [*outputs, *error_outputs]
+    detail = f"{len(result.get('content_errors') or [])} avisos de validación" if result.get('content_errors') else ''
+    outcome = FileOutcome(path, 'procesado', stats.get('rows_in', 0), result['total_records'], detail)
+    return outcome, ('record', stat, form_data, key, outputs, result['total_records'])
+
+
+def run(paths: List[Path], manifest: dict, output_dir: Path, index: HashIndex,
+        workers: int, force: bool = False) -> List[FileOutcome]:
+    """Procesar las planillas en paralelo y actualizar el índice"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    outcomes = []
+
+    # Dos planillas con el mismo nombre escribirían los mismos CSV
+    stems = {}
+    for path in paths:
+        stems.setdefault(path.stem, []).append(path)
+    pending = []
+    for path in paths:
+        if len(stems[path.stem]) > 1:
+            outcomes.append(FileOutcome(path, 'fallido', detail=f"Otra planilla genera los mismos CSV ({path.stem})"))
+        else:
+            pending.append(path)
+
+    # Cada hilo lee, hashea y espera su archivo; el procesamiento corre en el grupo de procesos
+    backend = ProcessPoolBackend(max_workers=workers) if workers > 1 else InlineBackend()
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = {
+                executor.submit(process_file, path, form_data_for(path, manifest), backend, index, output_dir, force): path
+                for path in pending
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    outcome, update = future.result()
+                except Exception as e:
+                    logger.error(f"Error procesando {path}: {str(e)}")
+                    outcome, update = FileOutcome(path, 'fallido', detail=str(e)), None
+
+                if update is not None and update[0] == 'touch':
+                    index.touch(path, update[1])
+                elif update is not None:
+                    index.record(path, *update[1:])
+                outcomes.append(outcome)
+                print(f"[{outcome.status}] {path}" + (f": {outcome.detail}" if outcome.detail else ''))
+    finally:
+        backend.shutdown()
+        index.save()
+    return outcomes
+
+
+def print_summary(outcomes: List[FileOutcome], elapsed: float):
+    """Resumen de archivos, filas y velocidad de la ejecución"""
+    processed = [outcome for outcome in outcomes if outcome.status == 'procesado']
+    skipped = [outcome for outcome in outcomes if outcome.status == 'omitido']
+    failed = [outcome for outcome in outcomes if outcome.status == 'fallido']
+    rows_in = sum(outcome.rows_in for outcome in processed)
+    rows_out = sum(outcome.rows_out for outcome in processed)
+    elapsed = max(elapsed, 1e-9)
+
+    print(f"\nArchivos: {len(processed)} procesados, {len(skipped)} sin cambios, {len(failed)} fallidos")
+    print(f"Filas: {rows_in} leídas, {rows_out} exportadas")
+    print(f"Tiempo: {elapsed:.2f} s ({len(processed) / elapsed:.2f} archivos/s, {rows_in / elapsed:.0f} filas/s)")
+    for outcome in failed:
+        print(f"  FALLIDO {outcome.path}: {outcome.detail}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Procesar planillas SIU por lotes y generar los CSV de SIGEAD")
+    parser.add_argument('inputs', nargs='+', help="Directorios, archivos o patrones (admite **)")
+    parser.add_argument('--manifest', required=True, help="Manifiesto JSON con los datos de cada comisión")
+    parser.add_argument('--output', default='salida', help="Directorio de los CSV generados (por defecto: salida)")
+    parser.add_argument('--workers', type=int, default=PROCESS_POOL_WORKERS,
+                        help=f"Procesos trabajadores (por defecto: {PROCESS_POOL_WORKERS}; 1 procesa en este proceso)")
+    parser.add_argument('--index', help=f"Índice de hashes (por defecto: <output>/{INDEX_FILENAME})")
+    parser.add_argument('--force', action='store_true', help="Procesar también las planillas sin cambios")
+    parser.add_argument('--verbose', action='store_true', help="Mostrar el log del procesamiento")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        manifest = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo leer el manifiesto: {str(e)}", file=sys.stderr)
+        return 2
+
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        print("No se encontraron planillas", file=sys.stderr)
+        return 2
+
+    output_dir = Path(args.output)
+    index = HashIndex(args.index or output_dir / INDEX_FILENAME)
+    start = time.perf_counter()
+    outcomes = run(paths, manifest, output_dir, index, args.workers, args.force)
+    print_summary(outcomes, time.perf_counter() - start)
+    return 1 if any(outcome.status == 'fallido' for outcome in outcomes) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
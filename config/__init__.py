@@ -5,8 +5,16 @@ Módulo de configuración de la aplicación
 from .settings import *
 
 __all__ = [
-    'BASE_DIR', 'DEBUG', 'SECRET_KEY', 'MAX_FILE_SIZE', 'ALLOWED_EXTENSIONS',
-    'REQUIRED_COLUMNS', 'FACULTY_FILTER', 'MIN_GRADE', 'MAX_GRADE',
+    'BASE_DIR', 'DEBUG', 'SECRET_KEY', 'MAX_FILE_SIZE', 'ALLOWED_EXTENSIONS', 'UPLOAD_SPOOL_MAX_MEMORY',
+    'ARTIFACT_DIR', 'ARTIFACT_TTL_SECONDS', 'ARTIFACT_SWEEP_INTERVAL', 'ARTIFACT_GZIP_LEVEL',
+    'REQUIRED_COLUMNS', 'PIPELINE_COLUMNS', 'CATEGORY_COLUMNS', 'FACULTY_FILTER', 'MIN_GRADE', 'MAX_GRADE',
+    'DNI_DUPLICATE_POLICY',
+    'READ_CHUNK_SIZE', 'SPREADSHEET_ENGINE', 'PROCESSING_ENGINE', 'LITE_UNSUPPORTED_EXTENSIONS', 'RESULT_CACHE_MAX_BYTES',
+    'SNAPSHOT_DB',
+    'PROCESSING_BACKEND', 'PROCESS_POOL_WORKERS', 'PROCESS_POOL_MAX_TASKS_PER_CHILD',
+    'ASYNC_JOBS_ENABLED', 'JOB_WORKERS', 'JOB_QUEUE_MAX_DEPTH', 'JOB_RESULT_TTL_SECONDS',
+    'BATCH_MAX_FILES', 'BATCH_MAX_SIZE', 'BATCH_WORKERS', 'SHEET_WORKERS',
+    'METRICS_TRACK_MEMORY',
     'LOG_LEVEL', 'LOG_FILE', 'VERCEL_DEPLOYMENT'
 ]
 
@@ -2,6 +2,7 @@
 Configuración centralizada de la aplicación
 """
 import os
+import tempfile
 from pathlib import Path
 
 # Configuración base
@@ -10,18 +11,73 @@ DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
 
 # Configuración de archivos
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
-ALLOWED_EXTENSIONS = {'.xlsx', '.xls'}
+ALLOWED_EXTENSIONS = {'.xlsx', '.xls', '.csv', '.tsv'}
+# Bytes de cada archivo subido que se guardan en memoria antes de pasar a un archivo temporal en disco
+# (con PROCESSING_BACKEND=process el archivo se lee completo en memoria igual, para enviarlo al trabajador)
+UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv('UPLOAD_SPOOL_MAX_MEMORY', 512 * 1024))
 UPLOAD_FOLDER = BASE_DIR / 'uploads'
 TEMP_FOLDER = BASE_DIR / 'temp'
 
+# Configuración de archivos generados (índice compartido entre procesos)
+ARTIFACT_DIR = Path(os.getenv('ARTIFACT_DIR', Path(tempfile.gettempdir()) / 'adecuador_artifacts'))
+ARTIFACT_TTL_SECONDS = int(os.getenv('ARTIFACT_TTL_SECONDS', 3600))  # 1 hora
+ARTIFACT_SWEEP_INTERVAL = int(os.getenv('ARTIFACT_SWEEP_INTERVAL', 300))
+# Nivel de compresión de la copia gzip de cada archivo (0 no guarda copia comprimida)
+ARTIFACT_GZIP_LEVEL = int(os.getenv('ARTIFACT_GZIP_LEVEL', 6))
+
 # Configuración de procesamiento
 REQUIRED_COLUMNS = [
     'Legajo', 'Nota', 'Promocionado', 'Apellido', 
     'Nombre', 'DNI', 'Edicion', 'Fecha de inicio', 'Facultad regional'
 ]
+# Columnas que usa el procesamiento (el resto solo se valida en el encabezado)
+PIPELINE_COLUMNS = ['Nota', 'Apellido', 'Nombre', 'DNI', 'Fecha de inicio', 'Facultad regional']
+# Columnas de PIPELINE_COLUMNS con pocos valores distintos que se cargan como categorías
+CATEGORY_COLUMNS = ['Nota', 'Facultad regional']
 FACULTY_FILTER = ['FRBA', 'UTN FRBA']
 MIN_GRADE = 1
 MAX_GRADE = 10
+# Fila que se exporta de un DNI repetido: 'first' (primera), 'last' (última) o 'max' (nota más alta)
+DNI_DUPLICATE_POLICY = os.getenv('DNI_DUPLICATE_POLICY', 'first')
+# Filas por bloque al leer la planilla en streaming
+READ_CHUNK_SIZE = int(os.getenv('READ_CHUNK_SIZE', 5000))
+# Motor de lectura de planillas: 'auto' (openpyxl en .xlsx, calamine si está instalado en .xls),
+# 'calamine', 'openpyxl' o 'xlrd'
+SPREADSHEET_ENGINE = os.getenv('SPREADSHEET_ENGINE', 'auto')
+# Motor de procesamiento: 'pandas' (columnar) o 'lite' (solo openpyxl y csv, arranque más rápido; sin .xls)
+PROCESSING_ENGINE = os.getenv('PROCESSING_ENGINE', 'pandas')
+# Extensiones que el motor liviano no lee: con PROCESSING_ENGINE=lite se rechazan al recibirlas
+LITE_UNSUPPORTED_EXTENSIONS = {'.xls'}
+
+# Instantáneas por comisión de lo último exportado (modo de cambios); conviene una ruta persistente
+SNAPSHOT_DB = Path(os.getenv('SNAPSHOT_DB', Path(tempfile.gettempdir()) / 'adecuador_snapshots' / 'snapshots.sqlite3'))
+
+# Configuración de caché de resultados (bytes totales de CSV y errores)
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Backend de ejecución del procesamiento: 'inline' (mismo hilo) o 'process' (grupo de procesos)
+PROCESSING_BACKEND = os.getenv('PROCESSING_BACKEND', 'inline')
+PROCESS_POOL_WORKERS = int(os.getenv('PROCESS_POOL_WORKERS', os.cpu_count() or 1))
+PROCESS_POOL_MAX_TASKS_PER_CHILD = int(os.getenv('PROCESS_POOL_MAX_TASKS_PER_CHILD', 50))
+
+# Configuración de procesamiento asíncrono (opcional)
+ASYNC_JOBS_ENABLED = os.getenv('ASYNC_JOBS_ENABLED', 'False').lower() == 'true'
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_QUEUE_MAX_DEPTH = int(os.getenv('JOB_QUEUE_MAX_DEPTH', 20))
+# Segundos que se conserva el estado de un trabajo desde que termina
+JOB_RESULT_TTL_SECONDS = int(os.getenv('JOB_RESULT_TTL_SECONDS', 3600))
+
+# Configuración de lotes: varias planillas en una solicitud, con un ZIP como respuesta
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', 50))
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', 128 * 1024 * 1024))  # 128MB por solicitud
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 4))
+
+# Configuración de libros con varias hojas: hojas de un mismo libro que se procesan a la vez en el
+# grupo de procesos (PROCESSING_BACKEND=process); con el backend inline se procesan una tras otra
+SHEET_WORKERS = int(os.getenv('SHEET_WORKERS', min(4, os.cpu_count() or 1)))
+
+# Configuración de métricas: estimar el pico de memoria con tracemalloc (agrega costo)
+METRICS_TRACK_MEMORY = os.getenv('METRICS_TRACK_MEMORY', 'False').lower() == 'true'
 
 # Configuración de logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -1,13 +1,20 @@
 // Configuración de la aplicación
 const CONFIG = {
     MAX_FILE_SIZE: 16 * 1024 * 1024, // 16MB
-    ALLOWED_EXTENSIONS: ['xls', 'xlsx'],
-    DATE_FORMAT: 'DD/MM/YYYY'
+    ALLOWED_EXTENSIONS: ['xls', 'xlsx', 'csv', 'tsv'],
+    DATE_FORMAT: 'DD/MM/YYYY',
+    JOB_POLL_INTERVAL: 1000, // ms antes de la primera consulta de estado en modo asíncrono
+    JOB_POLL_MAX_INTERVAL: 10000, // ms máximos entre consultas (el intervalo crece 1,5 veces por consulta)
+    JOB_POLL_MAX_ATTEMPTS: 120, // consultas antes de dar el trabajo por perdido (unos 20 minutos)
+    PREFLIGHT_PART_SIZE: 64 * 1024, // bytes del inicio y del final del archivo enviados a /preflight
+    PREFLIGHT_MAX_ROUNDS: 6, // consultas a /preflight por archivo (cada una puede pedir otro tramo)
+    PREFLIGHT_MAX_BYTES: 1024 * 1024 // bytes enviados como máximo; con más se deja la revisión al envío
 };
 
 // Clase principal de la aplicación
 class AdecuadorApp {
     constructor() {
+        this.preflightToken = 0; // identifica la última revisión de encabezado pedida
         this.initializeElements();
         this.bindEvents();
         this.loadSavedFormValues();
@@ -126,19 +133,91 @@ class AdecuadorApp {
                 this.fileList.innerText = `📄 Archivo seleccionado: ${fileName}`;
                 this.dropZone.classList.add("file-loaded");
                 this.hideError();
+                this.runPreflight(file);
             } else {
+                this.preflightToken++;
                 this.fileList.innerText = "No hay archivo seleccionado";
                 this.dropZone.classList.remove("file-loaded");
-                this.showError("El formato del archivo no es válido. Por favor, seleccione un archivo Excel (.xls o .xlsx)");
+                this.showError("El formato del archivo no es válido. Por favor, seleccione un archivo Excel (.xls o .xlsx) o CSV (.csv o .tsv)");
                 this.fileInput.value = "";
             }
         } else {
+            this.preflightToken++;
             this.fileList.innerText = "No hay archivo seleccionado";
             this.dropZone.classList.remove("file-loaded");
             this.hideError();
         }
     }
 
+    // Revisar el encabezado apenas se elige el archivo, sin esperar al envío del formulario.
+    // Se envían solo el inicio y el final del archivo; si el servidor necesita otro tramo
+    // (por ejemplo, el comienzo de la hoja de un .xlsx) lo indica en missing_range.
+    async runPreflight(file) {
+        const token = ++this.preflightToken;
+        if (file.size > CONFIG.MAX_FILE_SIZE) {
+            this.showError("El archivo es demasiado grande");
+            return;
+        }
+
+        const headSize = Math.min(file.size, CONFIG.PREFLIGHT_PART_SIZE);
+        const tailStart = Math.max(file.size - CONFIG.PREFLIGHT_PART_SIZE, headSize);
+        const parts = [[0, headSize]];
+        if (tailStart < file.size) {
+            parts.push([tailStart, file.size - tailStart]);
+        }
+
+        try {
+            let data = null;
+            for (let round = 0; round < CONFIG.PREFLIGHT_MAX_ROUNDS; round++) {
+                const formData = new FormData();
+                formData.append("filename", file.name);
+                formData.append("size", file.size);
+                for (const [offset, length] of parts) {
+                    formData.append("offset", offset);
+                    formData.append("part", file.slice(offset, offset + length));
+                }
+                const response = await fetch("/preflight", {
+                    method: "POST",
+                    body: formData
+                });
+                data = await response.json();
+
+                // Si mientras tanto se eligió otro archivo, la respuesta ya no sirve
+                if (token !== this.preflightToken) {
+                    return;
+                }
+                if (!data.missing_range) {
+                    break;
+                }
+                const sent = parts.reduce((total, [, length]) => total + length, 0);
+                if (sent + data.missing_range[1] > CONFIG.PREFLIGHT_MAX_BYTES) {
+                    break;
+                }
+                parts.push(data.missing_range);
+            }
+
+            // Sin el encabezado no hay aviso: el envío del formulario valida el archivo completo
+            if (data.missing_range) {
+                return;
+            }
+
+            if (data.error) {
+                this.showError(data.error, data.detailed_errors || []);
+            } else if (!data.valid) {
+                const detailedErrors = [...data.detailed_errors];
+                if (data.column_diff.missing.length > 0) {
+                    detailedErrors.push(`Columnas faltantes: ${data.column_diff.missing.join(", ")}`);
+                }
+                this.showError("El archivo no tiene la estructura correcta", detailedErrors);
+            } else if (data.estimated_rows !== null) {
+                this.fileList.innerText = `📄 Archivo seleccionado: ${file.name} (~${data.estimated_rows} filas)`;
+            }
+        } catch (error) {
+            // La revisión es solo un aviso: el envío del formulario vuelve a validar el archivo
+            console.log("No se pudo revisar el encabezado:", error);
+        }
+    }
+
     // Manejar envío del formulario
     async handleFormSubmit() {
         if (!this.fileInput.files || this.fileInput.files.length === 0) {
@@ -150,6 +229,10 @@ class AdecuadorApp {
         sessionStorage.setItem('formSubmitted', 'true');
 
         const formData = new FormData(this.form);
+        const asyncJobs = this.form.dataset.asyncJobs === "true";
+        if (asyncJobs) {
+            formData.append("async", "1");
+        }
         
         try {
             const response = await fetch("/", {
@@ -157,12 +240,17 @@ class AdecuadorApp {
                 body: formData
             });
             
-            const data = await response.json();
+            let data = await response.json();
+            
+            // En modo asíncrono el servidor responde con un trabajo a consultar
+            if (data.job_id) {
+                data = await this.pollJob(data.status_url);
+            }
             
             if (data.error) {
                 console.log("Error recibido:", data.error);
                 console.log("Errores detallados:", data.detailed_errors);
-                this.showError(data.error, data.detailed_errors || []);
+                this.showError(data.error, data.detailed_errors || [], data.processed_file_errores);
             } else {
                 console.log("Procesamiento exitoso:", data);
                 this.hideError();
@@ -174,6 +262,25 @@ class AdecuadorApp {
         }
     }
 
+    // Consultar el estado de un trabajo asíncrono hasta que termine, espaciando las consultas
+    async pollJob(statusUrl) {
+        let interval = CONFIG.JOB_POLL_INTERVAL;
+        for (let attempt = 0; attempt < CONFIG.JOB_POLL_MAX_ATTEMPTS; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, interval));
+            interval = Math.min(interval * 1.5, CONFIG.JOB_POLL_MAX_INTERVAL);
+            
+            const response = await fetch(statusUrl);
+            const data = await response.json();
+            
+            if (data.status === "done" || data.status === "failed" || !response.ok) {
+                return data;
+            }
+        }
+        return {
+            error: "El procesamiento está demorando más de lo esperado. Por favor, inténtelo de nuevo más tarde."
+        };
+    }
+
     // Mostrar sección de descarga
     showDownloadSection(data) {
         this.form.style.display = "none";
@@ -181,6 +288,17 @@ class AdecuadorApp {
         
         document.getElementById("uploaded-file-name").textContent = data.uploaded_filename;
 
+        // En el modo de cambios se informa qué se exporta respecto de la instantánea anterior
+        const deltaSummary = document.getElementById("delta-summary");
+        if (data.delta) {
+            deltaSummary.textContent = data.delta.had_snapshot
+                ? `Cambios exportados: ${data.delta.new} alumnos nuevos y ${data.delta.changed} notas modificadas (${data.delta.unchanged} sin cambios).`
+                : `Primera exportación de la comisión: se exportan los ${data.delta.new} alumnos.`;
+            deltaSummary.style.display = "block";
+        } else {
+            deltaSummary.style.display = "none";
+        }
+
         const alumnosLink = document.getElementById("download-alumnos");
         alumnosLink.href = data.processed_file_alumnos;
         alumnosLink.style.display = "inline-block";
@@ -188,6 +306,15 @@ class AdecuadorApp {
         const notasLink = document.getElementById("download-notas");
         notasLink.href = data.processed_file_notas;
         notasLink.style.display = "inline-block";
+
+        const zipLink = document.getElementById("download-zip");
+        zipLink.href = data.processed_file_zip;
+        zipLink.style.display = "inline-block";
+
+        // El reporte de errores solo existe si alguna fila tuvo errores
+        const erroresLink = document.getElementById("download-errores");
+        erroresLink.href = data.processed_file_errores || "#";
+        erroresLink.style.display = data.processed_file_errores ? "inline-block" : "none";
     }
 
     // Reiniciar proceso
@@ -196,6 +323,7 @@ class AdecuadorApp {
         this.downloadSection.style.display = "none";
         
         this.fileInput.value = "";
+        this.preflightToken++;
         this.fileList.innerText = "No hay archivo seleccionado";
         this.dropZone.classList.remove("file-loaded");
         
@@ -283,7 +411,7 @@ class AdecuadorApp {
     }
 
     // Mostrar error
-    showError(message, detailedErrors = []) {
+    showError(message, detailedErrors = [], errorReportUrl = null) {
         console.log("Mostrando error:", message);
         console.log("Errores detallados:", detailedErrors);
         
@@ -324,6 +452,13 @@ class AdecuadorApp {
             `;
         }
         
+        // Enlace al reporte completo, con una línea por cada error
+        if (errorReportUrl) {
+            errorContent += `
+                <a class="error-report-link" href="${errorReportUrl}">Descargar reporte completo de errores (CSV)</a>
+            `;
+        }
+        
         errorContent += `
                     <button id="show-requirements" type="button" class="requirements-btn">
                         <span class="btn-icon">📋</span>
@@ -350,8 +485,8 @@ class AdecuadorApp {
     createDynamicErrorMessage(message) {
         const errorMessages = {
             'No se ha seleccionado ningún archivo': 'No has seleccionado ningún archivo para procesar. Por favor, arrastra un archivo Excel o haz clic para seleccionarlo.',
-            'Archivo no válido': 'El archivo seleccionado no es válido. Asegúrate de que sea un archivo Excel (.xlsx o .xls).',
-            'El formato del archivo no es válido': 'El archivo debe ser un archivo Excel (.xlsx o .xls). Por favor, verifica el formato y vuelve a intentarlo.',
+            'Archivo no válido': 'El archivo seleccionado no es válido. Asegúrate de que sea un archivo Excel (.xlsx o .xls) o CSV.',
+            'El formato del archivo no es válido': 'El archivo debe ser un archivo Excel (.xlsx o .xls) o CSV (.csv o .tsv). Por favor, verifica el formato y vuelve a intentarlo.',
             'El archivo es demasiado grande': 'El archivo excede el tamaño máximo permitido de 16MB. Por favor, comprime el archivo o selecciona uno más pequeño.',
             'Archivo con formato incorrecto': 'El archivo no tiene el formato correcto. Debe ser un archivo Excel con exactamente 9 columnas en el orden especificado.',
             'Campos requeridos faltantes': 'Faltan campos obligatorios en el formulario. Por favor, completa todos los campos marcados como requeridos.',
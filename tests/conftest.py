@@ -0,0 +1,39 @@
+"""
+Datos comunes de las pruebas de procesamiento de planillas
+"""
+import pytest
+
+from config.settings import REQUIRED_COLUMNS
+
+FORM_DATA = {
+    'campo1': 'Ingeniería', 'campo2': 'K1001', 'campo3': 'Matemática',
+    'campo4': '2024', 'campo5': '01/07/2024', 'campo6': '15/07/2024',
+}
+
+
+def roster_row(index: int, apellido: str = None) -> list:
+    """Fila válida de una exportación de SIU Guaraní, en el orden de ``REQUIRED_COLUMNS``"""
+    return [
+        str(100000 + index), str(index % 10 + 1), 'No', apellido or f"Apellido{index}",
+        f"Nombre{index}", str(30000000 + index), '2024', '01/03/2024', 'FRBA',
+    ]
+
+
+@pytest.fixture
+def form_data() -> dict:
+    return dict(FORM_DATA)
+
+
+@pytest.fixture
+def header() -> list:
+    return list(REQUIRED_COLUMNS)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Cliente de prueba de la aplicación, con las instantáneas en un directorio temporal"""
+    import app
+    from utils.snapshot_store import SnapshotStore
+
+    monkeypatch.setattr(app, 'snapshot_store', SnapshotStore(tmp_path / 'snapshots.sqlite3'))
+    return app.app.test_client()
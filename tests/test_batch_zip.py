@@ -0,0 +1,92 @@
+"""
+Pruebas del ZIP en streaming y de la descarga de lotes (/batch)
+"""
+import csv
+import io
+import json
+import zipfile
+import zlib
+
+from utils.zip_stream import COPY_BLOCK_SIZE, stream_zip
+from .conftest import FORM_DATA, roster_row
+
+
+def roster_csv(header: list, rows: list) -> bytes:
+    return '\n'.join(','.join(row) for row in [header] + rows).encode('utf-8')
+
+
+def check_crcs(archive: zipfile.ZipFile):
+    assert archive.testzip() is None
+    for info in archive.infolist():
+        assert info.CRC == zlib.crc32(archive.read(info))
+
+
+def test_stream_zip_entries(tmp_path):
+    on_disk = tmp_path / 'grande.csv'
+    on_disk.write_bytes(b'0123456789' * (COPY_BLOCK_SIZE // 4))
+    entries = [
+        ('alumnos.csv', b'dni\n30000001'),
+        ('reporte.csv', iter([b'fila,regla\n', b'2,nota_invalida\n'])),
+        ('grande.csv', on_disk),
+        ('alumnos.csv', b'dni\n30000002'),
+    ]
+
+    chunks = list(stream_zip(entries))
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+
+    # Las partes se entregan a medida que se agregan las entradas
+    assert len(chunks) > len(entries)
+    assert archive.namelist() == ['alumnos.csv', 'reporte.csv', 'grande.csv', 'alumnos_2.csv']
+    assert archive.read('reporte.csv') == b'fila,regla\n2,nota_invalida\n'
+    assert archive.read('grande.csv') == on_disk.read_bytes()
+    assert archive.read('alumnos_2.csv') == b'dni\n30000002'
+    check_crcs(archive)
+
+
+def test_batch_zip_reports_each_file(client, header, monkeypatch):
+    import app
+
+    process_batch_file = app.process_batch_file
+
+    def failing_process(storage, form_data):
+        if storage.filename == 'falla.csv':
+            raise RuntimeError("Error al leer el archivo")
+        return process_batch_file(storage, form_data)
+
+    monkeypatch.setattr(app, 'process_batch_file', failing_process)
+    valid = [roster_row(index) for index in range(3)]
+    with_error = [roster_row(index) for index in range(3, 6)]
+    with_error[1][1] = 'abc'
+    files = [
+        (io.BytesIO(roster_csv(header, valid)), 'k1.csv'),
+        (io.BytesIO(roster_csv(header, with_error)), 'k2.csv'),
+        (io.BytesIO(b'x'), 'notas.txt'),
+        (io.BytesIO(roster_csv(header, valid)), 'falla.csv'),
+    ]
+    metadata = [{'campo2': 'K1'}, {'campo2': 'K2'}, {'campo2': 'K3'}, {'campo2': 'K4'}]
+
+    response = client.post('/batch', data={**FORM_DATA, 'files': files, 'metadata': json.dumps(metadata)},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    check_crcs(archive)
+    names = archive.namelist()
+    assert names[-1] == 'Reporte_Lote.csv'
+    assert sorted(name.rsplit('_', 2)[0] for name in names[:-1]) == [
+        'Errores_K2_Matemática', 'Subir_Alumnos_K1_Matemática', 'Subir_Alumnos_K2_Matemática',
+        'Subir_Notas_K1_Matemática', 'Subir_Notas_K2_Matemática',
+    ]
+    notas_k1 = next(name for name in names if name.startswith('Subir_Notas_K1'))
+    assert archive.read(notas_k1).decode('utf-8').count('\n') == 3
+
+    report = list(csv.reader(io.StringIO(archive.read('Reporte_Lote.csv').decode('utf-8'))))
+    assert report[0] == ['archivo', 'estado', 'registros', 'detalle']
+    assert [row[:3] for row in report[1:]] == [
+        ['k1.csv', 'procesado', '3'], ['k2.csv', 'procesado', '2'],
+        ['notas.txt', 'rechazado', '0'], ['falla.csv', 'rechazado', '0'],
+    ]
+    assert report[2][3].startswith("Fila 2: Nota 'abc'")
+    assert report[3][3].startswith('Formato de archivo no válido')
+    assert report[4][3] == 'Error interno del servidor'
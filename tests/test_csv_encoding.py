@@ -0,0 +1,45 @@
+"""
+Pruebas de la detección de codificación de los CSV
+"""
+import io
+
+import pytest
+
+from utils.file_format import CSV_SAMPLE_SIZE, utf8_stream
+from utils.file_processor import FileProcessor
+from utils.lite_processor import LiteProcessor
+from .conftest import roster_row
+
+ROWS = 3000
+
+
+def latin1_csv(header: list) -> bytes:
+    """CSV en Latin-1 cuyo primer byte no ASCII queda después de la muestra inicial"""
+    lines = [','.join(header)] + [','.join(roster_row(index)) for index in range(ROWS)]
+    lines.append(','.join(roster_row(ROWS, apellido='Muñoz')))
+    data = '\n'.join(lines).encode('latin-1')
+    assert data.index('ñ'.encode('latin-1')) > CSV_SAMPLE_SIZE
+    return data
+
+
+@pytest.mark.parametrize('processor_class', [FileProcessor, LiteProcessor])
+def test_latin1_after_sample(processor_class, header, form_data):
+    result = processor_class().process_excel_file(io.BytesIO(latin1_csv(header)), 'padron.csv', form_data)
+
+    assert result['success'], result.get('error')
+    assert result['total_records'] == ROWS + 1
+    assert f"{30000000 + ROWS},".encode() in result['notas_csv']
+
+
+@pytest.mark.parametrize('data', [
+    'Muñoz;€\n'.encode('utf-8'),
+    'Muñoz;'.encode('utf-8') + 'Peña\n'.encode('latin-1'),
+    b'abc\xe2\x82',
+])
+def test_utf8_stream_falls_back_at_first_invalid_byte(data):
+    try:
+        expected = data.decode('utf-8')
+    except UnicodeDecodeError as error:
+        expected = data[:error.start].decode('utf-8') + data[error.start:].decode('latin-1')
+
+    assert utf8_stream(io.BytesIO(data), 'utf-8').read().decode('utf-8') == expected
@@ -0,0 +1,79 @@
+"""
+Pruebas de las políticas de DNIs repetidos en los índices columnar y fila por fila
+"""
+import csv
+
+import pytest
+
+from utils.dni_index import DNI_DUPLICATE_POLICIES, DniIndex, RowDniIndex
+from utils.error_report import ErrorReport
+from utils.processor_base import BaseProcessor
+from utils.validation_rules import RowErrorReport
+
+# Filas (número, DNI, nota) en dos bloques: 30000001..30000003 se repiten entre
+# bloques y 30000004 dentro del segundo, con una nota no numérica
+CHUNKS = [
+    [(2, '30000001', '7'), (3, '30000002', '8'), (4, '30000003', '5'), (5, '30000001', '7')],
+    [(6, '30000002', '10'), (7, '30000001', '6'), (8, '30000003', '5'),
+     (9, '30000004', 'ausente'), (10, '30000004', '4')],
+]
+
+EXPECTED = {
+    'first': [('30000001', '7'), ('30000002', '8'), ('30000003', '5'), ('30000004', 'ausente')],
+    'last': [('30000002', '10'), ('30000001', '6'), ('30000003', '5'), ('30000004', '4')],
+    'max': [('30000001', '7'), ('30000003', '5'), ('30000002', '10'), ('30000004', '4')],
+}
+
+# Todas las filas se informan; solo 30000003 repite siempre la misma nota
+EXPECTED_REPORT = [
+    (2, 'dni_notas_distintas'), (3, 'dni_notas_distintas'), (4, 'dni_repetido'),
+    (5, 'dni_notas_distintas'), (6, 'dni_notas_distintas'), (7, 'dni_notas_distintas'),
+    (8, 'dni_repetido'), (9, 'dni_notas_distintas'), (10, 'dni_notas_distintas'),
+]
+
+
+def resolve_columnar(policy: str, chunks: list) -> tuple:
+    index = DniIndex(policy)
+    for chunk in chunks:
+        index.add(*zip(*chunk))
+    report = ErrorReport({'dni_policy': DNI_DUPLICATE_POLICIES[policy]})
+    resolved = index.resolve(report, BaseProcessor._parse_grade)
+    return (None if resolved is None else list(zip(*resolved))), report
+
+
+def resolve_rows(policy: str, chunks: list) -> tuple:
+    index = RowDniIndex(policy)
+    for chunk in chunks:
+        for row, dni, nota in chunk:
+            index.add(row, dni, nota)
+    report = RowErrorReport({'dni_policy': DNI_DUPLICATE_POLICIES[policy]})
+    return index.resolve(report, BaseProcessor._parse_grade), report
+
+
+def report_rules(report) -> list:
+    lines = list(csv.reader(b''.join(report.iter_csv()).decode('utf-8').splitlines()))
+    return [(int(line[0]), line[1]) for line in lines[1:]]
+
+
+@pytest.mark.parametrize('resolve', [resolve_columnar, resolve_rows])
+@pytest.mark.parametrize('policy', list(DNI_DUPLICATE_POLICIES))
+def test_duplicate_policy_chooses_row(resolve, policy):
+    resolved, report = resolve(policy, CHUNKS)
+
+    assert resolved == EXPECTED[policy]
+    assert report_rules(report) == EXPECTED_REPORT
+    assert DNI_DUPLICATE_POLICIES[policy] in report.summary()[0]
+
+
+@pytest.mark.parametrize('resolve', [resolve_columnar, resolve_rows])
+def test_without_duplicates_nothing_is_rebuilt(resolve):
+    resolved, report = resolve('max', [[(2, '30000001', '7')], [(3, '30000002', '8')]])
+
+    assert resolved is None
+    assert len(report) == 0
+
+
+@pytest.mark.parametrize('index_class', [DniIndex, RowDniIndex])
+def test_unknown_policy_is_rejected(index_class):
+    with pytest.raises(ValueError):
+        index_class('mayor')
@@ -0,0 +1,63 @@
+"""
+Pruebas de la descarga de archivos procesados (/download)
+"""
+import gzip
+
+import pytest
+
+from utils.artifact_store import ArtifactStore
+
+NOTAS_CSV = ('Subir_Notas_K1001_Matemática.csv', b'dni,nota\n' + b'30000001,7\n' * 500)
+
+
+@pytest.fixture
+def artifact_store(tmp_path, monkeypatch):
+    import app
+
+    store = ArtifactStore(tmp_path / 'artifacts', ttl_seconds=600)
+    monkeypatch.setattr(app, 'artifact_store', store)
+    return store
+
+
+def download(client, file_id: str, accept_encoding: str = None):
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    return client.get(f'/download?file_id={file_id}&file_type=notas', headers=headers)
+
+
+@pytest.mark.parametrize('accept_encoding', [None, 'identity', 'gzip;q=0, identity'])
+def test_download_without_gzip(client, artifact_store, accept_encoding):
+    response = download(client, artifact_store.store({'notas': NOTAS_CSV}), accept_encoding)
+
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == NOTAS_CSV[1]
+
+
+@pytest.mark.parametrize('accept_encoding', ['gzip', 'gzip, deflate, br'])
+def test_download_with_gzip(client, artifact_store, accept_encoding):
+    response = download(client, artifact_store.store({'notas': NOTAS_CSV}), accept_encoding)
+
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(response.data) < len(NOTAS_CSV[1])
+    assert gzip.decompress(response.data) == NOTAS_CSV[1]
+
+
+def test_download_without_gzip_copy(client, artifact_store):
+    artifact_store.gzip_level = 0
+    response = download(client, artifact_store.store({'notas': NOTAS_CSV}), 'gzip')
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == NOTAS_CSV[1]
+
+
+@pytest.mark.parametrize('accept_encoding', [None, 'gzip'])
+def test_download_cache_headers(client, artifact_store, accept_encoding):
+    response = download(client, artifact_store.store({'notas': NOTAS_CSV}), accept_encoding)
+
+    # Las respuestas con y sin gzip se guardan por separado hasta que vence el file_id
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    cache_control = response.headers['Cache-Control']
+    assert cache_control.startswith('private, max-age=')
+    assert 590 <= int(cache_control.rsplit('=', 1)[1]) <= 600
+    assert 'Subir_Notas_K1001_Matem' in response.headers['Content-Disposition']
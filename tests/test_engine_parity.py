@@ -0,0 +1,88 @@
+"""
+Pruebas del contrato común de los motores de procesamiento (pandas y liviano)
+"""
+import io
+from datetime import datetime
+
+import openpyxl
+import pytest
+
+from utils.file_processor import FileProcessor
+from utils.lite_processor import LiteProcessor
+from utils.processor_base import SpreadsheetRules
+from utils.validation_rules import parse_date_text
+from .conftest import roster_row
+
+# Fechas de inicio escritas de distintas formas; las dos últimas no son fechas
+FECHAS = [
+    '01/03/2024', '2024-03-01', 'March 3 2024', '3 Mar 2024', '2024.03.01', '20240301',
+    '2024-03-01T10:00:00', datetime(2024, 3, 1), '', '7', 'el lunes',
+]
+
+
+def roster_rows() -> list:
+    """Filas con fechas variadas, una nota inválida, un DNI inválido y un DNI repetido"""
+    rows = []
+    for index, fecha in enumerate(FECHAS):
+        row = roster_row(index)
+        row[7] = fecha
+        rows.append(row)
+    rows[1][1] = 'abc'
+    rows[2][5] = '123'
+    rows.append(list(rows[3]))
+    return rows
+
+
+def roster_xlsx(header: list) -> bytes:
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for row in roster_rows():
+        sheet.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def roster_csv(header: list) -> bytes:
+    lines = [header] + [[str(value) for value in row] for row in roster_rows()]
+    return '\n'.join(','.join(line) for line in lines).encode('utf-8')
+
+
+def comparable(result: dict) -> dict:
+    """Resultado sin mediciones, con el reporte de errores como CSV"""
+    result = dict(result)
+    result.pop('stats')
+    result['error_report'] = b''.join(result['error_report'].iter_csv())
+    result['export_columns'] = [list(column) for column in result['export_columns']]
+    return result
+
+
+@pytest.mark.parametrize('filename, build', [('notas.xlsx', roster_xlsx), ('notas.csv', roster_csv)])
+def test_engines_return_the_same_result(filename, build, header, form_data):
+    file_bytes = build(header)
+    pandas_result = FileProcessor().process_excel_file(io.BytesIO(file_bytes), filename, form_data)
+    lite_result = LiteProcessor().process_excel_file(io.BytesIO(file_bytes), filename, form_data)
+
+    assert pandas_result['success']
+    assert comparable(lite_result) == comparable(pandas_result)
+    report = comparable(pandas_result)['error_report'].decode('utf-8')
+    assert "Fecha '7'" in report and "Fecha 'el lunes'" in report
+    assert 'March 3 2024' not in report
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('March 3 2024', True), ('2024-03-01T10:00:00Z', True), ('20240301', True),
+    ('7', False), ('abc', False), ('01/01/1500', False), ('2024-13-01', False),
+])
+def test_date_text_follows_pandas_rules(text, expected):
+    assert parse_date_text(text) is expected
+
+
+def test_lite_engine_rejects_xls_with_a_clear_message(header, form_data):
+    result = LiteProcessor().process_excel_file(io.BytesIO(roster_xlsx(header)), 'notas.xls', form_data)
+
+    assert not result['success']
+    assert '.xls no se admiten con el motor de procesamiento liviano' in result['error']
+    assert not SpreadsheetRules('lite').validate_file_extension('notas.xls')
+    assert SpreadsheetRules('pandas').validate_file_extension('notas.xls')
@@ -0,0 +1,89 @@
+"""
+Pruebas de los reportes de errores columnar y fila por fila
+"""
+import csv
+import io
+
+import pytest
+
+from config.settings import REQUIRED_COLUMNS
+from utils.error_report import ErrorReport
+from utils.file_processor import FileProcessor
+from utils.lite_processor import LiteProcessor
+from utils.validation_rules import REPORT_HEADER, RowErrorReport
+from .conftest import roster_row
+
+# Errores (regla, fila, valor) fuera de orden, como los DNIs repetidos que se detectan al final
+ERRORS = [
+    ('nota_invalida', 4, 'abc'), ('dni_invalido', 2, '12'), ('nota_invalida', 7, 'abc'),
+    ('dni_repetido', 3, '30000001'), ('nota_invalida', 2, '1,5'), ('dni_repetido', 9, '30000001'),
+]
+
+
+def columnar_report(errors: list) -> ErrorReport:
+    report = ErrorReport()
+    for rule, row, value in errors:
+        report.add(rule, [row], [value])
+    return report
+
+
+def row_report(errors: list) -> RowErrorReport:
+    report = RowErrorReport()
+    for rule, row, value in errors:
+        report.add(rule, row, value)
+    return report
+
+
+def csv_rows(report, batch_size: int = 2) -> list:
+    return list(csv.reader(io.StringIO(b''.join(report.iter_csv(batch_size)).decode('utf-8'))))
+
+
+@pytest.mark.parametrize('build', [columnar_report, row_report])
+def test_iter_csv_orders_errors_by_row_and_rule(build):
+    # Dentro de una fila, los errores siguen el orden de las reglas
+    rows = csv_rows(build(ERRORS))
+
+    assert rows[0] == REPORT_HEADER
+    assert [(int(row), rule, value) for row, rule, value, _ in rows[1:]] == [
+        (2, 'nota_invalida', '1,5'), (2, 'dni_invalido', '12'), (3, 'dni_repetido', '30000001'),
+        (4, 'nota_invalida', 'abc'), (7, 'nota_invalida', 'abc'), (9, 'dni_repetido', '30000001'),
+    ]
+    assert rows[4][3] == "Nota 'abc' no es un número válido ni un valor especial permitido"
+
+
+def test_reports_write_the_same_csv():
+    columnar, rows = columnar_report(ERRORS), row_report(ERRORS)
+
+    assert b''.join(columnar.iter_csv()) == b''.join(rows.iter_csv())
+    assert b''.join(columnar.iter_csv(batch_size=1)) == b''.join(columnar.iter_csv())
+    assert columnar.summary() == rows.summary()
+    assert (len(columnar), columnar.row_count) == (len(rows), rows.row_count) == (6, 5)
+
+
+@pytest.mark.parametrize('build', [columnar_report, row_report])
+def test_nbytes_stores_each_value_once(build):
+    errors = [('nota_invalida', row, 'abc') for row in range(2, 1002)]
+    report = build(errors)
+
+    # Regla (1 byte), fila (8) y referencia al valor (4) por error, más el valor una sola vez
+    assert report.nbytes == 13 * len(errors) + len('abc')
+    assert build([]).nbytes == 0
+
+
+@pytest.mark.parametrize('processor_class', [FileProcessor, LiteProcessor])
+def test_row_numbers_after_faculty_filter(processor_class, form_data):
+    rows = [roster_row(index) for index in range(5)]
+    # La fila de otra facultad se descarta sin informar su nota inválida ni correr la numeración
+    rows[1][8], rows[1][1] = 'FRC', 'abc'
+    rows[3][1] = 'abc'
+    rows[4][5] = '12'
+    file_bytes = '\n'.join(','.join(row) for row in [REQUIRED_COLUMNS] + rows).encode('utf-8')
+    processor = processor_class()
+    processor.chunk_size = 2
+
+    result = processor.process_excel_file(io.BytesIO(file_bytes), 'notas.csv', form_data)
+
+    assert result['total_records'] == 2
+    assert [(int(row), rule) for row, rule, _, _ in csv_rows(result['error_report'])[1:]] == [
+        (4, 'nota_invalida'), (5, 'dni_invalido'),
+    ]
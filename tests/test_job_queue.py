@@ -0,0 +1,44 @@
+"""
+Pruebas de la cola de trabajos asíncronos
+"""
+import threading
+import time
+
+from utils.job_queue import STATUS_DONE, STATUS_RUNNING, JobQueue
+
+
+def wait_for(queue: JobQueue, job_id: str, status: str):
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job is not None and job['status'] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"El trabajo no llegó al estado {status}")
+
+
+def test_running_jobs_are_not_pruned():
+    release = threading.Event()
+    queue = JobQueue(worker_count=1, result_ttl=0)
+    running = queue.submit(release.wait)
+    wait_for(queue, running, STATUS_RUNNING)
+
+    # Encolar otro trabajo descarta los vencidos; el que sigue ejecutándose no lo está
+    queue.submit(lambda: None)
+    assert queue.get(running)['status'] == STATUS_RUNNING
+
+    release.set()
+    assert wait_for(queue, running, STATUS_DONE)['finished_at'] is not None
+
+
+def test_finished_jobs_expire_from_finish_time():
+    queue = JobQueue(worker_count=1, result_ttl=60)
+    job_id = queue.submit(lambda: 'listo')
+    job = wait_for(queue, job_id, STATUS_DONE)
+    # Un trabajo creado hace más de result_ttl pero terminado recién se conserva
+    queue._jobs[job_id]['created_at'] -= 120
+    queue.submit(lambda: None)
+    assert queue.get(job_id)['result'] == 'listo'
+
+    queue._finished[job_id] = job['finished_at'] - 120
+    queue.submit(lambda: None)
+    assert queue.get(job_id) is None
@@ -0,0 +1,45 @@
+"""
+Pruebas de las mediciones del procesamiento
+"""
+import tracemalloc
+
+import pytest
+
+from utils.metrics import PipelineStats
+
+MB = 2 ** 20
+
+
+@pytest.fixture
+def tracing():
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+
+
+def test_stats_keep_process_peak(tracing):
+    block = bytearray(8 * MB)
+    del block
+    peak = tracemalloc.get_traced_memory()[1]
+
+    stats = PipelineStats()
+    with stats.stage('read'):
+        data = bytearray(MB)
+
+    # Otra ejecución en curso no pierde su pico y el pico anterior no se atribuye a esta
+    assert tracemalloc.get_traced_memory()[1] >= peak
+    assert MB <= stats.peak_memory() < 2 * MB
+    del data
+
+
+def test_stats_see_transient_peak(tracing):
+    stats = PipelineStats()
+    with stats.stage('validate'):
+        block = bytearray(16 * MB)
+        del block
+
+    assert stats.peak_memory() >= 16 * MB
+
+
+def test_stats_without_tracing():
+    assert PipelineStats().peak_memory() is None
@@ -0,0 +1,52 @@
+"""
+Pruebas de la revisión del encabezado a partir de tramos del archivo
+"""
+import io
+
+import openpyxl
+import pytest
+
+from utils.preflight import MissingRange, PartialFile, read_header_preview
+from .conftest import roster_row
+
+PART_SIZE = 4096
+
+
+def preview_from_parts(data: bytes):
+    """Revisar el encabezado como el navegador: inicio y final, y luego los tramos pedidos"""
+    size = len(data)
+    parts = [(0, data[:PART_SIZE]), (max(size - PART_SIZE, PART_SIZE), data[max(size - PART_SIZE, PART_SIZE):])]
+    while True:
+        try:
+            return read_header_preview(PartialFile(size, parts)), sum(len(part) for _, part in parts)
+        except MissingRange as missing:
+            parts.append((missing.offset, data[missing.offset:missing.offset + missing.length]))
+
+
+@pytest.mark.parametrize('file_format', ['xlsx', 'csv'])
+def test_partial_preview_matches_full_file(file_format, header):
+    rows = [roster_row(index) for index in range(5000)]
+    if file_format == 'csv':
+        data = '\n'.join(','.join(row) for row in [header] + rows).encode('utf-8')
+    else:
+        workbook = openpyxl.Workbook()
+        for row in [header] + rows:
+            workbook.active.append(row)
+        output = io.BytesIO()
+        workbook.save(output)
+        data = output.getvalue()
+
+    preview, sent = preview_from_parts(data)
+
+    assert preview == read_header_preview(io.BytesIO(data))
+    assert preview.header == header
+    assert sent < len(data) / 2
+
+
+def test_missing_range_reports_offset():
+    partial = PartialFile(100_000, [(0, b'x' * 10)])
+    partial.seek(50_000)
+    with pytest.raises(MissingRange) as missing:
+        partial.read(10)
+    assert missing.value.offset == 50_000
+    assert missing.value.length == 50_000
@@ -0,0 +1,20 @@
+"""
+Pruebas de los backends de ejecución del procesamiento
+"""
+from utils.processing_backend import InlineBackend, ProcessPoolBackend, create_backend
+
+
+def test_process_backend_starts_workers_when_warmed_up():
+    backend = create_backend('process', warm_up=True)
+    try:
+        assert isinstance(backend, ProcessPoolBackend)
+        assert backend._executor is not None
+    finally:
+        backend.shutdown()
+
+
+def test_inline_backend_has_nothing_to_warm_up():
+    backend = create_backend('inline', warm_up=True)
+    assert isinstance(backend, InlineBackend)
+    # El motor se sigue cargando recién con el primer archivo
+    assert backend._file_processor is None
@@ -0,0 +1,20 @@
+"""
+Pruebas de la elección del motor de lectura
+"""
+import io
+
+import openpyxl
+
+from utils.spreadsheet_reader import OpenpyxlSheetReader, open_sheet_reader
+
+
+def test_auto_reads_xlsx_in_streaming(header):
+    workbook = openpyxl.Workbook()
+    workbook.active.append(header)
+    output = io.BytesIO()
+    workbook.save(output)
+    output.seek(0)
+
+    with open_sheet_reader(output, engine='auto') as reader:
+        assert isinstance(reader, OpenpyxlSheetReader)
+        assert reader.header == header
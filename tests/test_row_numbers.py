@@ -0,0 +1,49 @@
+"""
+Pruebas de la numeración de filas en los errores de contenido
+"""
+import io
+
+import openpyxl
+import pytest
+
+from utils.file_processor import FileProcessor
+from utils.lite_processor import LiteProcessor
+from utils.spreadsheet_reader import READER_ENGINES, open_sheet_reader
+from .conftest import roster_row
+
+
+def workbook_with_blank_rows(header: list) -> bytes:
+    """Planilla con filas vacías entre los datos y notas inválidas en las filas 4 y 7"""
+    rows = [roster_row(index) for index in range(6)]
+    rows[2][1] = rows[5][1] = 'abc'
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for row in [rows[0], rows[1], [], rows[2], rows[3], rows[4], rows[5]]:
+        sheet.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+@pytest.mark.parametrize('engine', ['openpyxl', 'calamine'])
+def test_reader_counts_blank_rows(engine, header):
+    if not READER_ENGINES[engine].is_available():
+        pytest.skip(f"{engine} no está instalado")
+    with open_sheet_reader(io.BytesIO(workbook_with_blank_rows(header)), chunk_size=2, engine=engine) as reader:
+        index = [row for chunk in reader.iter_chunks() for row in chunk.index]
+
+    # Igual que pd.read_excel: la fila vacía ocupa la posición 2
+    assert index == [0, 1, 3, 4, 5, 6]
+
+
+@pytest.mark.parametrize('processor_class', [FileProcessor, LiteProcessor])
+def test_errors_after_blank_row(processor_class, header, form_data):
+    processor = processor_class()
+    processor.chunk_size = 2
+    result = processor.process_excel_file(io.BytesIO(workbook_with_blank_rows(header)), 'padron.xlsx', form_data)
+
+    assert result['success'], result.get('error')
+    assert result['content_errors'] == [
+        "Filas 4, 7: Nota 'abc' no es un número válido ni un valor especial permitido",
+    ]
@@ -0,0 +1,111 @@
+"""
+Pruebas del modo de cambios: columnas exportadas e instantáneas por comisión
+"""
+import io
+
+import pytest
+
+from utils.file_processor import FileProcessor
+from utils.lite_processor import LiteProcessor
+from utils.processor_base import SpreadsheetRules
+from utils.snapshot_store import SnapshotStore
+from .conftest import roster_row
+
+KEY = ('Ingeniería', 'K1001', 'Matemática', '2024')
+
+
+def roster_csv(header: list, rows: list) -> bytes:
+    return '\n'.join(','.join(row) for row in [header] + rows).encode('utf-8')
+
+
+def upload(client, header: list, rows: list, form_data: dict, delta: bool) -> tuple:
+    """Subir la planilla y devolver la respuesta y los DNIs de los CSV de alumnos y de notas"""
+    data = {**form_data, 'file': (io.BytesIO(roster_csv(header, rows)), 'notas.csv')}
+    if delta:
+        data['delta'] = '1'
+    response = client.post('/', data=data, content_type='multipart/form-data')
+    result = response.get_json()
+    assert response.status_code == 200, result
+    return (result, csv_dnis(client.get(result['processed_file_alumnos']).data),
+            csv_dnis(client.get(result['processed_file_notas']).data))
+
+
+def csv_dnis(csv_bytes: bytes) -> list:
+    return [line.split(',')[0] for line in csv_bytes.decode('utf-8').split('\n')[1:]]
+
+
+@pytest.mark.parametrize('processor_class', [FileProcessor, LiteProcessor])
+def test_export_columns_match_csv(processor_class, header, form_data):
+    rows = [roster_row(index) for index in range(5)]
+    # Un DNI repetido: las columnas son las de las filas que quedan en los CSV
+    rows.append(list(rows[1]))
+    result = processor_class().process_excel_file(io.BytesIO(roster_csv(header, rows)), 'x.csv', form_data)
+
+    dnis, notas = result['export_columns']
+    assert list(dnis) == [row[5] for row in rows[:5]]
+    assert list(notas) == [row[1] for row in rows[:5]]
+    alumnos_csv, notas_csv = FileProcessor().build_csv_outputs(dnis, notas, form_data)
+    assert (alumnos_csv, notas_csv) == (result['alumnos_csv'], result['notas_csv'])
+
+
+def test_snapshot_commits_after_block(tmp_path):
+    store = SnapshotStore(tmp_path / 'snapshots.sqlite3')
+    with store.update(KEY, ['30000001', '30000002'], ['7', '8']) as diff:
+        assert diff.new == 2
+    with store.update(KEY, ['30000001', '30000003'], ['9', '6']) as diff:
+        assert (diff.new, diff.changed, diff.unchanged) == (1, 1, 0)
+        assert diff.mask.tolist() == [True, True]
+
+    snapshot = store.load(KEY)
+    assert snapshot.dnis.tolist() == ['30000001', '30000002', '30000003']
+    assert snapshot.notas.tolist() == ['9', '8', '6']
+
+
+def test_snapshot_rolls_back_when_block_fails(tmp_path):
+    store = SnapshotStore(tmp_path / 'snapshots.sqlite3')
+    with store.update(KEY, ['30000001'], ['7']):
+        pass
+
+    # Si no se pudieron guardar los CSV, la próxima exportación vuelve a incluir los cambios
+    with pytest.raises(OSError):
+        with store.update(KEY, ['30000001', '30000002'], ['9', '8']):
+            raise OSError("No hay espacio en el disco")
+
+    snapshot = store.load(KEY)
+    assert snapshot.dnis.tolist() == ['30000001']
+    assert snapshot.notas.tolist() == ['7']
+
+
+@pytest.mark.parametrize('processor', [FileProcessor(), SpreadsheetRules('lite')])
+def test_enroll_filters_only_alumnos_csv(processor, form_data):
+    dnis, notas = ['30000001', '30000002', '30000003'], ['7', '8', '9']
+    alumnos_csv, notas_csv = processor.build_csv_outputs(dnis, notas, form_data, enroll=[False, True, False])
+
+    assert csv_dnis(alumnos_csv) == ['30000002']
+    assert csv_dnis(notas_csv) == dnis
+
+
+def test_delta_enrolls_only_new_students(client, header, form_data):
+    rows = [roster_row(index) for index in range(4)]
+    upload(client, header, rows, form_data, delta=True)
+
+    # Una nota cambiada y un alumno nuevo: solo el nuevo se vuelve a inscribir
+    rows[0][1] = '9'
+    rows.append(roster_row(4))
+    result, alumnos, notas = upload(client, header, rows, form_data, delta=True)
+
+    assert (result['delta']['new'], result['delta']['changed']) == (1, 1)
+    assert alumnos == [rows[4][5]]
+    assert notas == [rows[0][5], rows[4][5]]
+
+
+def test_full_export_updates_snapshot(client, header, form_data):
+    rows = [roster_row(index) for index in range(4)]
+    _, alumnos, notas = upload(client, header, rows, form_data, delta=False)
+    assert alumnos == notas == [row[5] for row in rows]
+
+    # La exportación de cambios siguiente parte de la exportación completa
+    result, alumnos, notas = upload(client, header, rows, form_data, delta=True)
+
+    assert result['delta'] == {'new': 0, 'changed': 0, 'unchanged': 4, 'had_snapshot': True}
+    assert alumnos == notas == []
@@ -0,0 +1,74 @@
+"""
+Pruebas de la recepción de archivos subidos en streaming
+"""
+import io
+import os
+
+import pytest
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from utils.result_cache import ResultCache
+from utils.upload_stream import UploadRequest, UploadSpool
+from .conftest import FORM_DATA
+
+
+def write_in_blocks(spool: UploadSpool, content: bytes, block_size: int = 1024):
+    for start in range(0, len(content), block_size):
+        spool.write(content[start:start + block_size])
+
+
+def test_spool_stays_in_memory_up_to_limit():
+    spool = UploadSpool(max_size=10_000, max_memory=4096)
+    write_in_blocks(spool, os.urandom(4096))
+
+    assert not spool._rolled
+    assert spool.size == 4096
+
+
+def test_spool_rolls_to_disk_past_memory_limit():
+    content = os.urandom(10_000)
+    spool = UploadSpool(max_size=20_000, max_memory=4096)
+    write_in_blocks(spool, content)
+
+    assert spool._rolled
+    spool.seek(0)
+    assert spool.read() == content
+
+
+def test_spool_rejects_oversized_file():
+    spool = UploadSpool(max_size=2048, max_memory=1024)
+    with pytest.raises(RequestEntityTooLarge):
+        write_in_blocks(spool, os.urandom(4096))
+
+
+def test_spool_marks_oversized_file_without_aborting():
+    spool = UploadSpool(max_size=2048, max_memory=1024, abort=False)
+    write_in_blocks(spool, os.urandom(4096))
+
+    # Lo recibido se descarta, pero el tamaño se sigue contando
+    assert spool.oversized
+    assert spool.size == 4096
+    spool.seek(0)
+    assert spool.read() == b''
+
+
+def test_streamed_digest_matches_cache_key():
+    content = os.urandom(300_000)
+    request = UploadRequest.from_values(
+        method='POST', data={**FORM_DATA, 'file': (io.BytesIO(content), 'notas.xlsx')},
+    )
+    spool = request.files['file'].stream
+
+    assert isinstance(spool, UploadSpool)
+    assert spool.size == len(content)
+    assert (ResultCache.make_key(spool.digest, 'notas.xlsx', FORM_DATA)
+            == ResultCache.make_key(content, 'notas.xlsx', FORM_DATA))
+
+
+def test_upload_over_size_limit_returns_413(client, monkeypatch):
+    monkeypatch.setattr(UploadRequest, 'max_file_size', 2048)
+    data = {**FORM_DATA, 'file': (io.BytesIO(os.urandom(4096)), 'notas.xlsx')}
+    response = client.post('/', data=data, content_type='multipart/form-data')
+
+    assert response.status_code == 413
+    assert 'demasiado grande' in response.get_json()['error']
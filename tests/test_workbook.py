@@ -0,0 +1,59 @@
+"""
+Pruebas del procesamiento de libros con varias hojas
+"""
+import io
+
+import openpyxl
+
+from utils.file_processor import FileProcessor
+from utils.processing_backend import ProcessPoolBackend
+from .conftest import roster_row
+
+
+def workbook_with_sheets(header: list) -> bytes:
+    """Libro con dos comisiones y una hoja de resumen que no es una planilla de notas"""
+    workbook = openpyxl.Workbook()
+    workbook.active.title = 'K1001'
+    for index, name in enumerate(['K1001', 'K1002']):
+        sheet = workbook[name] if name in workbook.sheetnames else workbook.create_sheet(name)
+        sheet.append(header)
+        for row in range(5):
+            sheet.append(roster_row(index * 10 + row))
+    workbook.create_sheet('Resumen').append(['Comision', 'Inscriptos'])
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def sheet_outputs(result: dict) -> list:
+    return [(sheet['sheet'], sheet['success'], sheet.get('notas_csv')) for sheet in result['sheets']]
+
+
+def test_header_is_validated_once_per_sheet(header, form_data, monkeypatch):
+    processor = FileProcessor()
+    checked = []
+    validate_header = processor.validate_header
+    monkeypatch.setattr(processor, 'validate_header', lambda *args: checked.append(args[0]) or validate_header(*args))
+
+    result = processor.process_workbook(io.BytesIO(workbook_with_sheets(header)), 'libro.xlsx', form_data)
+
+    assert result['total_records'] == 10
+    assert len(checked) == 3
+
+
+def test_process_pool_matches_inline(header, form_data):
+    file_bytes = workbook_with_sheets(header)
+    overrides = {'K1002': {'campo2': 'K1002'}}
+    inline = FileProcessor().process_workbook(io.BytesIO(file_bytes), 'libro.xlsx', form_data, overrides)
+
+    backend = ProcessPoolBackend(max_workers=2, sheet_workers=2)
+    try:
+        pooled = backend.process_workbook(file_bytes, 'libro.xlsx', form_data, overrides)
+        rejected = backend.process_workbook(file_bytes, 'libro.pdf', form_data)
+    finally:
+        backend.shutdown()
+
+    assert sheet_outputs(pooled) == sheet_outputs(inline)
+    assert [sheet.get('skipped') for sheet in pooled['sheets']] == [None, None, True]
+    assert pooled['total_records'] == inline['total_records'] == 10
+    assert not rejected['success'] and rejected['error'].startswith("Formato de archivo no válido")
@@ -1,8 +1,28 @@
 """
 Módulo de utilidades para la aplicación
+
+Los módulos se importan al pedir cada nombre, de modo que importar el
+paquete no carga pandas.
 """
+from importlib import import_module
+
+# Nombre exportado -> módulo que lo define
+_EXPORTS = {
+    'FileProcessor': '.file_processor',
+    'LiteProcessor': '.lite_processor',
+    'ResultCache': '.result_cache',
+    'ArtifactStore': '.artifact_store',
+    'JobQueue': '.job_queue',
+    'InlineBackend': '.processing_backend',
+    'ProcessPoolBackend': '.processing_backend',
+    'create_backend': '.processing_backend',
+    'create_processor': '.processing_backend',
+}
 
-from .file_processor import FileProcessor
+__all__ = list(_EXPORTS)
 
-__all__ = ['FileProcessor']
 
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
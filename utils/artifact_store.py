@@ -0,0 +1,200 @@
+"""
+Módulo de almacenamiento temporal de archivos generados
+"""
+import gzip
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from config.settings import ARTIFACT_DIR, ARTIFACT_TTL_SECONDS, ARTIFACT_SWEEP_INTERVAL, ARTIFACT_GZIP_LEVEL
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = 'artifacts.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    file_id TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    path TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (file_id, file_type)
+);
+CREATE INDEX IF NOT EXISTS artifacts_expires_at ON artifacts (expires_at);
+"""
+
+
+class Artifact(NamedTuple):
+    """Archivo generado disponible para descarga"""
+    file_id: str
+    file_type: str
+    path: str
+    filename: str
+    created_at: float
+    expires_at: float
+
+    @property
+    def gzip_path(self) -> str:
+        """Ruta de la copia comprimida con gzip (puede no existir)"""
+        return self.path + '.gz'
+
+
+class ArtifactStore:
+    """Almacén de archivos generados con vencimiento.
+
+    Los archivos se guardan en ``base_dir`` y se indexan en una base SQLite en
+    modo WAL dentro del mismo directorio, de modo que cualquier proceso del
+    servidor puede resolver un ``file_id``. El índice sobre ``expires_at``
+    permite registrar, buscar y vencer archivos en O(log n); un hilo en segundo
+    plano elimina periódicamente los vencidos.
+
+    Junto a cada archivo se guarda una copia comprimida con gzip, hecha una
+    sola vez al registrarlo, para servir descargas con ``Content-Encoding``.
+    """
+
+    def __init__(self, base_dir=ARTIFACT_DIR, ttl_seconds: int = ARTIFACT_TTL_SECONDS,
+                 sweep_interval: int = ARTIFACT_SWEEP_INTERVAL, gzip_level: int = ARTIFACT_GZIP_LEVEL):
+        self.base_dir = Path(base_dir)
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self.gzip_level = gzip_level
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.base_dir / INDEX_FILENAME
+        self._local = threading.local()
+        self._sweeper = None
+        self._stop_event = threading.Event()
+
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def store(self, artifacts: Dict[str, Tuple[str, Union[bytes, Iterable[bytes]]]]) -> str:
+        """Guardar archivos y retornar el ``file_id`` que los agrupa.
+
+        ``artifacts`` asocia cada tipo de archivo (``'alumnos'``, ``'notas'``,
+        ``'errores'``) con su nombre de descarga y su contenido, en bytes o
+        como una secuencia de partes que se escriben a medida que se generan.
+        """
+        file_id = str(uuid.uuid4())
+        created_at = time.time()
+        expires_at = created_at + self.ttl_seconds
+
+        rows = []
+        for file_type, (filename, content) in artifacts.items():
+            path = self.base_dir / f"{file_id}_{file_type}.csv"
+            self._write_atomic(path, [content] if isinstance(content, bytes) else content, self.gzip_level)
+            rows.append((file_id, file_type, str(path), filename, created_at, expires_at))
+
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO artifacts (file_id, file_type, path, filename, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return file_id
+
+    def lookup(self, file_id: str, file_type: str) -> Optional[Artifact]:
+        """Buscar un archivo vigente, o None si no existe o ya venció"""
+        row = self._connection().execute(
+            "SELECT file_id, file_type, path, filename, created_at, expires_at FROM artifacts "
+            "WHERE file_id = ? AND file_type = ? AND expires_at > ?",
+            (file_id, file_type, time.time()),
+        ).fetchone()
+        return Artifact(*row) if row else None
+
+    def sweep(self, now: float = None) -> int:
+        """Eliminar los archivos vencidos y retornar cuántos se borraron"""
+        now = time.time() if now is None else now
+        with self._connection() as conn:
+            expired = conn.execute(
+                "SELECT path FROM artifacts WHERE expires_at <= ?", (now,)
+            ).fetchall()
+            conn.execute("DELETE FROM artifacts WHERE expires_at <= ?", (now,))
+
+        for (path,) in expired:
+            for file_path in (path, path + '.gz'):
+                try:
+                    os.remove(file_path)
+                except FileNotFoundError:
+                    # Otro proceso ya lo eliminó (o no tiene copia comprimida)
+                    pass
+                except OSError as e:
+                    logger.warning(f"No se pudo eliminar el archivo vencido {file_path}: {str(e)}")
+
+        if expired:
+            logger.info(f"Archivos vencidos eliminados: {len(expired)}")
+        return len(expired)
+
+    def count(self) -> int:
+        """Cantidad de archivos registrados"""
+        return self._connection().execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+
+    def entries(self) -> List[Artifact]:
+        """Listar todos los archivos registrados (solo para diagnóstico)"""
+        rows = self._connection().execute(
+            "SELECT file_id, file_type, path, filename, created_at, expires_at FROM artifacts "
+            "ORDER BY created_at"
+        ).fetchall()
+        return [Artifact(*row) for row in rows]
+
+    def start_sweeper(self):
+        """Iniciar el hilo que elimina periódicamente los archivos vencidos"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop_event.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name='artifact-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        """Detener el hilo de limpieza"""
+        self._stop_event.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+            self._sweeper = None
+
+    def _sweep_loop(self):
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Error al limpiar archivos vencidos: {str(e)}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión SQLite propia del hilo actual"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._index_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _write_atomic(path: Path, parts: Iterable[bytes], gzip_level: int = 0):
+        """Escribir un archivo completo (y su copia gzip) antes de hacerlo visible"""
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        gzip_path = Path(str(path) + '.gz')
+        gzip_tmp_path = gzip_path.with_suffix('.gz.tmp')
+        with ExitStack() as stack:
+            f = stack.enter_context(open(tmp_path, 'wb'))
+            compressor = None
+            if gzip_level:
+                # mtime=0: la misma entrada siempre produce los mismos bytes
+                compressor = stack.enter_context(gzip.GzipFile(
+                    filename='', fileobj=stack.enter_context(open(gzip_tmp_path, 'wb')),
+                    mode='wb', compresslevel=gzip_level, mtime=0,
+                ))
+            for part in parts:
+                f.write(part)
+                if compressor is not None:
+                    compressor.write(part)
+        os.replace(tmp_path, path)
+        if gzip_level:
+            os.replace(gzip_tmp_path, gzip_path)
@@ -0,0 +1,55 @@
+"""
+Módulo de validación de fechas por columna
+"""
+import logging
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .validation_rules import DATE_PATTERN, NULL_DATE_STRINGS, is_valid_date, parse_date_text
+
+logger = logging.getLogger(__name__)
+
+
+class DateValidator:
+    """Validador de fechas que opera sobre columnas completas.
+
+    Las celdas que ya son fechas (``datetime``/``Timestamp``) se aceptan sin
+    convertirlas a texto. El resto se compara contra ``DATE_PATTERN`` de una
+    sola vez y solo los valores distintos que no coinciden se interpretan con
+    ``parse_date_text``, el mismo criterio del motor liviano, que memoriza
+    los resultados por texto.
+    """
+
+    def is_valid(self, value: str) -> bool:
+        """Validar un único valor de fecha (vacío o nulo es válido)"""
+        return is_valid_date(value)
+
+    def find_invalid(self, values: pd.Series) -> np.ndarray:
+        """Retornar la máscara de valores con formato de fecha inválido.
+
+        Los valores vacíos o nulos no se consideran inválidos (la fecha es
+        opcional).
+        """
+        invalid = np.zeros(len(values), dtype=bool)
+        if len(values) == 0 or pd.api.types.is_datetime64_any_dtype(values):
+            return invalid
+
+        raw = values.to_numpy(dtype=object)
+        native = np.fromiter((isinstance(value, date) for value in raw), dtype=bool, count=len(raw))
+        positions = np.flatnonzero(~native)
+        if len(positions) == 0:
+            return invalid
+
+        text = pd.Series(raw[positions], dtype=object).astype(str).str.strip()
+        candidates = ~text.str.lower().isin(NULL_DATE_STRINGS).to_numpy()
+        candidates[candidates] = ~text[candidates].str.match(DATE_PATTERN).to_numpy(dtype=bool)
+
+        # Solo los textos que no coinciden con ningún formato se interpretan, una vez cada uno
+        leftover = text[candidates]
+        if not leftover.empty:
+            parsed = {value: parse_date_text(value) for value in leftover.unique()}
+            invalid[positions[candidates]] = ~leftover.map(parsed).to_numpy(dtype=bool)
+
+        return invalid
@@ -0,0 +1,207 @@
+"""
+Módulo de detección de DNIs repetidos entre las filas exportadas de una planilla
+"""
+import re
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Sufijo que deja un DNI guardado como número de punto flotante y leído como texto ('12345678.0')
+DNI_FLOAT_ARTIFACT = re.compile(r'\.0+$')
+
+# Políticas para elegir la fila que se exporta de un DNI repetido, con su descripción en los mensajes
+DNI_DUPLICATE_POLICIES = {
+    'first': "la primera fila",
+    'last': "la última fila",
+    'max': "la nota más alta",
+}
+
+
+def normalize_dni(value: str) -> str:
+    """DNI como texto sin el sufijo '.0' de un número de punto flotante"""
+    return DNI_FLOAT_ARTIFACT.sub('', value) if '.' in value else value
+
+
+class BaseDniIndex(ABC):
+    """Parte común de los índices de DNIs exportados.
+
+    Cada fila válida se registra con su número, su DNI normalizado y su nota
+    tal como se exportan. ``resolve`` agrupa las filas por DNI en una pasada
+    de hash; de cada DNI repetido se exporta una sola fila, elegida según
+    ``policy``, y todas sus filas se informan en el reporte de errores:
+    ``dni_repetido`` si las notas coinciden y ``dni_notas_distintas`` si no.
+    """
+
+    def __init__(self, policy: str = 'first'):
+        if policy not in DNI_DUPLICATE_POLICIES:
+            raise ValueError(f"Política de DNIs repetidos no soportada: {policy}")
+        self.policy = policy
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Cantidad de filas registradas"""
+
+    @abstractmethod
+    def columns(self):
+        """Columnas de DNI y nota de todas las filas registradas, en orden"""
+
+    @abstractmethod
+    def resolve(self, report, parse_grade: Callable[[str], Optional[float]]):
+        """Registrar los DNIs repetidos en ``report`` y retornar las filas a exportar.
+
+        Retorna None si no hay DNIs repetidos, de modo que los CSV ya
+        generados no necesitan rearmarse.
+        """
+
+
+class RowDniIndex(BaseDniIndex):
+    """Índice de DNIs registrados de a uno (motor liviano, sin NumPy).
+
+    Solo los DNIs repetidos guardan la lista de sus posiciones; el resto
+    ocupa una entrada del diccionario de primeras apariciones.
+    """
+
+    def __init__(self, policy: str = 'first'):
+        super().__init__(policy)
+        self._entries: List[Tuple[int, str, str]] = []
+        self._first: Dict[str, int] = {}
+        self._repeated: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def columns(self) -> Tuple[List[str], List[str]]:
+        """Ver ``BaseDniIndex.columns``"""
+        return [dni for _, dni, _ in self._entries], [nota for _, _, nota in self._entries]
+
+    def add(self, row: int, dni: str, nota: str):
+        """Registrar una fila exportada (numerada desde 1)"""
+        position = len(self._entries)
+        self._entries.append((row, dni, nota))
+        first = self._first.setdefault(dni, position)
+        if first != position:
+            self._repeated.setdefault(dni, [first]).append(position)
+
+    def resolve(self, report, parse_grade: Callable[[str], Optional[float]]) -> Optional[List[Tuple[str, str]]]:
+        """Ver ``BaseDniIndex.resolve``; retorna los pares (DNI, nota) a exportar, en orden"""
+        if not self._repeated:
+            return None
+
+        discarded = set()
+        for dni, positions in self._repeated.items():
+            notas = [self._entries[position][2] for position in positions]
+            rule = 'dni_repetido' if len(set(notas)) == 1 else 'dni_notas_distintas'
+            chosen = positions[self._choose(notas, parse_grade)]
+            discarded.update(position for position in positions if position != chosen)
+            for position in positions:
+                report.add(rule, self._entries[position][0], dni)
+
+        return [
+            (dni, nota) for position, (_, dni, nota) in enumerate(self._entries)
+            if position not in discarded
+        ]
+
+    def _choose(self, notas: List[str], parse_grade: Callable[[str], Optional[float]]) -> int:
+        """Posición, entre las filas de un DNI, de la que se exporta"""
+        if self.policy == 'first':
+            return 0
+        if self.policy == 'last':
+            return len(notas) - 1
+        # Nota más alta; las notas no numéricas quedan por debajo y los empates se resuelven por orden
+        grades = [parse_grade(nota) for nota in notas]
+        grades = [float('-inf') if grade is None or grade != grade else grade for grade in grades]
+        return grades.index(max(grades))
+
+
+class DniIndex(BaseDniIndex):
+    """Índice columnar de DNIs exportados (motor de pandas).
+
+    Cada bloque se guarda como arreglos; ``resolve`` los agrupa con
+    ``pd.factorize`` y elige las filas con reducciones por grupo
+    (``ufunc.at``), sin ordenar: el costo es lineal en las filas.
+    """
+
+    def __init__(self, policy: str = 'first'):
+        super().__init__(policy)
+        self._chunks = []
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows, _, _ in self._chunks)
+
+    def columns(self) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Ver ``BaseDniIndex.columns``"""
+        import numpy as np
+
+        if not self._chunks:
+            return np.empty(0, dtype=object), np.empty(0, dtype=object)
+        _, dnis, notas = zip(*self._chunks)
+        return np.concatenate(dnis), np.concatenate(notas)
+
+    def add(self, rows: 'np.ndarray', dnis: 'np.ndarray', notas: 'np.ndarray'):
+        """Registrar las filas exportadas de un bloque (numeradas desde 1)"""
+        import numpy as np
+
+        if len(rows):
+            self._chunks.append((
+                np.asarray(rows, dtype=np.int64),
+                np.asarray(dnis, dtype=object),
+                np.asarray(notas, dtype=object),
+            ))
+
+    def resolve(self, report, parse_grade: Callable[[str], Optional[float]]) -> Optional[Tuple['np.ndarray', 'np.ndarray']]:
+        """Ver ``BaseDniIndex.resolve``; retorna las columnas de DNI y nota a exportar"""
+        import numpy as np
+        import pandas as pd
+
+        if not self._chunks:
+            return None
+        rows, dnis, notas = (np.concatenate(column) for column in zip(*self._chunks))
+        codes, uniques = pd.factorize(dnis)
+        if len(uniques) == len(dnis):
+            return None
+
+        size, groups = len(codes), len(uniques)
+        positions = np.arange(size)
+        first = np.full(groups, size)
+        np.minimum.at(first, codes, positions)
+
+        # Un DNI tiene notas distintas si alguna de sus filas difiere de la primera
+        nota_codes, nota_uniques = pd.factorize(notas)
+        conflicting = np.zeros(groups, dtype=bool)
+        conflicting[codes[nota_codes != nota_codes[first[codes]]]] = True
+
+        chosen = self._chosen_positions(codes, positions, first, nota_codes, nota_uniques, parse_grade)
+        keep = np.zeros(size, dtype=bool)
+        keep[chosen] = True
+
+        repeated = np.bincount(codes, minlength=groups)[codes] > 1
+        conflict_rows = conflicting[codes]
+        report.add('dni_repetido', rows[repeated & ~conflict_rows], dnis[repeated & ~conflict_rows])
+        report.add('dni_notas_distintas', rows[conflict_rows], dnis[conflict_rows])
+        return dnis[keep], notas[keep]
+
+    def _chosen_positions(self, codes, positions, first, nota_codes, nota_uniques, parse_grade) -> 'np.ndarray':
+        """Posición de la fila que se exporta de cada DNI"""
+        import numpy as np
+
+        if self.policy == 'first':
+            return first
+        groups = len(first)
+        if self.policy == 'last':
+            last = np.full(groups, -1)
+            np.maximum.at(last, codes, positions)
+            return last
+
+        # Las notas se repiten mucho: se convierte cada valor distinto una sola vez
+        unique_grades = np.array([parse_grade(nota) for nota in nota_uniques.tolist()], dtype=float)
+        unique_grades[np.isnan(unique_grades)] = -np.inf
+        grades = unique_grades[nota_codes]
+        best = np.full(groups, -np.inf)
+        np.maximum.at(best, codes, grades)
+        # Entre las filas con la nota más alta de su DNI se elige la primera
+        candidates = grades == best[codes]
+        chosen = np.full(groups, len(codes))
+        np.minimum.at(chosen, codes[candidates], positions[candidates])
+        return chosen
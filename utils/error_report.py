@@ -0,0 +1,92 @@
+"""
+Módulo de acumulación columnar de errores de validación
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .validation_rules import RULE_IDS, SUMMARY_ROWS_PER_MESSAGE, BaseErrorReport
+
+
+class ErrorReport(BaseErrorReport):
+    """Errores de validación de una planilla en forma columnar.
+
+    Cada error es una terna (regla, fila, referencia al valor) guardada en
+    arreglos de NumPy; cada valor distinto que causó un error se guarda una
+    sola vez por regla. Los mensajes se arman recién al mostrarlos:
+    ``summary`` los consolida por mensaje para la respuesta y ``iter_csv``
+    genera el reporte completo, una línea por error.
+    """
+
+    def __init__(self, params: Dict[str, object] = None):
+        super().__init__(params)
+        self._chunks = []
+        self._arrays = None
+
+    def __getstate__(self):
+        # Se compacta antes de enviarse a otro proceso o guardarse en caché
+        state = self.__dict__.copy()
+        state['_arrays'] = self._columns()
+        state['_chunks'] = [state['_arrays']]
+        return state
+
+    def add(self, rule: str, rows: np.ndarray, values: Optional[np.ndarray] = None):
+        """Registrar los errores de una regla.
+
+        ``rows`` son los números de fila tal como se informan (desde 1) y
+        ``values``, si la regla los usa, los valores que causaron cada error.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        refs = np.full(len(rows), -1, dtype=np.int32) if values is None else self._intern(rule, values)
+        self._chunks.append((np.full(len(rows), RULE_IDS[rule], dtype=np.int8), rows, refs))
+        self._arrays = None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes aproximados que ocupan los errores"""
+        return sum(array.nbytes for array in self._columns()) + self._values_nbytes()
+
+    @property
+    def row_count(self) -> int:
+        return len(np.unique(self._columns()[1]))
+
+    def _message_groups(self) -> Iterable[Tuple[int, int, List[int], int]]:
+        rule_ids, rows, refs = self._columns()
+        if len(rows) == 0:
+            return []
+
+        # Un mensaje distinto por cada par (regla, valor)
+        keys = rule_ids.astype(np.int64) << 32 | (refs.astype(np.int64) + 1)
+        _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        # Errores agrupados por mensaje, conservando el orden de filas dentro de cada grupo
+        grouped = np.argsort(inverse, kind='stable')
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        groups = []
+        for group in np.argsort(first, kind='stable').tolist():
+            count = int(counts[group])
+            positions = grouped[starts[group]:starts[group] + min(count, SUMMARY_ROWS_PER_MESSAGE)]
+            groups.append((int(rule_ids[positions[0]]), int(refs[positions[0]]), rows[positions].tolist(), count))
+        return groups
+
+    def _columns(self) -> tuple:
+        """Arreglos (regla, fila, valor) de todos los errores, ordenados por fila y regla"""
+        if self._arrays is None:
+            if self._chunks:
+                rule_ids, rows, refs = (np.concatenate(column) for column in zip(*self._chunks))
+                order = np.lexsort((rule_ids, rows))
+                self._arrays = (rule_ids[order], rows[order], refs[order])
+                self._chunks = [self._arrays]
+            else:
+                self._arrays = (np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32))
+        return self._arrays
+
+    def _intern(self, rule: str, values: np.ndarray) -> np.ndarray:
+        """Referencias de los valores en la tabla de la regla, agregando los nuevos"""
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        mapping = np.array([self._value_ref(rule, value) for value in uniques.tolist()], dtype=np.int32)
+        return mapping[codes]
@@ -0,0 +1,109 @@
+"""
+Módulo de detección del formato de planillas Excel y CSV
+"""
+import codecs
+import io
+from typing import Optional
+
+# Firmas de los formatos de planilla
+ZIP_SIGNATURE = b'PK\x03\x04'  # .xlsx (OOXML)
+OLE2_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'  # .xls (BIFF)
+
+# Bytes iniciales que se inspeccionan para detectar el formato
+SNIFF_SIZE = 4096
+
+# Muestra inicial de un CSV para detectar codificación, separador y encabezado
+CSV_SAMPLE_SIZE = 64 * 1024
+# Separadores de CSV admitidos, en orden de preferencia ante un empate
+CSV_DELIMITERS = [';', ',', '\t', '|']
+# Nombre de la única hoja de un CSV
+CSV_SHEET_NAME = 'Hoja1'
+
+
+def sniff_format(file_stream) -> Optional[str]:
+    """Detectar el formato por los bytes iniciales: 'xlsx', 'xls', 'csv' o None"""
+    position = file_stream.tell()
+    head = file_stream.read(SNIFF_SIZE)
+    file_stream.seek(position)
+
+    if head.startswith(ZIP_SIGNATURE):
+        return 'xlsx'
+    if head.startswith(OLE2_SIGNATURE):
+        return 'xls'
+    if head and b'\x00' not in head:
+        return 'csv'
+    return None
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Detectar la codificación de un texto: UTF-8 (con o sin BOM) o Latin-1"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # Decodificador incremental: un carácter cortado al final de la muestra no es error
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+class Utf8FallbackStream(io.RawIOBase):
+    """Flujo de un CSV en UTF-8 que pasa a Latin-1 en el primer byte inválido.
+
+    La codificación se detecta sobre una muestra inicial; si más adelante
+    aparece un byte que no es UTF-8, el resto del archivo se decodifica como
+    Latin-1. Los bytes se entregan siempre en UTF-8: mientras el archivo es
+    válido pasan sin copiarse y solo se recodifica lo que sigue al cambio.
+    """
+
+    def __init__(self, file_stream):
+        self._stream = file_stream
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._fallback = False
+        self._buffer = b''
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._offset >= len(self._buffer):
+            data = self._stream.read(CSV_SAMPLE_SIZE)
+            self._buffer, self._offset = self._convert(data, final=not data), 0
+            if not data:
+                break
+        size = min(len(buffer), len(self._buffer) - self._offset)
+        buffer[:size] = self._buffer[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+    def _convert(self, data: bytes, final: bool) -> bytes:
+        """Validar un bloque como UTF-8 o, desde el primer byte inválido, recodificarlo"""
+        if self._fallback:
+            return data.decode('latin-1').encode('utf-8')
+        # Un carácter cortado al final del bloque anterior se retuvo hasta completarse
+        pending = self._decoder.getstate()[0]
+        try:
+            self._decoder.decode(data, final=final)
+        except UnicodeDecodeError as error:
+            # error.object son los bytes retenidos seguidos del bloque
+            self._fallback = True
+            return error.object[:error.start] + error.object[error.start:].decode('latin-1').encode('utf-8')
+        data = pending + data if pending else data
+        held = len(self._decoder.getstate()[0])
+        return data[:len(data) - held] if held else data
+
+
+def utf8_stream(file_stream, encoding: str):
+    """Flujo binario del CSV para leer con ``encoding``, tolerando Latin-1 tras la muestra"""
+    if encoding == 'latin-1':
+        return file_stream
+    return io.BufferedReader(Utf8FallbackStream(file_stream), buffer_size=CSV_SAMPLE_SIZE)
+
+
+def detect_delimiter(text: str) -> str:
+    """Detectar el separador por su frecuencia en la primera línea no vacía"""
+    first_line = next((line for line in text.splitlines() if line.strip()), '')
+    counts = {delimiter: first_line.count(delimiter) for delimiter in CSV_DELIMITERS}
+    best = max(CSV_DELIMITERS, key=lambda delimiter: counts[delimiter])
+    return best if counts[best] else ','
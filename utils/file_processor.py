@@ -1,45 +1,42 @@
 """
 Módulo para el procesamiento de archivos Excel
 """
+import numpy as np
 import pandas as pd
 import io
 import logging
-from typing import Tuple, Optional, Dict, Any
-from pathlib import Path
+import re
+from typing import Tuple, Optional, Dict, Any, List
 from werkzeug.utils import secure_filename
-from config.settings import (
-    ALLOWED_EXTENSIONS, REQUIRED_COLUMNS, FACULTY_FILTER,
-    MIN_GRADE, MAX_GRADE
-)
+from config.settings import PIPELINE_COLUMNS, CATEGORY_COLUMNS, SPREADSHEET_ENGINE
+from .date_validator import DateValidator
+from .dni_index import DNI_FLOAT_ARTIFACT, DniIndex
+from .error_report import ErrorReport
+from .metrics import PipelineStats
+from .processor_base import ALUMNOS_CSV_HEADER, CSV_SPECIAL_CHARS, NOTAS_CSV_HEADER, BaseProcessor
+from .row_filter import ValueFilter
+from .schema import SchemaBinding
+from .spreadsheet_reader import SheetReader, Workbook, open_sheet_reader, open_workbook
 
 logger = logging.getLogger(__name__)
 
-class FileProcessor:
+# Expresión de los caracteres que obligan a encerrar un valor CSV entre comillas
+CSV_SPECIAL_CHARS_PATTERN = '[' + ''.join(re.escape(char) for char in CSV_SPECIAL_CHARS) + ']'
+
+class FileProcessor(BaseProcessor):
     """Clase para procesar archivos Excel y generar CSVs"""
     
     def __init__(self):
-        self.allowed_extensions = ALLOWED_EXTENSIONS
-        self.required_columns = REQUIRED_COLUMNS
-        self.faculty_filter = FACULTY_FILTER
-        self.min_grade = MIN_GRADE
-        self.max_grade = MAX_GRADE
-    
-    def validate_file_extension(self, filename: str) -> bool:
-        """Validar extensión del archivo"""
-        if not filename:
-            return False
-        
-        file_ext = Path(filename).suffix.lower()
-        return file_ext in self.allowed_extensions
-    
-    def validate_file_size(self, file_size: int, max_size: int) -> bool:
-        """Validar tamaño del archivo"""
-        return file_size <= max_size
+        super().__init__('pandas')
+        self.reader_engine = SPREADSHEET_ENGINE
+        self.category_columns = CATEGORY_COLUMNS
+        self.date_validator = DateValidator()
     
     def read_excel_file(self, file_stream) -> Optional[pd.DataFrame]:
-        """Leer archivo Excel y retornar DataFrame"""
+        """Leer archivo Excel completo y retornar DataFrame"""
         try:
-            df = pd.read_excel(file_stream, engine='openpyxl')
+            with open_sheet_reader(file_stream, self.chunk_size, self.reader_engine) as reader:
+                df = reader.read_all(self._category_positions(SchemaBinding.resolve(reader.header)))
             logger.info(f"Archivo Excel leído exitosamente. Filas: {len(df)}")
             return df
         except Exception as e:
@@ -48,220 +45,189 @@ class FileProcessor:
     
     def validate_excel_structure(self, df: pd.DataFrame) -> Tuple[bool, list]:
         """Validar estructura del DataFrame y retornar lista de errores específicos"""
-        errores = []
-        
-        if df.empty:
-            errores.append("El archivo está vacío")
-            return False, errores
-        
-        # Validar número de columnas
-        if len(df.columns) != len(self.required_columns):
-            errores.append(f"El archivo tiene {len(df.columns)} columnas, debe tener exactamente {len(self.required_columns)}")
-        
-        # Verificar nombres y orden de columnas (case-insensitive)
-        df_columns = [str(col).strip() for col in df.columns]
-        required_cols = [col.strip() for col in self.required_columns]
-        
-        for i, (df_col, req_col) in enumerate(zip(df_columns, required_cols)):
-            # Comparar ignorando mayúsculas/minúsculas
-            if df_col.lower() != req_col.lower():
-                errores.append(f"La columna {i+1} debe ser '{req_col}', pero es '{df_col}' (diferencia de mayúsculas/minúsculas)")
-        
-        # Si hay más columnas de las esperadas
-        if len(df_columns) > len(required_cols):
-            extra_cols = df_columns[len(required_cols):]
-            errores.append(f"Columnas adicionales no permitidas: {', '.join(extra_cols)}")
-        
-        return len(errores) == 0, errores
+        return self.validate_header(list(df.columns), df.empty)
     
-    def filter_faculty_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def filter_faculty_data(self, df: pd.DataFrame, binding: SchemaBinding = None) -> pd.DataFrame:
         """Filtrar datos por facultad"""
-        faculty_col = 'Facultad regional'
+        binding = binding or SchemaBinding.resolve(df.columns)
+        faculty_values = binding.values(df, 'Facultad regional')
         
-        if faculty_col not in df.columns:
-            logger.warning(f"Columna '{faculty_col}' no encontrada")
+        if faculty_values is None:
+            logger.warning("Columna 'Facultad regional' no encontrada")
             return df
         
-        # Filtrar registros que coincidan exactamente con FRBA o UTN FRBA
-        faculty_mask = df[faculty_col].astype(str).str.strip().str.lower().isin([
-            'frba', 'utn frba'
-        ])
-        filtered_df = df[faculty_mask]
+        # Filtrar registros cuya facultad (sin distinguir mayúsculas) está en FACULTY_FILTER
+        faculty_filter = self._faculty_row_filter(binding)
+        filtered_df = df[faculty_filter.mask(faculty_values)]
         
         logger.info(f"Registros filtrados por facultad: {len(filtered_df)} de {len(df)}")
         logger.info(f"Filtros aplicados: {self.faculty_filter}")
         return filtered_df
     
-    def validate_data_content(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, list]:
-        """Validar contenido de los datos y retornar registros válidos e inválidos"""
-        errores = []
-        valid_records = []
-        
+    def validate_data_content(self, df: pd.DataFrame, binding: SchemaBinding = None) -> Tuple[pd.DataFrame, list]:
+        """Validar contenido de los datos y retornar registros válidos y errores consolidados"""
         logger.info(f"Iniciando validación de contenido para {len(df)} filas")
         
-        # Crear un mapeo case-insensitive de nombres de columnas
-        column_mapping = {col.lower(): col for col in df.columns}
-        
-        for idx, row in df.iterrows():
-            row_errors = []
-            
-            # Validar facultad (case-insensitive) - más flexible
-            faculty_col = self._find_column_case_insensitive(df, 'Facultad regional')
-            if faculty_col:
-                faculty_value = str(row[faculty_col]).strip()
-                if not faculty_value or faculty_value == 'nan':
-                    row_errors.append(f"Facultad está vacía")
-                # Removemos la validación estricta de FRBA para ser más flexible
-            
-            # Validar nota (case-insensitive)
-            nota_col = self._find_column_case_insensitive(df, 'Nota')
-            if nota_col:
-                nota_value = str(row[nota_col]).strip()
-                
-                # Valores especiales que son válidos
-                special_values = ['-', 'ausente', 'equivalencia', 'equivalente', 'aprobado', 'desaprobado']
-                if nota_value.lower() in special_values:
-                    # Es un valor especial válido, no necesita validación numérica
-                    pass
-                else:
-                    try:
-                        grade = float(nota_value)
-                        if grade < self.min_grade or grade > self.max_grade:
-                            row_errors.append(f"Nota {grade} fuera del rango {self.min_grade}-{self.max_grade}")
-                    except (ValueError, TypeError):
-                        row_errors.append(f"Nota '{nota_value}' no es un número válido ni un valor especial permitido")
-            
-            # Validar DNI (case-insensitive)
-            dni_col = self._find_column_case_insensitive(df, 'DNI')
-            if dni_col:
-                dni_value = str(row[dni_col]).strip()
-                if not dni_value or not dni_value.isdigit() or len(dni_value) < 7:
-                    row_errors.append(f"DNI '{dni_value}' no es válido (debe ser numérico y tener al menos 7 dígitos)")
-            
-            # Validar fecha (case-insensitive)
-            fecha_col = self._find_column_case_insensitive(df, 'Fecha de inicio')
-            if fecha_col:
-                fecha_value = str(row[fecha_col]).strip()
-                if fecha_value and fecha_value != 'nan':
-                    # Validar formato de fecha flexible
-                    if not self._is_valid_date_format(fecha_value):
-                        row_errors.append(f"Fecha '{fecha_value}' no tiene formato válido (acepta DD/MM/YYYY, YYYY-MM-DD, etc.)")
-            
-            # Validar campos obligatorios (case-insensitive)
-            required_fields = ['Apellido', 'Nombre']  # Removemos 'Legajo' de los campos obligatorios
-            for field in required_fields:
-                field_col = self._find_column_case_insensitive(df, field)
-                if field_col:
-                    field_value = str(row[field_col]).strip()
-                    if not field_value or field_value == 'nan':
-                        row_errors.append(f"Campo '{field}' está vacío")
-            
-            if row_errors:
-                errores.append({
-                    'fila': idx + 1,
-                    'errores': row_errors
-                })
-                logger.debug(f"Fila {idx + 1} tiene errores: {row_errors}")
-            else:
-                valid_records.append(row)
-        
-        valid_df = pd.DataFrame(valid_records) if valid_records else pd.DataFrame()
-        
-        # Resetear índices para eliminar filas vacías
-        if not valid_df.empty:
-            valid_df = valid_df.reset_index(drop=True)
+        report = self.new_error_report()
+        valid_df = self._validate_rows(df, binding or SchemaBinding.resolve(df.columns), report)
         
-        logger.info(f"Validación completada: {len(valid_df)} registros válidos, {len(errores)} filas con errores")
-        if errores:
-            logger.info(f"Primeros 3 errores: {errores[:3]}")
+        logger.info(f"Validación completada: {len(valid_df)} registros válidos, {report.row_count} filas con errores")
         
         # Consolidar errores para hacerlos más concisos
-        consolidated_errors = self._consolidate_errors(errores)
+        return valid_df, report.summary()
+    
+    def new_error_report(self) -> ErrorReport:
+        """Crear el acumulador de errores de una planilla con los parámetros de los mensajes"""
+        return ErrorReport(self._report_params())
+    
+    def _validate_rows(self, df: pd.DataFrame, binding: SchemaBinding, report: ErrorReport) -> pd.DataFrame:
+        """Registrar los errores de un bloque en ``report`` y retornar sus filas válidas"""
+        invalid_mask = self._invalid_rows(df, binding, report)
         
-        return valid_df, consolidated_errors
+        if invalid_mask.all():
+            return pd.DataFrame()
+        
+        # Resetear índices para eliminar filas vacías
+        return df[~invalid_mask].reset_index(drop=True)
+    
+    def _invalid_rows(self, df: pd.DataFrame, binding: SchemaBinding, report: ErrorReport) -> np.ndarray:
+        """Registrar los errores de un bloque en ``report`` y retornar la máscara de filas inválidas"""
+        # Cada verificación se evalúa como máscara sobre la columna completa
+        checks = self._run_content_checks(df, binding)
+        
+        invalid_mask = np.zeros(len(df), dtype=bool)
+        row_numbers = np.asarray(df.index) + 1
+        for rule, positions, values in checks:
+            invalid_mask[positions] = True
+            report.add(rule, row_numbers[positions], values)
+        return invalid_mask
+    
+    def _run_content_checks(self, df: pd.DataFrame, binding: SchemaBinding) -> List[Tuple[str, np.ndarray, Optional[np.ndarray]]]:
+        """Ejecutar las validaciones de contenido por columna.
+        
+        Retorna una lista de ternas (regla, posiciones de filas inválidas,
+        valores que causaron el error o None si la regla no los usa).
+        """
+        checks = []
+        
+        # Validar facultad (case-insensitive) - más flexible
+        faculty_values = self._column_as_str(binding.values(df, 'Facultad regional'))
+        if faculty_values is not None:
+            checks.append(('facultad_vacia', np.flatnonzero(self._is_blank(faculty_values)), None))
+        
+        # Validar nota (case-insensitive)
+        nota_values = self._column_as_str(binding.values(df, 'Nota'))
+        if nota_values is not None:
+            checks.extend(self._check_grades(nota_values))
+        
+        # Validar DNI (case-insensitive)
+        dni_values = self._dni_column(binding.values(df, 'DNI'))
+        if dni_values is not None:
+            mask = ((dni_values == '') | ~dni_values.str.isdigit() | (dni_values.str.len() < 7)).to_numpy()
+            checks.append(('dni_invalido', np.flatnonzero(mask), dni_values[mask].to_numpy()))
+        
+        # Validar fecha (case-insensitive): se evalúa la columna original,
+        # sin convertir a texto las celdas que ya son fechas
+        fecha_column = binding.values(df, 'Fecha de inicio')
+        if fecha_column is not None:
+            mask = self.date_validator.find_invalid(fecha_column)
+            fecha_values = fecha_column[mask].astype(str).str.strip()
+            checks.append(('fecha_invalida', np.flatnonzero(mask), fecha_values.to_numpy(dtype=object)))
+        
+        # Validar campos obligatorios (case-insensitive)
+        required_fields = {'Apellido': 'apellido_vacio', 'Nombre': 'nombre_vacio'}  # 'Legajo' no es obligatorio
+        for field, rule in required_fields.items():
+            field_values = self._column_as_str(binding.values(df, field))
+            if field_values is not None:
+                checks.append((rule, np.flatnonzero(self._is_blank(field_values)), None))
+        
+        return checks
+    
+    def _check_grades(self, nota_values: pd.Series) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+        """Validar la columna de notas: valores especiales o números dentro del rango"""
+        # Las notas se repiten mucho: se valida cada valor distinto una sola vez
+        codes, uniques = pd.factorize(nota_values)
+        checks = []
+        for rule, unique_positions, unique_values in self._check_grade_values(pd.Series(uniques, dtype=object)):
+            value_by_code = np.empty(len(uniques), dtype=object)
+            value_by_code[unique_positions] = unique_values
+            invalid_codes = np.zeros(len(uniques), dtype=bool)
+            invalid_codes[unique_positions] = True
+            
+            positions = np.flatnonzero(invalid_codes[codes])
+            checks.append((rule, positions, value_by_code[codes[positions]]))
+        return checks
+    
+    def _check_grade_values(self, nota_values: pd.Series) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+        """Validar valores de nota: especiales o números dentro del rango"""
+        special = nota_values.str.lower().isin(self.NOTA_SPECIAL_VALUES).to_numpy()
+        grades = pd.to_numeric(nota_values.where(~special), errors='coerce').to_numpy(dtype=float)
+        unparseable = np.zeros(len(nota_values), dtype=bool)
+        
+        # Los valores que pandas no convierte se reintentan con float() para
+        # conservar las mismas reglas que la validación fila por fila
+        retry = np.isnan(grades) & ~special
+        if retry.any():
+            retry_values = nota_values[retry]
+            parsed = {value: self._parse_grade(value) for value in retry_values.unique()}
+            retry_grades = np.array([parsed[value] for value in retry_values], dtype=object)
+            unparseable[retry] = [grade is None for grade in retry_grades]
+            grades[retry] = [np.nan if grade is None else grade for grade in retry_grades]
+        
+        with np.errstate(invalid='ignore'):
+            out_of_range = (grades < self.min_grade) | (grades > self.max_grade)
+        
+        return [
+            ('nota_fuera_de_rango', np.flatnonzero(out_of_range), np.array(grades[out_of_range].tolist(), dtype=object)),
+            ('nota_invalida', np.flatnonzero(unparseable), nota_values[unparseable].to_numpy(dtype=object)),
+        ]
+    
+    @staticmethod
+    def _column_as_str(values: Optional[pd.Series]) -> Optional[pd.Series]:
+        """Obtener una columna como texto sin espacios, o None si no existe"""
+        if values is None:
+            return None
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Se normalizan solo las categorías y se expanden por código (-1 es nulo)
+            categories = values.cat.categories.astype(str).str.strip().to_numpy(dtype=object)
+            lookup = np.append(categories, 'nan')
+            return pd.Series(lookup[values.cat.codes.to_numpy()], index=values.index, dtype=object)
+        return values.astype(str).str.strip()
+    
+    @classmethod
+    def _dni_column(cls, values: Optional[pd.Series]) -> Optional[pd.Series]:
+        """Obtener la columna DNI como texto, sin el sufijo '.0' de los números leídos como float"""
+        dni_values = cls._column_as_str(values)
+        if dni_values is None:
+            return None
+        # Solo los valores con punto pasan por la expresión regular
+        with_point = dni_values.str.contains('.', regex=False).to_numpy()
+        if with_point.any():
+            dni_values = dni_values.copy()
+            dni_values[with_point] = dni_values[with_point].str.replace(DNI_FLOAT_ARTIFACT, '', regex=True)
+        return dni_values
+    
+    def _faculty_row_filter(self, binding: SchemaBinding) -> Optional[ValueFilter]:
+        """Filtro de facultad sobre la columna de la asociación, o None si no existe"""
+        position = binding.position('Facultad regional')
+        return None if position is None else ValueFilter(position, self.faculty_filter)
+    
+    def _category_positions(self, binding: SchemaBinding) -> List[int]:
+        """Posiciones físicas de las columnas que se cargan como categorías"""
+        return [binding.position(field) for field in self.category_columns if field in binding]
+    
+    @staticmethod
+    def _is_blank(values: pd.Series) -> np.ndarray:
+        """Máscara de valores vacíos o nulos en una columna de texto"""
+        return ((values == '') | (values == 'nan')).to_numpy()
     
     def _is_valid_date_format(self, date_str: str) -> bool:
         """Validar formato de fecha flexible - acepta múltiples formatos"""
-        import re
-        from datetime import datetime
-        
-        # Si es NaN o vacío, es válido (opcional)
-        if not date_str or date_str == 'nan' or date_str == 'None':
-            return True
-        
-        # Patrones de fecha que aceptamos
-        patterns = [
-            r'^\d{1,2}/\d{1,2}/\d{4}$',  # DD/MM/YYYY
-            r'^\d{4}-\d{1,2}-\d{1,2}$',  # YYYY-MM-DD
-            r'^\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{1,2}:\d{1,2}$',  # YYYY-MM-DD HH:MM:SS
-            r'^\d{1,2}-\d{1,2}-\d{4}$',  # DD-MM-YYYY
-            r'^\d{1,2}/\d{1,2}/\d{2}$',  # DD/MM/YY
-            r'^\d{4}/\d{1,2}/\d{1,2}$',  # YYYY/MM/DD
-        ]
-        
-        # Verificar si coincide con algún patrón
-        for pattern in patterns:
-            if re.match(pattern, date_str):
-                return True
-        
-        # Intentar parsear con pandas datetime (más flexible)
-        try:
-            pd.to_datetime(date_str, errors='raise')
-            return True
-        except:
-            pass
-        
-        return False
+        return self.date_validator.is_valid(date_str)
     
     def _find_column_case_insensitive(self, df: pd.DataFrame, column_name: str) -> str:
         """Buscar una columna ignorando mayúsculas/minúsculas"""
-        column_name_lower = column_name.lower()
-        for col in df.columns:
-            if col.lower() == column_name_lower:
-                return col
-        return None
-    
-    def _consolidate_errors(self, errores: list) -> list:
-        """Consolidar errores para hacerlos más concisos y útiles"""
-        if not errores:
-            return []
-        
-        # Contar tipos de errores
-        error_types = {}
-        total_rows_with_errors = len(errores)
-        
-        for error in errores:
-            for error_msg in error['errores']:
-                if error_msg not in error_types:
-                    error_types[error_msg] = []
-                error_types[error_msg].append(error['fila'])
-        
-        # Crear mensajes consolidados
-        consolidated = []
-        
-        for error_msg, rows in error_types.items():
-            if len(rows) == 1:
-                # Solo una fila con este error
-                consolidated.append(f"Fila {rows[0]}: {error_msg}")
-            elif len(rows) <= 5:
-                # Pocas filas, mostrar todas
-                rows_str = ', '.join(map(str, rows))
-                consolidated.append(f"Filas {rows_str}: {error_msg}")
-            else:
-                # Muchas filas, mostrar resumen
-                first_rows = rows[:3]
-                remaining = len(rows) - 3
-                rows_str = ', '.join(map(str, first_rows))
-                if remaining > 0:
-                    consolidated.append(f"Filas {rows_str} y {remaining} más: {error_msg}")
-                else:
-                    consolidated.append(f"Filas {rows_str}: {error_msg}")
-        
-        # Agregar resumen general si hay muchos errores
-        if total_rows_with_errors > 10:
-            consolidated.insert(0, f"⚠️ Se encontraron errores en {total_rows_with_errors} filas del archivo.")
-        
-        return consolidated
+        return SchemaBinding.resolve(df.columns, [column_name]).column_name(column_name)
     
     def validate_grades(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, list]:
         """Validar notas y retornar registros válidos e inválidos"""
@@ -296,158 +262,250 @@ class FileProcessor:
         logger.info(f"Notas válidas: {len(valid_df)}, inválidas: {len(invalid_records)}")
         return valid_df, invalid_records
     
-    def process_excel_file(self, file_stream, filename: str, form_data: dict = None) -> Dict[str, Any]:
-        """Procesar archivo Excel completo"""
-        try:
-            logger.info(f"Iniciando procesamiento del archivo: {filename}")
-            
-            # Validar extensión
-            if not self.validate_file_extension(filename):
-                logger.warning(f"Extensión de archivo no válida: {filename}")
-                return {
-                    'success': False,
-                    'error': f"Formato de archivo no válido. Formatos permitidos: {', '.join(self.allowed_extensions)}",
-                    'detailed_errors': []
-                }
-            
-            # Leer archivo
-            df = self.read_excel_file(file_stream)
-            if df is None:
-                logger.error("No se pudo leer el archivo Excel")
-                return {
-                    'success': False,
-                    'error': "No se pudo leer el archivo Excel",
-                    'detailed_errors': []
-                }
-            
-            logger.info(f"Archivo leído exitosamente. Columnas: {list(df.columns)}, Filas: {len(df)}")
-            logger.info(f"Columnas esperadas: {self.required_columns}")
-            
-            # Validar estructura
-            is_valid, structure_errors = self.validate_excel_structure(df)
-            if not is_valid:
-                logger.warning(f"Errores de estructura encontrados: {structure_errors}")
-                return {
-                    'success': False,
-                    'error': "El archivo no tiene la estructura correcta",
-                    'detailed_errors': structure_errors
-                }
-            
-            logger.info("Estructura del archivo válida")
-            
-            # Filtrar por facultad
-            filtered_df = self.filter_faculty_data(df)
-            logger.info(f"Filtrado por facultad: {len(filtered_df)} registros de {len(df)} originales")
-            
-            # Validar contenido de datos
-            valid_df, content_errors = self.validate_data_content(filtered_df)
-            logger.info(f"Validación de contenido: {len(valid_df)} registros válidos, {len(content_errors)} errores")
-            
-            if valid_df.empty:
-                logger.warning("No se encontraron registros válidos")
-                return {
-                    'success': False,
-                    'error': "No se encontraron registros válidos en el archivo",
-                    'detailed_errors': content_errors
-                }
-            
-            # Generar CSVs con los datos del formulario
-            alumnos_csv = self.generate_alumnos_csv(valid_df, form_data)
-            notas_csv = self.generate_notas_csv(valid_df, form_data)
-            
-            logger.info(f"Procesamiento exitoso: {len(valid_df)} registros procesados")
-            
-            return {
-                'success': True,
-                'alumnos_csv': alumnos_csv,
-                'notas_csv': notas_csv,
-                'total_records': len(valid_df),
-                'content_errors': content_errors
-            }
-            
-        except Exception as e:
-            logger.error(f"Error en procesamiento: {str(e)}")
+    def _process_sheet(self, reader: SheetReader, form_data: dict, stats: PipelineStats) -> Dict[str, Any]:
+        """Validar y exportar una hoja ya abierta, con el encabezado ya validado (ver ``process_excel_file``)"""
+        # Asociar campos a columnas una sola vez y leer solo las que se usan
+        binding = SchemaBinding.resolve(reader.header)
+        positions, chunk_binding = binding.project(PIPELINE_COLUMNS)
+        categories = self._category_positions(binding)
+        
+        # El filtro de facultad se aplica mientras se leen las filas
+        faculty_filter = self._faculty_row_filter(binding)
+        if faculty_filter is None:
+            logger.warning("Columna 'Facultad regional' no encontrada")
+        
+        alumnos_output = io.BytesIO()
+        notas_output = io.BytesIO()
+        alumnos_output.write(ALUMNOS_CSV_HEADER.encode('utf-8'))
+        notas_output.write(NOTAS_CSV_HEADER.encode('utf-8'))
+        
+        report = self.new_error_report()
+        dni_index = DniIndex(self.dni_policy)
+        filtered_rows = 0
+        chunks = reader.iter_chunks(positions, categories, faculty_filter)
+        
+        while True:
+            with stats.stage('read'):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            filtered_rows += len(chunk)
+            
+            # Validar contenido de datos (las filas válidas conservan su número de fila)
+            with stats.stage('content_validation'):
+                valid_chunk = chunk[~self._invalid_rows(chunk, chunk_binding, report)]
+            
+            # Generar ambos CSVs con los datos del formulario
+            stats.rows_out += self._write_csv_chunk(
+                valid_chunk, form_data, alumnos_output, notas_output, chunk_binding, stats, dni_index
+            )
+        
+        # Los DNIs repetidos pueden estar en bloques distintos: se resuelven al final
+        with stats.stage('duplicate_check'):
+            resolved = dni_index.resolve(report, self._parse_grade)
+            if resolved is not None:
+                alumnos_csv, notas_csv = self.build_csv_outputs(*resolved, form_data)
+                alumnos_output, notas_output = io.BytesIO(alumnos_csv), io.BytesIO(notas_csv)
+                logger.info(f"DNIs repetidos: {stats.rows_out - len(resolved[0])} filas descartadas")
+                stats.rows_out = len(resolved[0])
+            export_columns = resolved if resolved is not None else dni_index.columns()
+
+        skipped_by_faculty = dict(faculty_filter.skipped) if faculty_filter else {}
+        stats.rows_skipped = sum(skipped_by_faculty.values())
+        stats.rows_in = filtered_rows + stats.rows_skipped
+        logger.info(f"Filtrado por facultad: {filtered_rows} registros de {stats.rows_in} originales")
+        if skipped_by_faculty:
+            logger.info(f"Filas descartadas por facultad: {skipped_by_faculty}")
+        
+        with stats.stage('content_validation'):
+            content_errors = report.summary()
+        logger.info(f"Validación de contenido: {stats.rows_out} registros válidos, {len(content_errors)} errores")
+        
+        if stats.rows_out == 0:
+            logger.warning("No se encontraron registros válidos")
             return {
                 'success': False,
-                'error': f"Error interno del servidor: {str(e)}",
-                'detailed_errors': []
+                'error': "No se encontraron registros válidos en el archivo",
+                'detailed_errors': content_errors,
+                'error_report': report,
+                'skipped_by_faculty': skipped_by_faculty,
+                'stats': stats.as_dict()
             }
+        
+        alumnos_csv = alumnos_output.getvalue()
+        notas_csv = notas_output.getvalue()
+        stats.bytes_out = len(alumnos_csv) + len(notas_csv)
+        
+        logger.info(f"Procesamiento exitoso: {stats.rows_out} registros procesados")
+        
+        return {
+            'success': True,
+            'alumnos_csv': alumnos_csv,
+            'notas_csv': notas_csv,
+            'export_columns': export_columns,
+            'total_records': stats.rows_out,
+            'content_errors': content_errors,
+            'error_report': report,
+            'skipped_by_faculty': skipped_by_faculty,
+            'stats': stats.as_dict()
+        }
     
-    def generate_alumnos_csv(self, df: pd.DataFrame, form_data: dict = None) -> str:
-        """Generar CSV de alumnos con formato correcto"""
+    def _open_reader(self, file_stream) -> Optional[SheetReader]:
+        """Abrir la planilla en modo streaming, o None si no se puede leer"""
         try:
-            # Buscar columnas de forma case-insensitive
-            dni_col = self._find_column_case_insensitive(df, 'DNI')
-            
-            if not dni_col:
-                raise ValueError("No se encontró la columna DNI necesaria para el CSV de alumnos")
-            
-            # Crear DataFrame con el formato correcto para alumnos
-            # Usar datos de ejemplo o valores por defecto para los campos requeridos
-            alumnos_data = []
-            
-            # Obtener valores del formulario o usar valores por defecto
-            propuesta = form_data.get('campo1', 'asdasdasd') if form_data else 'asdasdasd'
-            comision = form_data.get('campo2', 'asdasdasdas') if form_data else 'asdasdasdas'
-            actividad = form_data.get('campo3', 'dasdasada') if form_data else 'dasdasada'
-            periodo = form_data.get('campo4', 'asdasdadasd') if form_data else 'asdasdadasd'
+            return open_sheet_reader(file_stream, self.chunk_size, self.reader_engine)
+        except Exception as e:
+            logger.error(f"Error al leer archivo Excel: {str(e)}")
+            return None
+    
+    def _open_workbook(self, file_stream) -> Optional[Workbook]:
+        """Abrir el libro para leer sus hojas, o None si no se puede leer"""
+        try:
+            return open_workbook(file_stream, self.chunk_size, self.reader_engine)
+        except Exception as e:
+            logger.error(f"Error al leer archivo Excel: {str(e)}")
+            return None
+    
+    def generate_csv_outputs(self, df: pd.DataFrame, form_data: dict = None,
+                             binding: SchemaBinding = None) -> Tuple[bytes, bytes]:
+        """Generar los CSV de alumnos y de notas en una sola pasada.
+        
+        Las columnas DNI y Nota se extraen una única vez y ambos archivos se
+        arman concatenando columnas completas; se retornan codificados en UTF-8.
+        """
+        try:
+            alumnos_output = io.BytesIO()
+            notas_output = io.BytesIO()
+            alumnos_output.write(ALUMNOS_CSV_HEADER.encode('utf-8'))
+            notas_output.write(NOTAS_CSV_HEADER.encode('utf-8'))
             
-            # Generar CSV manualmente para evitar problemas con pandas
-            csv_lines = []
-            csv_lines.append("DNI,Propuesta,Comision,Actividad,Periodo Lectivo")
+            binding = binding or SchemaBinding.resolve(df.columns)
+            records = self._write_csv_chunk(df, form_data, alumnos_output, notas_output, binding)
             
-            for idx, row in df.iterrows():
-                dni_value = str(row[dni_col]).strip()
-                if dni_value and dni_value != 'nan':
-                    csv_line = f"{dni_value},{propuesta},{comision},{actividad},{periodo}"
-                    csv_lines.append(csv_line)
+            alumnos_preview = alumnos_output.getvalue()[:500].decode('utf-8', 'ignore').split('\n', 3)[:3]
+            notas_preview = notas_output.getvalue()[:500].decode('utf-8', 'ignore').split('\n', 3)[:3]
+            logger.info(f"CSV de alumnos generado: {records} registros")
+            logger.info(f"Contenido del CSV (primeras 3 líneas): {alumnos_preview}")
+            logger.info(f"CSV de notas generado: {records} registros")
+            logger.info(f"Contenido del CSV (primeras 3 líneas): {notas_preview}")
             
-            csv_content = '\n'.join(csv_lines)
+            return alumnos_output.getvalue(), notas_output.getvalue()
             
-            logger.info(f"CSV de alumnos generado: {len(csv_lines)-1} registros")
-            logger.info(f"Contenido del CSV (primeras 3 líneas): {csv_lines[:3]}")
+        except Exception as e:
+            logger.error(f"Error generando CSVs: {str(e)}")
+            raise
+    
+    def generate_alumnos_csv(self, df: pd.DataFrame, form_data: dict = None, binding: SchemaBinding = None) -> str:
+        """Generar CSV de alumnos con formato correcto"""
+        try:
+            binding = binding or SchemaBinding.resolve(df.columns)
+            dni_values, _ = self._export_columns(df, binding, require_nota=False)
+            csv_content = self._join_csv_lines(ALUMNOS_CSV_HEADER, self._alumnos_lines(dni_values, form_data))
+            logger.info(f"CSV de alumnos generado: {len(dni_values)} registros")
             return csv_content
             
         except Exception as e:
             logger.error(f"Error generando CSV de alumnos: {str(e)}")
             raise
     
-    def generate_notas_csv(self, df: pd.DataFrame, form_data: dict = None) -> str:
+    def generate_notas_csv(self, df: pd.DataFrame, form_data: dict = None, binding: SchemaBinding = None) -> str:
         """Generar CSV de notas con formato correcto"""
         try:
-            # Buscar columnas de forma case-insensitive
-            dni_col = self._find_column_case_insensitive(df, 'DNI')
-            nota_col = self._find_column_case_insensitive(df, 'Nota')
-            
-            if not dni_col:
-                raise ValueError("No se encontró la columna DNI necesaria para el CSV de notas")
-            
-            # Crear DataFrame con el formato correcto para notas
-            notas_data = []
-            
-            # Obtener valores del formulario o usar valores por defecto
-            fecha_regularidad = form_data.get('campo5', '12/31/2312') if form_data else '12/31/2312'
-            fecha_promocion = form_data.get('campo6', '13/12/3131') if form_data else '13/12/3131'
-            
-            # Generar CSV manualmente para evitar problemas con pandas
-            csv_lines = []
-            csv_lines.append("documento,nota_regularidad,fecha_regularidad,nota_promocion,fecha_promocion")
-            
-            for idx, row in df.iterrows():
-                dni_value = str(row[dni_col]).strip()
-                nota_value = str(row[nota_col]).strip() if nota_col else '9'
-                
-                if dni_value and dni_value != 'nan':
-                    csv_line = f"{dni_value},{nota_value},{fecha_regularidad},{nota_value},{fecha_promocion}"
-                    csv_lines.append(csv_line)
-            
-            csv_content = '\n'.join(csv_lines)
-            
-            logger.info(f"CSV de notas generado: {len(csv_lines)-1} registros")
-            logger.info(f"Contenido del CSV (primeras 3 líneas): {csv_lines[:3]}")
+            binding = binding or SchemaBinding.resolve(df.columns)
+            dni_values, nota_values = self._export_columns(df, binding)
+            csv_content = self._join_csv_lines(NOTAS_CSV_HEADER, self._notas_lines(dni_values, nota_values, form_data))
+            logger.info(f"CSV de notas generado: {len(dni_values)} registros")
             return csv_content
             
         except Exception as e:
             logger.error(f"Error generando CSV de notas: {str(e)}")
             raise
-
+    
+    def _write_csv_chunk(self, df: pd.DataFrame, form_data: dict, alumnos_output, notas_output,
+                         binding: SchemaBinding, stats: PipelineStats = None, dni_index: DniIndex = None) -> int:
+        """Agregar las líneas de un bloque de registros válidos a ambos CSV.
+        
+        Si se indica ``dni_index`` se registra cada fila exportada, numerada
+        según el índice de ``df``.
+        """
+        if df.empty:
+            return 0
+        stats = stats or PipelineStats()
+        
+        with stats.stage('alumnos_csv'):
+            dni_values, nota_values = self._export_columns(df, binding)
+            if dni_values.empty:
+                return 0
+            if dni_index is not None:
+                dni_index.add(
+                    np.asarray(dni_values.index) + 1, dni_values.to_numpy(),
+                    nota_values.to_numpy() if nota_values is not None else np.full(len(dni_values), '9', dtype=object),
+                )
+            alumnos_lines = self._alumnos_lines(dni_values, form_data)
+            alumnos_output.write(('\n' + alumnos_lines.str.cat(sep='\n')).encode('utf-8'))
+        
+        with stats.stage('notas_csv'):
+            notas_lines = self._notas_lines(dni_values, nota_values, form_data)
+            notas_output.write(('\n' + notas_lines.str.cat(sep='\n')).encode('utf-8'))
+        
+        return len(dni_values)
+    
+    def _export_columns(self, df: pd.DataFrame, binding: SchemaBinding,
+                        require_nota: bool = True) -> Tuple[pd.Series, Optional[pd.Series]]:
+        """Extraer DNI y Nota como columnas de texto listas para exportar"""
+        dni_column = binding.values(df, 'DNI')
+        nota_column = binding.values(df, 'Nota') if require_nota else None
+        
+        if dni_column is None:
+            raise ValueError("No se encontró la columna DNI necesaria para generar los CSV")
+        
+        dni_values = self._dni_column(dni_column)
+        keep = (dni_values != '') & (dni_values != 'nan')
+        dni_values = self._csv_quote_column(dni_values[keep])
+        
+        nota_values = None
+        if nota_column is not None:
+            nota_values = self._csv_quote_column(self._column_as_str(nota_column)[keep])
+        
+        return dni_values, nota_values
+    
+    def build_csv_outputs(self, dnis, notas, form_data: dict = None, enroll=None) -> Tuple[bytes, bytes]:
+        """Ver ``SpreadsheetRules.build_csv_outputs``; arma las líneas por columnas"""
+        dni_values, nota_values = pd.Series(dnis, dtype=object), pd.Series(notas, dtype=object)
+        enrolled = dni_values if enroll is None else dni_values[np.asarray(enroll, dtype=bool)]
+        alumnos_csv = self._join_csv_lines(ALUMNOS_CSV_HEADER, self._alumnos_lines(enrolled, form_data))
+        notas_csv = self._join_csv_lines(NOTAS_CSV_HEADER, self._notas_lines(dni_values, nota_values, form_data))
+        return alumnos_csv.encode('utf-8'), notas_csv.encode('utf-8')
+    
+    def _alumnos_lines(self, dni_values: pd.Series, form_data: dict = None) -> pd.Series:
+        """Armar las líneas del CSV de alumnos a partir de la columna DNI"""
+        return dni_values + self._alumnos_suffix(form_data)
+    
+    def _notas_lines(self, dni_values: pd.Series, nota_values: Optional[pd.Series], form_data: dict = None) -> pd.Series:
+        """Armar las líneas del CSV de notas a partir de las columnas DNI y Nota"""
+        fecha_regularidad, fecha_promocion = self._notas_dates(form_data)
+        
+        if nota_values is None:
+            nota_values = '9'
+        
+        return (
+            dni_values + ',' + nota_values + ',' + fecha_regularidad
+            + ',' + nota_values + ',' + fecha_promocion
+        )
+    
+    @staticmethod
+    def _join_csv_lines(header: str, lines: pd.Series) -> str:
+        """Unir encabezado y líneas de datos con saltos de línea"""
+        if lines.empty:
+            return header
+        return header + '\n' + lines.str.cat(sep='\n')
+    
+    @staticmethod
+    def _csv_quote_column(values: pd.Series) -> pd.Series:
+        """Escapar para CSV los valores de una columna que lo requieran"""
+        needs_quotes = values.str.contains(CSV_SPECIAL_CHARS_PATTERN, regex=True)
+        if not needs_quotes.any():
+            return values
+        values = values.copy()
+        values[needs_quotes] = '"' + values[needs_quotes].str.replace('"', '""', regex=False) + '"'
+        return values
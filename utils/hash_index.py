@@ -0,0 +1,100 @@
+"""
+Módulo del índice de planillas ya procesadas por la línea de comandos
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Versión del formato del archivo de índice
+INDEX_VERSION = 1
+
+
+class HashIndex:
+    """Índice de planillas procesadas, guardado como JSON.
+
+    Cada entrada registra el tamaño, la fecha de modificación, los datos del
+    formulario y la clave de contenido (``ResultCache.make_key``: hash del
+    archivo y de los datos del formulario) de una planilla, junto con los CSV
+    que generó. Si el tamaño, la fecha y los datos no cambiaron no hace falta
+    leer el archivo; si cambiaron, se compara la clave.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._entries = self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, file_path) -> Optional[dict]:
+        """Entrada de una planilla, o None si nunca se procesó"""
+        return self._entries.get(self._key(file_path))
+
+    def is_unchanged(self, file_path, stat: os.stat_result, form_data: dict) -> bool:
+        """Indica, sin leer el archivo, si la planilla no cambió desde que se procesó"""
+        entry = self.get(file_path)
+        return (
+            entry is not None
+            and entry['size'] == stat.st_size
+            and entry['mtime_ns'] == stat.st_mtime_ns
+            and entry['form_data'] == form_data
+            and self.outputs_exist(entry)
+        )
+
+    def has_key(self, file_path, key: str) -> bool:
+        """Indica si la planilla ya se procesó con el mismo contenido y formulario"""
+        entry = self.get(file_path)
+        return entry is not None and entry['key'] == key and self.outputs_exist(entry)
+
+    def record(self, file_path, stat: os.stat_result, form_data: dict, key: str,
+               outputs: List[str], records: int):
+        """Registrar una planilla procesada"""
+        self._entries[self._key(file_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'form_data': form_data,
+            'key': key,
+            'outputs': [str(output) for output in outputs],
+            'records': records,
+        }
+
+    def touch(self, file_path, stat: os.stat_result):
+        """Actualizar tamaño y fecha de una planilla cuyo contenido no cambió"""
+        entry = self.get(file_path)
+        if entry is not None:
+            entry['size'] = stat.st_size
+            entry['mtime_ns'] = stat.st_mtime_ns
+
+    def save(self):
+        """Guardar el índice completo antes de hacerlo visible"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'files': self._entries}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def outputs_exist(entry: dict) -> bool:
+        return all(os.path.exists(output) for output in entry['outputs'])
+
+    @staticmethod
+    def _key(file_path) -> str:
+        return str(Path(file_path).resolve())
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo leer el índice {self.path}, se procesará todo: {str(e)}")
+            return {}
+        if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+            logger.warning(f"Índice {self.path} con formato desconocido, se procesará todo")
+            return {}
+        return data.get('files', {})
@@ -0,0 +1,125 @@
+"""
+Módulo de procesamiento asíncrono de trabajos
+"""
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import JOB_WORKERS, JOB_QUEUE_MAX_DEPTH, JOB_RESULT_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Estados posibles de un trabajo
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+class QueueFullError(Exception):
+    """La cola de trabajos alcanzó su profundidad máxima"""
+
+
+class JobQueue:
+    """Cola acotada de trabajos atendida por un grupo fijo de hilos.
+
+    ``submit`` encola una función y retorna de inmediato un identificador con el
+    que se consulta el estado del trabajo. Los estados se guardan en memoria del
+    proceso; los de los trabajos terminados (o fallidos) se descartan
+    ``result_ttl`` segundos después de terminar, y los que esperan o se están
+    ejecutando se conservan sin importar su antigüedad.
+    """
+
+    def __init__(self, worker_count: int = JOB_WORKERS, max_depth: int = JOB_QUEUE_MAX_DEPTH,
+                 result_ttl: int = JOB_RESULT_TTL_SECONDS):
+        self.worker_count = worker_count
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._jobs = {}
+        # Trabajos terminados en orden de finalización: id -> momento en que terminaron
+        self._finished = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> str:
+        """Encolar un trabajo y retornar su identificador"""
+        self._ensure_workers()
+        job_id = str(uuid.uuid4())
+        job = {'status': STATUS_QUEUED, 'created_at': time.time(), 'finished_at': None, 'result': None, 'error': None}
+
+        with self._lock:
+            self._prune_expired()
+            self._jobs[job_id] = job
+
+        try:
+            self._queue.put_nowait((job_id, func, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            raise QueueFullError("La cola de trabajos está llena")
+
+        logger.info(f"Trabajo encolado: {job_id} (en cola: {self._queue.qsize()})")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Obtener una copia del estado de un trabajo, o None si no existe"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def depth(self) -> int:
+        """Cantidad de trabajos esperando un hilo libre"""
+        return self._queue.qsize()
+
+    def _ensure_workers(self):
+        """Iniciar los hilos de trabajo la primera vez que se usa la cola"""
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.worker_count):
+                worker = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            job_id, func, args, kwargs = self._queue.get()
+            self._update(job_id, status=STATUS_RUNNING)
+            try:
+                result = func(*args, **kwargs)
+                self._finish(job_id, status=STATUS_DONE, result=result)
+            except Exception as e:
+                logger.error(f"Error en trabajo {job_id}: {str(e)}")
+                self._finish(job_id, status=STATUS_FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def _finish(self, job_id: str, **fields):
+        """Registrar el resultado de un trabajo y el momento en que terminó"""
+        with self._lock:
+            # Se toma la hora dentro del lock para que _finished quede en orden
+            finished_at = time.time()
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields, finished_at=finished_at)
+                self._finished[job_id] = finished_at
+
+    def _prune_expired(self):
+        """Descartar los trabajos terminados hace más de ``result_ttl`` (en orden de finalización)"""
+        limit = time.time() - self.result_ttl
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > limit:
+                break
+            self._finished.popitem(last=False)
+            self._jobs.pop(job_id, None)
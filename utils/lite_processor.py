@@ -0,0 +1,354 @@
+"""
+Módulo del motor de procesamiento liviano (openpyxl y csv, sin pandas)
+"""
+import codecs
+import csv
+import io
+import logging
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from config.settings import PIPELINE_COLUMNS
+from .dni_index import RowDniIndex, normalize_dni
+from .file_format import (
+    CSV_SAMPLE_SIZE, CSV_SHEET_NAME, detect_delimiter, detect_encoding, sniff_format, utf8_stream,
+)
+from .metrics import PipelineStats
+from .processor_base import ALUMNOS_CSV_HEADER, NOTAS_CSV_HEADER, BaseProcessor
+from .row_filter import ValueFilter
+from .schema import SchemaBinding
+from .sheet_rows import SheetRows
+from .validation_rules import RowErrorReport, is_valid_date
+
+logger = logging.getLogger(__name__)
+
+# Textos que pandas lee como nulos en un CSV; se leen igual para generar los mismos resultados
+CSV_NULL_STRINGS = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+
+class LiteSheetReader(SheetRows):
+    """Lector fila por fila de una hoja, sin armar DataFrames.
+
+    Recibe las filas como tuplas (de openpyxl o del módulo csv), toma como
+    encabezado la primera fila con algún valor y numera las filas de datos
+    como el índice de los bloques de ``SheetReader``: las filas vacías de una
+    planilla no se entregan pero se cuentan. En un CSV, igual que en
+    ``CsvSheetReader``, las filas sin valores en las columnas leídas no se
+    cuentan. Si se recibe ``workbook``, el lector lo cierra al cerrarse.
+    """
+
+    def __init__(self, rows: Iterable[tuple], chunk_size: int, skip_blank_projection: bool = False,
+                 workbook: 'LiteWorkbook' = None):
+        self.chunk_size = chunk_size
+        self._rows = iter(rows)
+        self._skip_blank_projection = skip_blank_projection
+        self._workbook = workbook
+        self.header = self._read_header()
+        # Se adelanta la primera fila de datos para saber si la hoja está vacía
+        self._pending = self._next_data_row()
+        self._pending_skipped = self._skipped_rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Cerrar el libro si el lector es su dueño"""
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+    @property
+    def is_empty(self) -> bool:
+        """Indica si la hoja no tiene filas de datos"""
+        return not self.header or self._pending is None
+
+    def iter_blocks(self, positions: Sequence[int],
+                    row_filter: Optional[ValueFilter] = None) -> Iterator[List[Tuple[int, tuple]]]:
+        """Entregar de a ``chunk_size`` pares (número de fila, valores de ``positions``).
+
+        Las filas que no pasan ``row_filter`` se descartan.
+        """
+        width = len(self.header)
+        row_number = -1
+        block = []
+        while self._pending is not None:
+            row, skipped = self._pending, self._pending_skipped
+            self._pending = self._next_data_row()
+            self._pending_skipped = self._skipped_rows
+
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            values = tuple(row[position] for position in positions)
+            if self._skip_blank_projection:
+                # En un CSV las filas vacías no se cuentan
+                if all(value is None for value in values):
+                    continue
+                skipped = 0
+            row_number += 1 + skipped
+            if row_filter is None or row_filter.accepts(row[row_filter.position]):
+                block.append((row_number, values))
+
+            if len(block) >= self.chunk_size:
+                yield block
+                block = []
+        if block:
+            yield block
+
+class LiteWorkbook:
+    """Libro .xlsx (openpyxl en modo ``read_only``) o CSV abierto para leer sus hojas.
+
+    Tiene la misma interfaz que ``Workbook``; un CSV es un libro de una sola
+    hoja, ``CSV_SHEET_NAME``. Los archivos .xls no se admiten.
+    """
+
+    def __init__(self, file_stream, chunk_size: int):
+        if not file_stream.seekable():
+            file_stream = io.BytesIO(file_stream.read())
+        self.chunk_size = chunk_size
+        self.format = sniff_format(file_stream)
+        self._lock = threading.Lock()
+        self._stream = file_stream
+        self._start = file_stream.tell()
+        self._workbook = None
+
+        if self.format == 'xlsx':
+            import openpyxl
+            self._workbook = openpyxl.load_workbook(file_stream, read_only=True, data_only=True)
+            self.sheet_names = list(self._workbook.sheetnames)
+        elif self.format == 'csv':
+            self.sheet_names = [CSV_SHEET_NAME]
+        else:
+            raise ValueError(f"El motor liviano no lee archivos {self.format or 'de formato desconocido'}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def sheet(self, sheet: Union[int, str], owned: bool = False) -> LiteSheetReader:
+        """Abrir una hoja, por posición o por nombre; con ``owned`` el lector cierra el libro"""
+        owner = self if owned else None
+        with self._lock:
+            if self.format == 'csv':
+                if sheet not in (0, CSV_SHEET_NAME):
+                    raise ValueError(f"Un CSV no tiene la hoja {sheet!r}")
+                return LiteSheetReader(self._csv_rows(), self.chunk_size, skip_blank_projection=True, workbook=owner)
+            worksheet = self._workbook.worksheets[sheet] if isinstance(sheet, int) else self._workbook[sheet]
+            rows = (tuple(_convert_cell(value) for value in row) for row in worksheet.iter_rows(values_only=True))
+            return LiteSheetReader(rows, self.chunk_size, workbook=owner)
+
+    def close(self):
+        """Cerrar el libro; los lectores de sus hojas dejan de poder usarse"""
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+    def _csv_rows(self) -> Iterator[tuple]:
+        """Filas del CSV, con la codificación y el separador detectados en una muestra.
+
+        Un byte que no es UTF-8 después de la muestra hace pasar el resto a Latin-1.
+        """
+        self._stream.seek(self._start)
+        sample = self._stream.read(CSV_SAMPLE_SIZE)
+        self._stream.seek(self._start)
+        encoding = detect_encoding(sample)
+        delimiter = detect_delimiter(codecs.getincrementaldecoder(encoding)(errors='replace').decode(sample))
+
+        # Se separa del archivo al terminar para no cerrarlo junto con el decodificador
+        text = io.TextIOWrapper(utf8_stream(self._stream, encoding), encoding=encoding, newline='')
+        try:
+            for row in csv.reader(text, delimiter=delimiter):
+                yield tuple(None if value in CSV_NULL_STRINGS else value for value in row)
+        finally:
+            text.detach()
+
+
+class LiteProcessor(BaseProcessor):
+    """Procesador de planillas .xlsx y CSV sin pandas.
+
+    Cumple el mismo contrato que ``FileProcessor`` (mismos resultados, CSV y
+    errores de ``process_excel_file`` y ``process_workbook``) leyendo con
+    openpyxl o el módulo csv y validando fila por fila en Python, de modo que
+    una instancia recién iniciada atiende su primera planilla sin cargar
+    pandas ni NumPy. Las fechas escritas como texto se validan con el mismo
+    criterio (``is_valid_date``). No lee archivos .xls: con este motor se
+    rechazan al recibirlos (``extension_error``).
+    """
+
+    def __init__(self):
+        super().__init__('lite')
+        self.nota_special_values = frozenset(self.NOTA_SPECIAL_VALUES)
+
+    def new_error_report(self) -> RowErrorReport:
+        """Crear el acumulador de errores de una planilla con los parámetros de los mensajes"""
+        return RowErrorReport(self._report_params())
+
+    def _process_sheet(self, reader: LiteSheetReader, form_data: dict, stats: PipelineStats) -> Dict[str, Any]:
+        """Validar y exportar una hoja ya abierta, con el encabezado ya validado (ver ``process_excel_file``)"""
+        binding = SchemaBinding.resolve(reader.header)
+        positions, row_binding = binding.project(PIPELINE_COLUMNS)
+        fields = {field: row_binding.position(field) for field in PIPELINE_COLUMNS}
+        faculty_position = binding.position('Facultad regional')
+        faculty_filter = None if faculty_position is None else ValueFilter(faculty_position, self.faculty_filter)
+
+        alumnos_output = io.BytesIO()
+        notas_output = io.BytesIO()
+        alumnos_output.write(ALUMNOS_CSV_HEADER.encode('utf-8'))
+        notas_output.write(NOTAS_CSV_HEADER.encode('utf-8'))
+        alumnos_suffix = self._alumnos_suffix(form_data)
+        fecha_regularidad, fecha_promocion = self._notas_dates(form_data)
+
+        report = self.new_error_report()
+        dni_index = RowDniIndex(self.dni_policy)
+        filtered_rows = 0
+        blocks = reader.iter_blocks(positions, faculty_filter)
+
+        while True:
+            with stats.stage('read'):
+                block = next(blocks, None)
+            if block is None:
+                break
+            filtered_rows += len(block)
+
+            # Cada fila válida deja su DNI y su nota listos para exportar
+            with stats.stage('content_validation'):
+                exports = []
+                for row_number, values in block:
+                    export = self._validate_row(row_number + 1, values, fields, report)
+                    if export is not None:
+                        dni_index.add(row_number + 1, *export)
+                        exports.append(export)
+
+            with stats.stage('alumnos_csv'):
+                alumnos_output.write(''.join(f"\n{dni}{alumnos_suffix}" for dni, _ in exports).encode('utf-8'))
+            with stats.stage('notas_csv'):
+                notas_output.write(''.join(
+                    f"\n{dni},{nota},{fecha_regularidad},{nota},{fecha_promocion}" for dni, nota in exports
+                ).encode('utf-8'))
+            stats.rows_out += len(exports)
+
+        # Los DNIs repetidos pueden estar en bloques distintos: se resuelven al final
+        with stats.stage('duplicate_check'):
+            resolved = dni_index.resolve(report, self._parse_grade)
+            if resolved is not None:
+                alumnos_csv, notas_csv = self._join_exports(resolved, form_data)
+                alumnos_output, notas_output = io.BytesIO(alumnos_csv), io.BytesIO(notas_csv)
+                logger.info(f"DNIs repetidos: {stats.rows_out - len(resolved)} filas descartadas")
+                stats.rows_out = len(resolved)
+            export_columns = (
+                dni_index.columns() if resolved is None
+                else ([dni for dni, _ in resolved], [nota for _, nota in resolved])
+            )
+
+        skipped_by_faculty = dict(faculty_filter.skipped) if faculty_filter else {}
+        stats.rows_skipped = sum(skipped_by_faculty.values())
+        stats.rows_in = filtered_rows + stats.rows_skipped
+
+        with stats.stage('content_validation'):
+            content_errors = report.summary()
+        logger.info(f"Validación de contenido: {stats.rows_out} registros válidos, {len(content_errors)} errores")
+
+        if stats.rows_out == 0:
+            return {
+                'success': False,
+                'error': "No se encontraron registros válidos en el archivo",
+                'detailed_errors': content_errors,
+                'error_report': report,
+                'skipped_by_faculty': skipped_by_faculty,
+                'stats': stats.as_dict()
+            }
+
+        alumnos_csv = alumnos_output.getvalue()
+        notas_csv = notas_output.getvalue()
+        stats.bytes_out = len(alumnos_csv) + len(notas_csv)
+
+        return {
+            'success': True,
+            'alumnos_csv': alumnos_csv,
+            'notas_csv': notas_csv,
+            'export_columns': export_columns,
+            'total_records': stats.rows_out,
+            'content_errors': content_errors,
+            'error_report': report,
+            'skipped_by_faculty': skipped_by_faculty,
+            'stats': stats.as_dict()
+        }
+
+    def _validate_row(self, row: int, values: tuple, fields: Dict[str, Optional[int]],
+                      report: RowErrorReport) -> Optional[Tuple[str, str]]:
+        """Registrar los errores de una fila en el orden de las reglas.
+
+        Retorna el DNI y la nota escapados para CSV si la fila es válida, o
+        None si tiene errores.
+        """
+        errors = len(report)
+
+        if fields['Facultad regional'] is not None and _cell_text(values[fields['Facultad regional']]) in ('', 'nan'):
+            report.add('facultad_vacia', row)
+
+        nota = None if fields['Nota'] is None else _cell_text(values[fields['Nota']])
+        if nota is not None and nota.lower() not in self.nota_special_values:
+            grade = self._parse_grade(nota)
+            if grade is None:
+                report.add('nota_invalida', row, nota)
+            elif grade < self.min_grade or grade > self.max_grade:
+                report.add('nota_fuera_de_rango', row, grade)
+
+        dni = None if fields['DNI'] is None else normalize_dni(_cell_text(values[fields['DNI']]))
+        if dni is not None and (not dni.isdigit() or len(dni) < 7):
+            report.add('dni_invalido', row, dni)
+
+        if fields['Fecha de inicio'] is not None:
+            fecha = values[fields['Fecha de inicio']]
+            if not is_valid_date(fecha):
+                report.add('fecha_invalida', row, _cell_text(fecha))
+
+        for field, rule in (('Apellido', 'apellido_vacio'), ('Nombre', 'nombre_vacio')):
+            if fields[field] is not None and _cell_text(values[fields[field]]) in ('', 'nan'):
+                report.add(rule, row)
+
+        if len(report) > errors or dni is None:
+            return None
+        return self._csv_quote(dni), '9' if nota is None else self._csv_quote(nota)
+
+    def _open_reader(self, file_stream) -> Optional[LiteSheetReader]:
+        """Abrir la primera hoja de la planilla, o None si no se puede leer"""
+        try:
+            workbook = LiteWorkbook(file_stream, self.chunk_size)
+        except Exception as e:
+            logger.error(f"Error al leer archivo Excel: {str(e)}")
+            return None
+        try:
+            return workbook.sheet(0, owned=True)
+        except Exception as e:
+            workbook.close()
+            logger.error(f"Error al leer archivo Excel: {str(e)}")
+            return None
+
+    def _open_workbook(self, file_stream) -> Optional[LiteWorkbook]:
+        """Abrir el libro para leer sus hojas, o None si no se puede leer"""
+        try:
+            return LiteWorkbook(file_stream, self.chunk_size)
+        except Exception as e:
+            logger.error(f"Error al leer archivo Excel: {str(e)}")
+            return None
+
+
+def _convert_cell(value):
+    """Normalizar un valor de celda como ``spreadsheet_reader``: los enteros guardados como float pasan a int"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _cell_text(value) -> str:
+    """Texto de una celda como lo deja pandas al convertir la columna: sin espacios y 'nan' si está vacía"""
+    if value is None or (isinstance(value, float) and value != value):
+        return 'nan'
+    return str(value).strip()
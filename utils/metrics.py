@@ -0,0 +1,231 @@
+"""
+Módulo de métricas de rendimiento en formato de texto de Prometheus
+"""
+import threading
+import time
+import tracemalloc
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence
+
+# Límites de los histogramas de duración (segundos) y memoria (bytes)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MEMORY_BUCKETS = tuple(2 ** power * 1024 * 1024 for power in range(0, 11))  # 1MB .. 1GB
+
+
+def _format_labels(label_names: Sequence[str], label_values: tuple, extra: str = '') -> str:
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """Base de las métricas: nombre, ayuda, etiquetas y un lock"""
+    metric_type = ''
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> list:
+        """Líneas con los valores de la métrica"""
+
+
+class Counter(_Metric):
+    """Contador monótono"""
+    metric_type = 'counter'
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> list:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    """Valor instantáneo"""
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> list:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo con límites fijos"""
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DURATION_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def _samples(self) -> list:
+        lines = []
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['counts']):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas que se exponen juntas"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+class PipelineStats:
+    """Mediciones de una ejecución de ``FileProcessor.process_excel_file``.
+
+    Acumula la duración de cada etapa (también cuando se repite por bloque),
+    las filas leídas, descartadas por filtro y exportadas y, si ``tracemalloc``
+    está activo, una estimación del pico de memoria asignada durante la
+    ejecución.
+
+    El pico de ``tracemalloc`` es del proceso y no se reinicia, porque varias
+    ejecuciones pueden correr a la vez. La estimación es aproximada: toma la
+    memoria asignada sobre la inicial al terminar cada etapa y, si el pico del
+    proceso subió durante la ejecución, ese pico; en ambos casos puede incluir
+    memoria de otras ejecuciones simultáneas.
+    """
+
+    def __init__(self, track_memory: bool = True):
+        self.stages = {}
+        self.rows_in = 0
+        self.rows_skipped = 0
+        self.rows_out = 0
+        self.bytes_out = 0
+        self._memory_base = None
+        self._process_peak = 0
+        self._memory_sampled = 0
+        if track_memory and tracemalloc.is_tracing():
+            self._memory_base, self._process_peak = tracemalloc.get_traced_memory()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Medir un tramo de una etapa"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+            if self._memory_base is not None and tracemalloc.is_tracing():
+                current = tracemalloc.get_traced_memory()[0]
+                self._memory_sampled = max(self._memory_sampled, current - self._memory_base)
+
+    def add(self, other: 'PipelineStats'):
+        """Sumar las mediciones de otra ejecución (por ejemplo, una hoja de un libro)"""
+        for name, seconds in other.stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.rows_in += other.rows_in
+        self.rows_skipped += other.rows_skipped
+        self.rows_out += other.rows_out
+        self.bytes_out += other.bytes_out
+
+    def peak_memory(self) -> Optional[int]:
+        """Pico aproximado de memoria asignada desde el inicio, o None si no se mide"""
+        if self._memory_base is None or not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        estimate = max(self._memory_sampled, current - self._memory_base)
+        # Un pico del proceso anterior a la ejecución no se le atribuye
+        if peak > self._process_peak:
+            estimate = max(estimate, peak - self._memory_base)
+        return max(estimate, 0)
+
+    def as_dict(self) -> dict:
+        return {
+            'stages': dict(self.stages),
+            'rows_in': self.rows_in,
+            'rows_skipped': self.rows_skipped,
+            'rows_out': self.rows_out,
+            'bytes_out': self.bytes_out,
+            'peak_memory_bytes': self.peak_memory(),
+        }
@@ -0,0 +1,301 @@
+"""
+Módulo de lectura rápida del encabezado de una planilla (sin pandas)
+"""
+import codecs
+import csv
+import io
+import posixpath
+import re
+import zipfile
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from xml.etree.ElementTree import iterparse
+
+from .file_format import CSV_SAMPLE_SIZE, CSV_SHEET_NAME, detect_delimiter, detect_encoding, sniff_format
+from .sheet_rows import normalize_header
+
+# Partes del paquete OOXML que describen el libro
+XLSX_WORKBOOK = 'xl/workbook.xml'
+XLSX_WORKBOOK_RELS = 'xl/_rels/workbook.xml.rels'
+XLSX_SHARED_STRINGS_TYPE = '/sharedStrings'
+XLSX_RELATIONSHIP_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+# Referencia de celda ('AB12') y rango de la dimensión ('A1:I5001')
+CELL_REFERENCE = re.compile(r'([A-Z]+)(\d+)')
+
+# Bytes mínimos que se piden de un tramo faltante de un ``PartialFile``
+PARTIAL_READ_SIZE = 64 * 1024
+
+
+class HeaderPreview(NamedTuple):
+    """Encabezado de la primera hoja y estimación de sus filas de datos"""
+    format: str
+    sheet: str
+    header: List[str]
+    estimated_rows: Optional[int]
+
+
+class MissingRange(Exception):
+    """La lectura del encabezado necesita un tramo del archivo que no se recibió"""
+
+    def __init__(self, offset: int, length: int):
+        super().__init__(f"Falta el tramo de {length} bytes desde {offset}")
+        self.offset = offset
+        self.length = length
+
+
+class PartialFile(io.RawIOBase):
+    """Archivo de ``size`` bytes del que solo se recibieron algunos tramos.
+
+    El navegador envía el inicio y el final de la planilla en lugar del
+    archivo completo; leer fuera de los tramos recibidos lanza
+    ``MissingRange`` con el tramo que hay que pedir (al menos
+    ``PARTIAL_READ_SIZE`` bytes), de modo que el encabezado de un .xlsx se
+    obtiene con unos pocos tramos chicos.
+    """
+
+    def __init__(self, size: int, parts: Sequence[Tuple[int, bytes]]):
+        self.size = size
+        self._parts = sorted(parts, key=lambda part: part[0])
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self.size}[whence]
+        self._position = max(base + offset, 0)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        # Una lectura se completa (salvo al final del archivo) aunque abarque varios tramos
+        end = min(self._position + len(buffer), self.size)
+        position = self._position
+        while position < end:
+            part = next((
+                (start, data) for start, data in self._parts if start <= position < start + len(data)
+            ), None)
+            if part is None:
+                raise MissingRange(position, min(max(end - position, PARTIAL_READ_SIZE), self.size - position))
+            start, data = part
+            chunk = data[position - start:end - start]
+            buffer[position - self._position:position - self._position + len(chunk)] = chunk
+            position += len(chunk)
+        size, self._position = position - self._position, position
+        return size
+
+
+def read_header_preview(file_stream) -> HeaderPreview:
+    """Leer solo el encabezado de la primera hoja de una planilla.
+
+    En un .xlsx se deja de leer el XML de la hoja tras la primera fila con
+    valores y las filas se estiman con la dimensión que guarda la hoja; en un
+    CSV se estiman con el largo medio de las líneas de la muestra inicial. El
+    encabezado se normaliza como en ``SheetReader``, de modo que
+    ``validate_header`` da el mismo resultado que al procesar el archivo.
+    """
+    file_format = sniff_format(file_stream)
+    if file_format == 'xlsx':
+        return _xlsx_preview(file_stream)
+    if file_format == 'xls':
+        return _xls_preview(file_stream)
+    if file_format == 'csv':
+        return _csv_preview(file_stream)
+    raise ValueError("Formato de planilla no soportado: desconocido")
+
+
+def _xlsx_preview(file_stream) -> HeaderPreview:
+    with zipfile.ZipFile(file_stream) as archive:
+        relationships = _xlsx_relationships(archive)
+        sheet_name, sheet_path = _xlsx_first_sheet(archive, relationships)
+
+        dimension = None
+        header_row = None
+        cells = {}
+        with archive.open(sheet_path) as source:
+            for event, element in iterparse(source, events=('start', 'end')):
+                tag = _local_name(element.tag)
+                if event == 'start':
+                    if tag == 'dimension':
+                        dimension = element.get('ref')
+                    continue
+                if tag != 'row':
+                    continue
+                column = -1
+                for cell in element:
+                    if _local_name(cell.tag) == 'c':
+                        column, value = _xlsx_cell(cell, column + 1)
+                        if value is not None:
+                            cells[column] = value
+                if cells:
+                    header_row = int(element.get('r', 1))
+                    break
+                element.clear()
+
+        # Los textos compartidos se leen solo hasta el último que usa el encabezado
+        shared = [int(value) for kind, value in cells.values() if kind == 's']
+        strings = _xlsx_shared_strings(archive, relationships, max(shared)) if shared else []
+
+    row = [None] * (max(cells) + 1 if cells else 0)
+    for column, (kind, value) in cells.items():
+        row[column] = strings[int(value)] if kind == 's' else _xlsx_value(kind, value)
+
+    estimated_rows = None
+    if header_row is None:
+        estimated_rows = 0
+    elif dimension:
+        last_row = CELL_REFERENCE.findall(dimension.upper())
+        if last_row:
+            estimated_rows = max(int(last_row[-1][1]) - header_row, 0)
+    return HeaderPreview('xlsx', sheet_name, normalize_header(row), estimated_rows)
+
+
+def _xlsx_relationships(archive: zipfile.ZipFile) -> Dict[str, tuple]:
+    """Relaciones del libro: id -> (tipo, ruta de la parte dentro del paquete)"""
+    relationships = {}
+    with archive.open(XLSX_WORKBOOK_RELS) as source:
+        for _, element in iterparse(source):
+            if _local_name(element.tag) == 'Relationship':
+                target = element.get('Target', '')
+                path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(
+                    posixpath.join(posixpath.dirname(XLSX_WORKBOOK), target)
+                )
+                relationships[element.get('Id')] = (element.get('Type', ''), path)
+    return relationships
+
+
+def _xlsx_first_sheet(archive: zipfile.ZipFile, relationships: Dict[str, tuple]) -> tuple:
+    """Nombre y ruta de la primera hoja del libro"""
+    with archive.open(XLSX_WORKBOOK) as source:
+        for _, element in iterparse(source):
+            if _local_name(element.tag) == 'sheet':
+                return element.get('name'), relationships[element.get(XLSX_RELATIONSHIP_ID)][1]
+    raise ValueError("El libro no tiene hojas")
+
+
+def _xlsx_shared_strings(archive: zipfile.ZipFile, relationships: Dict[str, tuple], last: int) -> List[str]:
+    """Primeros ``last + 1`` textos compartidos del libro"""
+    path = next((path for kind, path in relationships.values() if kind.endswith(XLSX_SHARED_STRINGS_TYPE)), None)
+    strings = []
+    if path is None:
+        return strings
+    with archive.open(path) as source:
+        for _, element in iterparse(source):
+            if _local_name(element.tag) != 'si':
+                continue
+            strings.append(_string_item_text(element))
+            element.clear()
+            if len(strings) > last:
+                break
+    return strings
+
+
+def _string_item_text(element) -> str:
+    """Texto simple o concatenación de tramos con formato; la fonética (rPh) se omite"""
+    texts = []
+    for child in element:
+        name = _local_name(child.tag)
+        if name == 't':
+            texts.append(child.text or '')
+        elif name == 'r':
+            texts.extend(node.text or '' for node in child if _local_name(node.tag) == 't')
+    return ''.join(texts)
+
+
+def _xlsx_cell(cell, next_column: int) -> tuple:
+    """Columna (desde 0) y (tipo, valor) de una celda, o valor None si está vacía.
+
+    Las celdas sin referencia ocupan la columna siguiente a la anterior.
+    """
+    match = CELL_REFERENCE.match(cell.get('r', ''))
+    column = _column_index(match.group(1)) if match else next_column
+    kind = cell.get('t', 'n')
+    if kind == 'inlineStr':
+        inline = next((node for node in cell if _local_name(node.tag) == 'is'), None)
+        return column, None if inline is None else ('str', _string_item_text(inline))
+    value = next((node.text for node in cell if _local_name(node.tag) == 'v'), None)
+    return column, None if value is None else (kind, value)
+
+
+def _xlsx_value(kind: str, value: str):
+    """Convertir el valor de una celda que no es un texto compartido"""
+    if kind == 'b':
+        return value == '1'
+    if kind == 'n':
+        number = float(value)
+        return int(number) if number.is_integer() else number
+    return value
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _xls_preview(file_stream) -> HeaderPreview:
+    import xlrd
+
+    # xlrd necesita el archivo completo, pero con on_demand solo interpreta la primera hoja
+    book = xlrd.open_workbook(file_contents=file_stream.read(), on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        for index in range(sheet.nrows):
+            row = [_xls_value(xlrd, cell) for cell in sheet.row(index)]
+            if any(value is not None for value in row):
+                return HeaderPreview('xls', sheet.name, normalize_header(row), sheet.nrows - index - 1)
+        return HeaderPreview('xls', sheet.name, [], 0)
+    finally:
+        book.release_resources()
+
+
+def _xls_value(xlrd, cell):
+    if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+        return None
+    if cell.ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(cell.value)
+    if isinstance(cell.value, float) and cell.value.is_integer():
+        return int(cell.value)
+    return cell.value
+
+
+def _csv_preview(file_stream) -> HeaderPreview:
+    start = file_stream.tell()
+    sample = file_stream.read(CSV_SAMPLE_SIZE)
+    size = file_stream.seek(0, io.SEEK_END) - start
+    file_stream.seek(start)
+
+    encoding = detect_encoding(sample)
+    text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(sample)
+    reader = csv.reader(io.StringIO(text), delimiter=detect_delimiter(text))
+    rows = _non_blank_rows(reader)
+    header = next(rows, [])
+    header_lines = reader.line_num
+
+    if not header:
+        estimated_rows = 0
+    elif size <= len(sample):
+        estimated_rows = sum(1 for _ in rows)
+    else:
+        # Filas de la muestra proyectadas al tamaño del archivo
+        lines = max(sample.count(b'\n'), 1)
+        estimated_rows = max(round(size * lines / len(sample)) - header_lines, 0)
+    return HeaderPreview('csv', CSV_SHEET_NAME, normalize_header(header), estimated_rows)
+
+
+def _non_blank_rows(rows) -> Iterator[list]:
+    """Filas con algún valor, con las celdas vacías como None"""
+    for row in rows:
+        row = [value if value != '' else None for value in row]
+        if any(value is not None for value in row):
+            yield row
@@ -0,0 +1,229 @@
+"""
+Módulo de backends de ejecución del procesamiento de planillas
+"""
+import io
+import logging
+import multiprocessing
+import threading
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, BinaryIO, Dict, Union
+
+from config.settings import (
+    PROCESSING_BACKEND, PROCESSING_ENGINE, PROCESS_POOL_WORKERS, PROCESS_POOL_MAX_TASKS_PER_CHILD,
+    METRICS_TRACK_MEMORY, SHEET_WORKERS
+)
+from .metrics import PipelineStats
+from .processor_base import BaseProcessor, sheet_form
+
+logger = logging.getLogger(__name__)
+
+# Contenido de un archivo a procesar: bytes o archivo posicionable (por ejemplo, un UploadSpool)
+FileSource = Union[bytes, BinaryIO]
+
+# Procesador de cada proceso trabajador
+_worker_processor = None
+
+
+def source_size(source: FileSource) -> int:
+    """Tamaño en bytes del contenido de un archivo a procesar"""
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    position = source.tell()
+    size = source.seek(0, io.SEEK_END)
+    source.seek(position)
+    return size
+
+
+def source_bytes(source: FileSource) -> bytes:
+    """Contenido completo de un archivo a procesar.
+
+    Si es un archivo (por ejemplo, un ``UploadSpool`` ya pasado a disco) se
+    lee completo en memoria: es lo que cuesta enviarlo a un proceso trabajador.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+
+def source_stream(source: FileSource) -> BinaryIO:
+    """Archivo posicionable, al inicio, con el contenido a procesar (sin copiarlo)"""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+
+def create_processor(engine: str = PROCESSING_ENGINE) -> BaseProcessor:
+    """Crear el procesador del motor configurado ('pandas' o 'lite').
+
+    El módulo del motor se importa recién aquí, de modo que pandas solo se
+    carga cuando se procesa el primer archivo con el motor 'pandas'.
+    """
+    if engine == 'lite':
+        from .lite_processor import LiteProcessor
+        return LiteProcessor()
+    if engine != 'pandas':
+        logger.warning(f"Motor de procesamiento desconocido '{engine}', se usa 'pandas'")
+    from .file_processor import FileProcessor
+    return FileProcessor()
+
+
+def _init_worker():
+    """Inicializar un proceso trabajador con el procesador ya cargado"""
+    global _worker_processor
+    _worker_processor = create_processor()
+    if METRICS_TRACK_MEMORY:
+        tracemalloc.start()
+
+
+def _process_in_worker(file_bytes: bytes, filename: str, form_data: dict) -> Dict[str, Any]:
+    """Procesar un archivo dentro de un proceso trabajador"""
+    return _worker_processor.process_excel_file(io.BytesIO(file_bytes), filename, form_data)
+
+
+def _workbook_sheet_names_in_worker(file_bytes: bytes, filename: str) -> tuple:
+    """Leer los nombres de las hojas de un libro dentro de un proceso trabajador"""
+    return _worker_processor.workbook_sheet_names(io.BytesIO(file_bytes), filename)
+
+
+def _process_workbook_sheet_in_worker(file_bytes: bytes, sheet: str, form_data: dict) -> tuple:
+    """Procesar una hoja de un libro dentro de un proceso trabajador"""
+    return _worker_processor.process_workbook_sheet(io.BytesIO(file_bytes), sheet, form_data)
+
+
+def _ping() -> bool:
+    return True
+
+
+class InlineBackend:
+    """Procesa los archivos en el mismo hilo que atiende la solicitud"""
+
+    def __init__(self, file_processor: BaseProcessor = None):
+        self._file_processor = file_processor
+        self._lock = threading.Lock()
+
+    @property
+    def file_processor(self) -> BaseProcessor:
+        """Procesador del motor configurado, creado en el primer uso"""
+        with self._lock:
+            if self._file_processor is None:
+                self._file_processor = create_processor()
+            return self._file_processor
+
+    def process(self, file_source: FileSource, filename: str, form_data: dict = None) -> Dict[str, Any]:
+        """Procesar un archivo y retornar el resultado de ``process_excel_file``.
+
+        Un archivo ya recibido (por ejemplo, un ``UploadSpool``) se lee en el
+        lugar, sin copiar su contenido.
+        """
+        return self.file_processor.process_excel_file(source_stream(file_source), filename, form_data)
+
+    def process_workbook(self, file_source: FileSource, filename: str, form_data: dict = None,
+                         sheet_form_data: dict = None) -> Dict[str, Any]:
+        """Procesar cada hoja de un libro y retornar el resultado de ``process_workbook``"""
+        return self.file_processor.process_workbook(source_stream(file_source), filename, form_data, sheet_form_data)
+
+    def shutdown(self):
+        pass
+
+
+class ProcessPoolBackend:
+    """Procesa los archivos en un grupo de procesos para usar todos los núcleos.
+
+    Cada proceso trabajador importa el motor configurado y crea su procesador
+    una sola vez al iniciar, y se recicla tras ``max_tasks_per_child`` archivos para
+    acotar el crecimiento de memoria. El grupo se crea en el primer uso o al
+    llamar a ``warm_up`` (la aplicación lo hace al iniciar).
+    """
+
+    def __init__(self, max_workers: int = PROCESS_POOL_WORKERS,
+                 max_tasks_per_child: int = PROCESS_POOL_MAX_TASKS_PER_CHILD,
+                 sheet_workers: int = SHEET_WORKERS):
+        self.max_workers = max_workers
+        self.sheet_workers = max(sheet_workers, 1)
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def process(self, file_source: FileSource, filename: str, form_data: dict = None) -> Dict[str, Any]:
+        """Procesar un archivo en un proceso trabajador y esperar el resultado.
+
+        El contenido se envía al trabajador como bytes, de modo que un archivo
+        ya recibido se lee completo en memoria.
+        """
+        form_data = dict(form_data) if form_data else None
+        future = self._get_executor().submit(_process_in_worker, source_bytes(file_source), filename, form_data)
+        return future.result()
+
+    def process_workbook(self, file_source: FileSource, filename: str, form_data: dict = None,
+                         sheet_form_data: dict = None) -> Dict[str, Any]:
+        """Procesar las hojas de un libro repartidas entre los procesos trabajadores.
+
+        Un trabajador lee los nombres de las hojas y cada hoja se procesa en
+        una tarea propia, con hasta ``sheet_workers`` hojas del libro a la
+        vez. Cada tarea recibe el libro completo como bytes y lo vuelve a
+        abrir: el costo de abrirlo se repite por hoja a cambio de usar varios
+        núcleos.
+        """
+        file_bytes = source_bytes(file_source)
+        stats = PipelineStats(track_memory=False)
+        executor = self._get_executor()
+        with stats.stage('read'):
+            sheet_names, failure = executor.submit(_workbook_sheet_names_in_worker, file_bytes, filename).result()
+        if failure is not None:
+            return failure
+
+        futures = {}
+        pending = set()
+        for sheet in sheet_names:
+            if len(pending) >= self.sheet_workers:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            future = executor.submit(
+                _process_workbook_sheet_in_worker, file_bytes, sheet, sheet_form(form_data, sheet_form_data, sheet)
+            )
+            futures[sheet] = future
+            pending.add(future)
+        return BaseProcessor.collect_sheets([futures[sheet].result() for sheet in sheet_names], stats)
+
+    def warm_up(self):
+        """Iniciar los procesos trabajadores antes de la primera solicitud"""
+        executor = self._get_executor()
+        wait([executor.submit(_ping) for _ in range(self.max_workers)])
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 'spawn' evita heredar hilos y locks del servidor al crear procesos
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+                logger.info(f"Grupo de procesos iniciado: {self.max_workers} trabajadores")
+            return self._executor
+
+
+def create_backend(name: str = PROCESSING_BACKEND, warm_up: bool = False):
+    """Crear el backend de procesamiento configurado ('inline' o 'process').
+
+    Con ``warm_up`` el grupo de procesos inicia sus trabajadores (con el motor
+    ya importado) antes de retornar; el backend inline no tiene nada que
+    preparar.
+    """
+    if name == 'process':
+        backend = ProcessPoolBackend()
+        if warm_up:
+            backend.warm_up()
+        return backend
+    if name != 'inline':
+        logger.warning(f"Backend de procesamiento desconocido '{name}', se usa 'inline'")
+    return InlineBackend()
@@ -0,0 +1,471 @@
+"""
+Módulo con la parte común de los motores de procesamiento (sin pandas)
+"""
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.settings import (
+    ALLOWED_EXTENSIONS, REQUIRED_COLUMNS, FACULTY_FILTER, MIN_GRADE, MAX_GRADE, DNI_DUPLICATE_POLICY,
+    READ_CHUNK_SIZE, PROCESSING_ENGINE, LITE_UNSUPPORTED_EXTENSIONS
+)
+from .dni_index import DNI_DUPLICATE_POLICIES
+from .metrics import PipelineStats
+from .preflight import MissingRange, read_header_preview
+from .schema import normalize_column_name
+from .validation_rules import NOTA_SPECIAL_VALUES
+
+logger = logging.getLogger(__name__)
+
+# Caracteres que obligan a encerrar un valor CSV entre comillas
+CSV_SPECIAL_CHARS = (',', '"', '\r', '\n')
+
+# Encabezados de los CSV de importación de SIGEAD
+ALUMNOS_CSV_HEADER = "DNI,Propuesta,Comision,Actividad,Periodo Lectivo"
+NOTAS_CSV_HEADER = "documento,nota_regularidad,fecha_regularidad,nota_promocion,fecha_promocion"
+
+
+class SpreadsheetRules:
+    """Reglas de las planillas y formato de los CSV de SIGEAD, sin motor de procesamiento.
+
+    Valida el archivo y el encabezado, revisa el encabezado sin leer las
+    filas (``preflight_file``) y da formato a los CSV. No depende de pandas:
+    la aplicación la usa para validar las subidas sin cargar ningún motor.
+    ``engine`` es el motor que va a procesar los archivos: con 'lite' no se
+    admiten las extensiones de ``LITE_UNSUPPORTED_EXTENSIONS``.
+    """
+
+    # Valores especiales de nota que son válidos sin validación numérica
+    NOTA_SPECIAL_VALUES = NOTA_SPECIAL_VALUES
+
+    def __init__(self, engine: str = PROCESSING_ENGINE):
+        self.engine = engine
+        self.allowed_extensions = (
+            ALLOWED_EXTENSIONS - LITE_UNSUPPORTED_EXTENSIONS if engine == 'lite' else ALLOWED_EXTENSIONS
+        )
+        self.required_columns = REQUIRED_COLUMNS
+        self.faculty_filter = FACULTY_FILTER
+        self.min_grade = MIN_GRADE
+        self.max_grade = MAX_GRADE
+        self.dni_policy = DNI_DUPLICATE_POLICY
+        self.chunk_size = READ_CHUNK_SIZE
+
+    def validate_file_extension(self, filename: str) -> bool:
+        """Validar extensión del archivo"""
+        if not filename:
+            return False
+
+        file_ext = Path(filename).suffix.lower()
+        return file_ext in self.allowed_extensions
+
+    def extension_error(self, filename: str, invalid_message: str = "Formato de archivo no válido") -> str:
+        """Mensaje de error para un archivo cuya extensión no se admite"""
+        file_ext = Path(filename or '').suffix.lower()
+        if file_ext in ALLOWED_EXTENSIONS:
+            return (f"Los archivos {file_ext} no se admiten con el motor de procesamiento liviano; "
+                    f"guarde la planilla como .xlsx o CSV")
+        return f"{invalid_message}. Formatos permitidos: {', '.join(sorted(self.allowed_extensions))}"
+
+    def validate_file_size(self, file_size: int, max_size: int) -> bool:
+        """Validar tamaño del archivo"""
+        return file_size <= max_size
+
+    def validate_header(self, columns: List[str], is_empty: bool = False) -> Tuple[bool, list]:
+        """Validar el encabezado de la planilla y retornar lista de errores específicos"""
+        errores = []
+
+        if is_empty:
+            errores.append("El archivo está vacío")
+            return False, errores
+
+        # Validar número de columnas
+        if len(columns) != len(self.required_columns):
+            errores.append(f"El archivo tiene {len(columns)} columnas, debe tener exactamente {len(self.required_columns)}")
+
+        # Verificar nombres y orden de columnas (case-insensitive)
+        df_columns = [str(col).strip() for col in columns]
+        required_cols = [col.strip() for col in self.required_columns]
+
+        for i, (df_col, req_col) in enumerate(zip(df_columns, required_cols)):
+            # Comparar ignorando mayúsculas/minúsculas
+            if normalize_column_name(df_col) != normalize_column_name(req_col):
+                errores.append(f"La columna {i+1} debe ser '{req_col}', pero es '{df_col}' (diferencia de mayúsculas/minúsculas)")
+
+        # Si hay más columnas de las esperadas
+        if len(df_columns) > len(required_cols):
+            extra_cols = df_columns[len(required_cols):]
+            errores.append(f"Columnas adicionales no permitidas: {', '.join(extra_cols)}")
+
+        return len(errores) == 0, errores
+
+    def column_diff(self, columns: List[str]) -> Dict[str, list]:
+        """Diferencias entre las columnas de una planilla y ``required_columns``.
+
+        Las columnas se comparan como en ``validate_header`` (sin distinguir
+        mayúsculas ni espacios): ``missing`` son las requeridas que faltan,
+        ``unexpected`` las que sobran y ``misplaced`` las requeridas que están
+        en otra posición.
+        """
+        found = [normalize_column_name(str(col).strip()) for col in columns]
+        required = [normalize_column_name(col.strip()) for col in self.required_columns]
+        return {
+            'missing': [col for col, key in zip(self.required_columns, required) if key not in found],
+            'unexpected': [col for col, key in zip(columns, found) if key not in required],
+            'misplaced': [
+                col for i, (col, key) in enumerate(zip(columns, found))
+                if key in required and (i >= len(required) or required[i] != key)
+            ],
+        }
+
+    def preflight_file(self, file_stream, filename: str) -> Dict[str, Any]:
+        """Revisar el encabezado de la primera hoja sin leer sus filas.
+
+        Retorna la misma validación de estructura que ``process_excel_file``,
+        las diferencias de columnas (``column_diff``) y una estimación de las
+        filas de datos (None si el archivo no la informa). Con un
+        ``PartialFile`` lanza ``MissingRange`` si falta un tramo del archivo.
+        """
+        if not self.validate_file_extension(filename):
+            return {
+                'success': False,
+                'error': self.extension_error(filename),
+                'detailed_errors': []
+            }
+
+        try:
+            preview = read_header_preview(file_stream)
+        except MissingRange:
+            # Con un archivo parcial, quien llama pide el tramo que falta
+            raise
+        except Exception as e:
+            logger.warning(f"No se pudo leer el encabezado de {filename}: {str(e)}")
+            return {
+                'success': False,
+                'error': "No se pudo leer el archivo Excel",
+                'detailed_errors': []
+            }
+
+        is_valid, structure_errors = self.validate_header(
+            preview.header, not preview.header or preview.estimated_rows == 0
+        )
+        return {
+            'success': True,
+            'valid': is_valid,
+            'format': preview.format,
+            'sheet': preview.sheet,
+            'columns': preview.header,
+            'column_diff': self.column_diff(preview.header),
+            'estimated_rows': preview.estimated_rows,
+            'detailed_errors': structure_errors
+        }
+
+    def build_csv_outputs(self, dnis: Sequence[str], notas: Sequence[str], form_data: dict = None,
+                          enroll: Sequence[bool] = None) -> Tuple[bytes, bytes]:
+        """Armar los CSV de alumnos y de notas a partir de las columnas exportadas.
+
+        ``dnis`` y ``notas`` son las columnas ya escapadas del resultado de un
+        procesamiento (``export_columns``), de modo que las líneas resultan
+        iguales a las originales. ``enroll`` marca las filas que van al CSV de
+        alumnos (todas si se omite); el CSV de notas lleva siempre todas.
+        """
+        alumnos_csv, notas_csv = self._join_exports(zip(dnis, notas), form_data)
+        if enroll is not None:
+            alumnos_suffix = self._alumnos_suffix(form_data)
+            alumnos = [dni + alumnos_suffix for dni, enrolled in zip(dnis, enroll) if enrolled]
+            alumnos_csv = '\n'.join([ALUMNOS_CSV_HEADER] + alumnos).encode('utf-8')
+        return alumnos_csv, notas_csv
+
+    def _join_exports(self, exports: Iterable[Tuple[str, str]], form_data: dict = None) -> Tuple[bytes, bytes]:
+        """Armar ambos CSV, con sus encabezados, a partir de pares (DNI, nota) ya escapados"""
+        alumnos_suffix = self._alumnos_suffix(form_data)
+        fecha_regularidad, fecha_promocion = self._notas_dates(form_data)
+        alumnos = [ALUMNOS_CSV_HEADER]
+        notas_lines = [NOTAS_CSV_HEADER]
+        for dni, nota in exports:
+            alumnos.append(dni + alumnos_suffix)
+            notas_lines.append(f"{dni},{nota},{fecha_regularidad},{nota},{fecha_promocion}")
+        return '\n'.join(alumnos).encode('utf-8'), '\n'.join(notas_lines).encode('utf-8')
+
+    def _report_params(self) -> Dict[str, object]:
+        """Parámetros de los mensajes de error: rango de notas y fila que se exporta de un DNI repetido"""
+        return {
+            'min_grade': self.min_grade,
+            'max_grade': self.max_grade,
+            'dni_policy': DNI_DUPLICATE_POLICIES.get(self.dni_policy, self.dni_policy),
+        }
+
+    def _alumnos_suffix(self, form_data: dict = None) -> str:
+        """Columnas del CSV de alumnos que siguen al DNI, tomadas del formulario"""
+        # Obtener valores del formulario o usar valores por defecto
+        propuesta = form_data.get('campo1', 'asdasdasd') if form_data else 'asdasdasd'
+        comision = form_data.get('campo2', 'asdasdasdas') if form_data else 'asdasdasdas'
+        actividad = form_data.get('campo3', 'dasdasada') if form_data else 'dasdasada'
+        periodo = form_data.get('campo4', 'asdasdadasd') if form_data else 'asdasdadasd'
+
+        return ',' + ','.join(self._csv_quote(value) for value in (propuesta, comision, actividad, periodo))
+
+    def _notas_dates(self, form_data: dict = None) -> Tuple[str, str]:
+        """Fechas de regularidad y de promoción del CSV de notas, escapadas para CSV"""
+        # Obtener valores del formulario o usar valores por defecto
+        fecha_regularidad = form_data.get('campo5', '12/31/2312') if form_data else '12/31/2312'
+        fecha_promocion = form_data.get('campo6', '13/12/3131') if form_data else '13/12/3131'
+        return self._csv_quote(fecha_regularidad), self._csv_quote(fecha_promocion)
+
+    @staticmethod
+    def _csv_quote(value) -> str:
+        """Escapar un valor para CSV (comillas solo cuando son necesarias)"""
+        value = str(value)
+        if any(char in value for char in CSV_SPECIAL_CHARS):
+            return '"' + value.replace('"', '""') + '"'
+        return value
+
+    @staticmethod
+    def _parse_grade(value: str) -> Optional[float]:
+        """Convertir una nota a float, o None si no es numérica"""
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+
+
+class BaseProcessor(SpreadsheetRules, ABC):
+    """Parte común de los motores de procesamiento de planillas.
+
+    Recorre la planilla o las hojas de un libro con las reglas de
+    ``SpreadsheetRules``; cada motor abre los archivos y procesa cada hoja
+    (``_open_reader``, ``_open_workbook`` y ``_process_sheet``).
+    """
+
+    def process_excel_file(self, file_stream, filename: str, form_data: dict = None) -> Dict[str, Any]:
+        """Procesar archivo Excel completo.
+
+        La planilla se lee en streaming: primero se valida el encabezado y luego
+        las filas pasan en bloques por el filtro de facultad, la validación de
+        contenido y la generación de los CSV. El resultado incluye en ``stats``
+        la duración de cada etapa, las filas y bytes procesados, y en
+        ``export_columns`` las columnas de DNI y nota de los CSV, ya escapadas.
+        """
+        stats = PipelineStats()
+        try:
+            logger.info(f"Iniciando procesamiento del archivo: {filename}")
+
+            # Validar extensión
+            if not self.validate_file_extension(filename):
+                logger.warning(f"Extensión de archivo no válida: {filename}")
+                return {
+                    'success': False,
+                    'error': self.extension_error(filename),
+                    'detailed_errors': [],
+                    'stats': stats.as_dict()
+                }
+
+            # Abrir archivo (solo se lee el encabezado)
+            with stats.stage('read'):
+                reader = self._open_reader(file_stream)
+            if reader is None:
+                logger.error("No se pudo leer el archivo Excel")
+                return {
+                    'success': False,
+                    'error': "No se pudo leer el archivo Excel",
+                    'detailed_errors': [],
+                    'stats': stats.as_dict()
+                }
+
+            with reader:
+                logger.info(f"Encabezado leído exitosamente. Columnas: {reader.header}")
+                # Validar estructura antes de leer las filas de datos
+                with stats.stage('structure_check'):
+                    is_valid, structure_errors = self.validate_header(reader.header, reader.is_empty)
+                if not is_valid:
+                    logger.warning(f"Errores de estructura encontrados: {structure_errors}")
+                    return {
+                        'success': False,
+                        'error': "El archivo no tiene la estructura correcta",
+                        'detailed_errors': structure_errors,
+                        'stats': stats.as_dict()
+                    }
+                logger.info("Estructura del archivo válida")
+                return self._process_sheet(reader, form_data, stats)
+
+        except Exception as e:
+            logger.error(f"Error en procesamiento: {str(e)}")
+            return {
+                'success': False,
+                'error': f"Error interno del servidor: {str(e)}",
+                'detailed_errors': [],
+                'stats': stats.as_dict()
+            }
+
+    def process_workbook(self, file_stream, filename: str, form_data: dict = None,
+                         sheet_form_data: Dict[str, dict] = None) -> Dict[str, Any]:
+        """Procesar cada hoja de un libro como una planilla independiente.
+
+        El libro se abre una sola vez y sus hojas se procesan una tras otra en
+        este proceso: el análisis de las filas no libera el GIL, de modo que
+        para usar varios núcleos ``ProcessPoolBackend`` reparte las hojas entre
+        sus trabajadores (``process_workbook_sheet``). Las hojas cuyo
+        encabezado no coincide con ``REQUIRED_COLUMNS`` se informan como
+        omitidas sin leer sus filas. ``sheet_form_data`` reemplaza campos del
+        formulario por nombre de hoja (por ejemplo, la comisión). En ``sheets``
+        se retorna el resultado de cada hoja en el orden del libro, como el de
+        ``process_excel_file`` más el nombre de la hoja y, si se omitió,
+        ``skipped``.
+        """
+        stats = PipelineStats()
+        try:
+            logger.info(f"Iniciando procesamiento por hojas del archivo: {filename}")
+
+            with stats.stage('read'):
+                workbook, failure = self._open_checked_workbook(file_stream, filename, stats)
+            if failure is not None:
+                return failure
+
+            with workbook:
+                logger.info(f"Hojas del libro: {workbook.sheet_names}")
+                outcomes = [
+                    self._process_workbook_sheet(workbook, sheet, sheet_form(form_data, sheet_form_data, sheet))
+                    for sheet in workbook.sheet_names
+                ]
+            return self.collect_sheets(outcomes, stats)
+
+        except Exception as e:
+            logger.error(f"Error en procesamiento: {str(e)}")
+            return {
+                'success': False,
+                'error': f"Error interno del servidor: {str(e)}",
+                'detailed_errors': [],
+                'stats': stats.as_dict()
+            }
+
+    def workbook_sheet_names(self, file_stream, filename: str,
+                             stats: PipelineStats = None) -> Tuple[Optional[List[str]], Optional[Dict[str, Any]]]:
+        """Nombres de las hojas de un libro, en orden.
+
+        Retorna los nombres y None, o None y el resultado de error si el
+        archivo no es un libro que se pueda leer.
+        """
+        workbook, failure = self._open_checked_workbook(file_stream, filename, stats)
+        if failure is not None:
+            return None, failure
+        with workbook:
+            return list(workbook.sheet_names), None
+
+    def process_workbook_sheet(self, file_stream, sheet: str,
+                               form_data: dict = None) -> Tuple[Dict[str, Any], PipelineStats]:
+        """Abrir un libro y procesar solo una de sus hojas (ver ``process_workbook``)"""
+        stats = PipelineStats(track_memory=False)
+        with stats.stage('read'):
+            workbook = self._open_workbook(file_stream)
+        if workbook is None:
+            return {
+                'success': False,
+                'error': "No se pudo leer el archivo Excel",
+                'detailed_errors': [],
+                'stats': stats.as_dict(),
+                'sheet': sheet
+            }, stats
+        with workbook:
+            result, sheet_stats = self._process_workbook_sheet(workbook, sheet, form_data)
+        stats.add(sheet_stats)
+        return result, stats
+
+    @staticmethod
+    def collect_sheets(outcomes: List[Tuple[Dict[str, Any], PipelineStats]],
+                       stats: PipelineStats = None) -> Dict[str, Any]:
+        """Resultado de un libro a partir del resultado y las mediciones de cada hoja, en orden"""
+        stats = stats or PipelineStats(track_memory=False)
+        sheets = []
+        for result, sheet_stats in outcomes:
+            stats.add(sheet_stats)
+            sheets.append(result)
+        processed = [result for result in sheets if result['success']]
+        logger.info(f"Hojas procesadas: {len(processed)} de {len(sheets)}")
+
+        if not processed:
+            return {
+                'success': False,
+                'error': "Ninguna hoja del libro tiene registros válidos",
+                'detailed_errors': [f"Hoja '{result['sheet']}': {result['error']}" for result in sheets],
+                'sheets': sheets,
+                'stats': stats.as_dict()
+            }
+
+        return {
+            'success': True,
+            'sheets': sheets,
+            'total_records': sum(result['total_records'] for result in processed),
+            'stats': stats.as_dict()
+        }
+
+    def _open_checked_workbook(self, file_stream, filename: str, stats: PipelineStats = None) -> tuple:
+        """Abrir un libro; retorna el libro y None, o None y el resultado de error"""
+        stats = stats or PipelineStats(track_memory=False)
+        if not self.validate_file_extension(filename):
+            logger.warning(f"Extensión de archivo no válida: {filename}")
+            return None, {
+                'success': False,
+                'error': self.extension_error(filename),
+                'detailed_errors': [],
+                'stats': stats.as_dict()
+            }
+
+        workbook = self._open_workbook(file_stream)
+        if workbook is None:
+            return None, {
+                'success': False,
+                'error': "No se pudo leer el archivo Excel",
+                'detailed_errors': [],
+                'stats': stats.as_dict()
+            }
+        return workbook, None
+
+    def _process_workbook_sheet(self, workbook, sheet: str,
+                                form_data: dict) -> Tuple[Dict[str, Any], PipelineStats]:
+        """Procesar una hoja de un libro abierto; retorna su resultado y sus mediciones"""
+        stats = PipelineStats(track_memory=False)
+        try:
+            with stats.stage('read'):
+                reader = workbook.sheet(sheet)
+            with reader:
+                # Las hojas que no son planillas de notas se descartan con solo su encabezado
+                with stats.stage('structure_check'):
+                    is_valid, structure_errors = self.validate_header(reader.header, reader.is_empty)
+                if is_valid:
+                    result = self._process_sheet(reader, form_data, stats)
+                else:
+                    logger.info(f"Hoja '{sheet}' omitida: {structure_errors}")
+                    result = {
+                        'success': False,
+                        'skipped': True,
+                        'error': "La hoja no tiene la estructura correcta",
+                        'detailed_errors': structure_errors,
+                        'stats': stats.as_dict()
+                    }
+        except Exception as e:
+            logger.error(f"Error en procesamiento de la hoja '{sheet}': {str(e)}")
+            result = {
+                'success': False,
+                'error': f"Error interno del servidor: {str(e)}",
+                'detailed_errors': [],
+                'stats': stats.as_dict()
+            }
+        result['sheet'] = sheet
+        return result, stats
+
+    @abstractmethod
+    def _process_sheet(self, reader, form_data: dict, stats: PipelineStats) -> Dict[str, Any]:
+        """Validar y exportar una hoja ya abierta con el encabezado validado (ver ``process_excel_file``)"""
+
+    @abstractmethod
+    def _open_reader(self, file_stream):
+        """Abrir la primera hoja de la planilla, o None si no se puede leer"""
+
+    @abstractmethod
+    def _open_workbook(self, file_stream):
+        """Abrir el libro para leer sus hojas, o None si no se puede leer"""
+
+
+def sheet_form(form_data: Optional[dict], sheet_form_data: Optional[Dict[str, dict]], sheet: str) -> dict:
+    """Datos del formulario de una hoja: los del libro con los propios de la hoja"""
+    return {**(form_data or {}), **(sheet_form_data or {}).get(sheet, {})}
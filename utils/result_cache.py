@@ -0,0 +1,125 @@
+"""
+Módulo de caché de resultados de procesamiento
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+from config.settings import RESULT_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Campos del formulario que forman parte de la clave de caché
+FORM_FIELDS = ['campo1', 'campo2', 'campo3', 'campo4', 'campo5', 'campo6']
+
+# Bytes estimados por valor de ``export_columns``: referencia y objeto str de un texto corto
+EXPORT_VALUE_BYTES = 64
+
+
+class ResultCache:
+    """Caché LRU de resultados de ``FileProcessor.process_excel_file``.
+
+    Las entradas se identifican por el contenido del archivo subido y los datos
+    normalizados del formulario, y se desalojan por orden de uso cuando el total
+    de bytes almacenados supera ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(content: Union[bytes, 'hashlib._Hash'], filename: str, form_data: dict = None) -> str:
+        """Calcular la clave de caché de una subida.
+
+        ``content`` son los bytes del archivo o el SHA-256 ya calculado sobre
+        ellos mientras se recibían (``UploadSpool.digest``); ambos dan la misma
+        clave.
+        """
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            digest = hashlib.sha256(content)
+        else:
+            digest = content.copy()
+        # La extensión decide cómo se lee el archivo, el resto del nombre no importa
+        extension = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+        digest.update(f"\0{extension}".encode('utf-8'))
+        for field in FORM_FIELDS:
+            value = form_data.get(field, '') if form_data else ''
+            digest.update(f"\0{str(value).strip()}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Obtener un resultado almacenado, o None si no está en caché"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, result: Dict[str, Any]) -> bool:
+        """Guardar un resultado; retorna False si no es cacheable o no entra"""
+        if not self.is_cacheable(result):
+            return False
+
+        size = self._result_size(result)
+        if size > self.max_bytes:
+            logger.info(f"Resultado de {size} bytes excede la caché ({self.max_bytes} bytes)")
+            return False
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+
+            self._entries[key] = (result, size)
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de uso de la caché"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self):
+        """Vaciar la caché (los contadores se conservan)"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @staticmethod
+    def is_cacheable(result: Dict[str, Any]) -> bool:
+        """Solo se guardan resultados deterministas: éxitos o errores de validación"""
+        return bool(result.get('success') or result.get('detailed_errors'))
+
+    @staticmethod
+    def _result_size(result: Dict[str, Any]) -> int:
+        """Estimar los bytes que ocupa un resultado"""
+        size = len(result.get('alumnos_csv') or b'') + len(result.get('notas_csv') or b'')
+        for key in ('detailed_errors', 'content_errors'):
+            size += sum(len(message) for message in result.get(key) or [])
+        size += sum(len(column) for column in result.get('export_columns') or ()) * EXPORT_VALUE_BYTES
+        if result.get('error_report') is not None:
+            size += result['error_report'].nbytes
+        return size
@@ -0,0 +1,82 @@
+"""
+Módulo de filtros de filas por valor de columna
+"""
+import math
+from collections import Counter
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+def normalize_value(value) -> str:
+    """Normalizar un valor de celda para compararlo: sin espacios extremos y en minúsculas"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().lower()
+
+
+class ValueFilter:
+    """Filtro de filas por los valores aceptados de una columna.
+
+    Los valores aceptados se normalizan una sola vez y la decisión de cada
+    valor distinto de la columna se memoriza, de modo que el lector puede
+    evaluarlo fila por fila mientras entrega los datos. Cuenta además las filas
+    descartadas por cada valor encontrado. La evaluación fila por fila no
+    requiere pandas, que se importa recién al filtrar una columna completa.
+    """
+
+    def __init__(self, position: int, accepted: Iterable[str]):
+        self.position = position
+        self.accepted = frozenset(normalize_value(value) for value in accepted)
+        self._decisions = {}
+        self._rejected = {}
+
+    def accepts(self, value) -> bool:
+        """Evaluar el valor de una fila y contarla si se descarta"""
+        decision = self._decisions.get(value)
+        if decision is None:
+            decision = self._decisions[value] = normalize_value(value) in self.accepted
+        if not decision:
+            self._rejected[value] = self._rejected.get(value, 0) + 1
+        return decision
+
+    def mask(self, values: 'pd.Series') -> 'np.ndarray':
+        """Evaluar una columna completa y contar las filas descartadas.
+
+        Se evalúa cada valor distinto una sola vez; en columnas categóricas la
+        comparación se resuelve por código de categoría.
+        """
+        import numpy as np
+        import pandas as pd
+
+        codes, uniques = pd.factorize(values)
+        # El código -1 (valor nulo) pasa a la última posición
+        unique_values = list(uniques) + [None]
+        codes = np.where(codes < 0, len(uniques), codes)
+        decisions = np.array([normalize_value(value) in self.accepted for value in unique_values], dtype=bool)
+        mask = decisions[codes]
+
+        rejected = np.bincount(codes[~mask], minlength=len(unique_values))
+        for code in np.flatnonzero(rejected):
+            value = unique_values[code]
+            self._rejected[value] = self._rejected.get(value, 0) + int(rejected[code])
+        return mask
+
+    @property
+    def skipped(self) -> Counter:
+        """Filas descartadas por cada valor de la columna"""
+        skipped = Counter()
+        for value, count in self._rejected.items():
+            skipped[_display_value(value)] += count
+        return skipped
+
+
+def _display_value(value) -> str:
+    """Valor de celda tal como se reporta en los contadores de filas descartadas"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return str(value).strip()
@@ -0,0 +1,70 @@
+"""
+Módulo de asociación entre los campos esperados y las columnas de la planilla
+"""
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import REQUIRED_COLUMNS
+
+if TYPE_CHECKING:  # pandas solo se usa en las anotaciones; no se importa al cargar el módulo
+    import pandas as pd
+
+
+def normalize_column_name(name) -> str:
+    """Normalizar un nombre de columna: sin espacios extremos y en minúsculas"""
+    return str(name).strip().lower()
+
+
+class SchemaBinding:
+    """Asociación de cada campo lógico con la posición física de su columna.
+
+    Se resuelve una única vez a partir del encabezado (sin distinguir mayúsculas
+    ni espacios extremos) y luego cada etapa obtiene las columnas por posición,
+    sin volver a buscar por nombre.
+    """
+
+    def __init__(self, positions: Dict[str, int], columns: Sequence[str]):
+        self.positions = positions
+        self.columns = list(columns)
+
+    @classmethod
+    def resolve(cls, columns: Sequence, fields: Sequence[str] = REQUIRED_COLUMNS) -> 'SchemaBinding':
+        """Resolver los campos contra un encabezado (la primera coincidencia gana)"""
+        by_name = {}
+        for position, column in enumerate(columns):
+            by_name.setdefault(normalize_column_name(column), position)
+
+        positions = {}
+        for field in fields:
+            position = by_name.get(normalize_column_name(field))
+            if position is not None:
+                positions[field] = position
+        return cls(positions, [str(column) for column in columns])
+
+    def __contains__(self, field: str) -> bool:
+        return field in self.positions
+
+    def position(self, field: str) -> Optional[int]:
+        """Posición de la columna de un campo, o None si no está presente"""
+        return self.positions.get(field)
+
+    def column_name(self, field: str) -> Optional[str]:
+        """Nombre físico de la columna de un campo, o None si no está presente"""
+        position = self.positions.get(field)
+        return None if position is None else self.columns[position]
+
+    def values(self, df: 'pd.DataFrame', field: str) -> Optional['pd.Series']:
+        """Columna de un campo en un DataFrame con este encabezado"""
+        position = self.positions.get(field)
+        return None if position is None else df.iloc[:, position]
+
+    def project(self, fields: Sequence[str]) -> Tuple[List[int], 'SchemaBinding']:
+        """Proyectar a un subconjunto de campos.
+
+        Retorna las posiciones físicas a leer y la asociación que corresponde al
+        DataFrame formado solo por esas columnas, en ese orden.
+        """
+        physical = [self.positions[field] for field in fields if field in self.positions]
+        projected = {
+            field: i for i, field in enumerate(field for field in fields if field in self.positions)
+        }
+        return physical, SchemaBinding(projected, [self.columns[position] for position in physical])
@@ -0,0 +1,43 @@
+"""
+Módulo con la lectura del encabezado y de las filas de datos de una hoja (sin pandas)
+"""
+from typing import Iterator, List, Optional, Sequence
+
+
+def normalize_header(row: Sequence) -> List[str]:
+    """Nombres de columna de una fila de encabezado, como los arma ``pd.read_excel``"""
+    header = list(row)
+    # Las celdas vacías al final del encabezado no son columnas
+    while header and header[-1] is None:
+        header.pop()
+    return [
+        f"Unnamed: {i}" if value is None else str(value)
+        for i, value in enumerate(header)
+    ]
+
+
+class SheetRows:
+    """Recorrido de las filas de una hoja, común a los lectores de ambos motores.
+
+    Las filas se toman de ``_rows`` (un iterador de tuplas con None en las
+    celdas vacías); el encabezado es la primera fila con algún valor.
+    """
+
+    _rows: Iterator[tuple]
+
+    def _read_header(self) -> List[str]:
+        """Leer la primera fila no vacía como encabezado"""
+        header_row = self._next_data_row()
+        return [] if header_row is None else normalize_header(header_row)
+
+    def _next_data_row(self) -> Optional[tuple]:
+        """Retornar la siguiente fila con al menos un valor, o None al terminar.
+
+        Deja en ``_skipped_rows`` la cantidad de filas vacías salteadas antes de ella.
+        """
+        self._skipped_rows = 0
+        for row in self._rows:
+            if any(value is not None for value in row):
+                return row
+            self._skipped_rows += 1
+        return None
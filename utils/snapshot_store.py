@@ -0,0 +1,241 @@
+"""
+Módulo de instantáneas por comisión de las notas exportadas
+"""
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from config.settings import SNAPSHOT_DB
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Campos del formulario que identifican una comisión: propuesta, comisión, actividad y periodo
+SNAPSHOT_KEY_FIELDS = ['campo1', 'campo2', 'campo3', 'campo4']
+
+# Nivel de compresión zlib de las columnas guardadas (los niveles altos apenas achican los DNIs)
+SNAPSHOT_COMPRESSION_LEVEL = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    propuesta TEXT NOT NULL,
+    comision TEXT NOT NULL,
+    actividad TEXT NOT NULL,
+    periodo TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    row_count INTEGER NOT NULL,
+    dnis BLOB NOT NULL,
+    notas BLOB NOT NULL,
+    PRIMARY KEY (propuesta, comision, actividad, periodo)
+);
+"""
+
+
+class Snapshot(NamedTuple):
+    """Último estado exportado de una comisión: DNIs sin repetir y la nota de cada uno"""
+    dnis: 'np.ndarray'
+    notas: 'np.ndarray'
+    updated_at: float
+
+
+class SnapshotDiff(NamedTuple):
+    """Comparación de una exportación con la instantánea anterior de su comisión.
+
+    ``mask`` marca las filas a exportar en el CSV de notas en modo de
+    cambios: alumnos nuevos y notas distintas de las ya exportadas.
+    ``is_new`` marca solo los alumnos nuevos, los únicos que van al CSV de
+    alumnos (los demás ya están inscriptos en SIGEAD).
+    """
+    mask: 'np.ndarray'
+    is_new: 'np.ndarray'
+    new: int
+    changed: int
+    unchanged: int
+    had_snapshot: bool
+
+    def as_dict(self) -> dict:
+        return {
+            'new': self.new,
+            'changed': self.changed,
+            'unchanged': self.unchanged,
+            'had_snapshot': self.had_snapshot,
+        }
+
+
+class SnapshotStore:
+    """Instantáneas DNI -> Nota de lo último exportado para cada comisión.
+
+    Cada comisión (``SNAPSHOT_KEY_FIELDS``) ocupa una fila de una base SQLite
+    en modo WAL, con los DNIs y sus notas guardados como dos columnas de texto
+    comprimidas con zlib. ``update`` compara una nueva exportación con la
+    instantánea mediante un hash join vectorizado (``pd.factorize``) y, en la
+    misma transacción, incorpora sus notas: las de alumnos ya conocidos se
+    reemplazan en su posición y los nuevos se agregan al final. Los alumnos
+    que ya no figuran en la planilla se conservan, porque siguen cargados en
+    SIGEAD.
+    """
+
+    def __init__(self, path=SNAPSHOT_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    @staticmethod
+    def key(form_data: dict) -> Tuple[str, ...]:
+        """Clave de la comisión a partir de los datos del formulario"""
+        return tuple(str(form_data.get(field, '') if form_data else '').strip() for field in SNAPSHOT_KEY_FIELDS)
+
+    def load(self, key: Tuple[str, ...]) -> Optional[Snapshot]:
+        """Instantánea de una comisión, o None si nunca se exportó"""
+        return self._load(self._connection(), key)
+
+    @contextmanager
+    def update(self, key: Tuple[str, ...], dnis: 'np.ndarray', notas: 'np.ndarray',
+               compare: bool = True) -> Iterator[Optional[SnapshotDiff]]:
+        """Comparar una exportación con la instantánea e incorporarla.
+
+        ``dnis`` y ``notas`` son las columnas exportadas (``export_columns``),
+        en el orden de los CSV. Si un DNI se repite, la instantánea conserva su
+        última nota. Entrega la comparación y confirma la instantánea al salir
+        del bloque sin errores; si el bloque falla (por ejemplo, al guardar
+        los CSV) la instantánea queda como estaba.
+
+        Con ``compare=False`` (exportaciones completas) solo incorpora las
+        notas y entrega None, sin usar NumPy ni pandas: el motor liviano
+        registra sus exportaciones sin cargarlos.
+        """
+        with self._transaction() as conn:
+            if not compare:
+                row = self._load_row(conn, key)
+                # Los DNIs conocidos conservan su posición y los nuevos se agregan al final
+                merged = dict(zip(_unpack_text(row[0]), _unpack_text(row[1]))) if row is not None else {}
+                merged.update(zip(dnis, notas))
+                self._save(conn, key, list(merged), list(merged.values()))
+                yield None
+                return
+
+            import numpy as np
+
+            dnis = np.asarray(dnis, dtype=object)
+            notas = np.asarray(notas, dtype=object)
+            snapshot = self._load(conn, key)
+            snapshot_dnis = snapshot.dnis if snapshot is not None else np.empty(0, dtype=object)
+            snapshot_notas = snapshot.notas if snapshot is not None else np.empty(0, dtype=object)
+
+            is_new, changed, merged_dnis, merged_notas = diff_columns(snapshot_dnis, snapshot_notas, dnis, notas)
+            self._save(conn, key, merged_dnis, merged_notas)
+
+            mask = is_new | changed
+            yield SnapshotDiff(
+                mask=mask,
+                is_new=is_new,
+                new=int(is_new.sum()),
+                changed=int(changed.sum()),
+                unchanged=int(len(mask) - mask.sum()),
+                had_snapshot=snapshot is not None,
+            )
+
+    def count(self) -> int:
+        """Cantidad de comisiones con instantánea"""
+        return self._connection().execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+    @classmethod
+    def _load(cls, conn: sqlite3.Connection, key: Tuple[str, ...]) -> Optional[Snapshot]:
+        row = cls._load_row(conn, key)
+        if row is None:
+            return None
+        return Snapshot(_unpack(row[0]), _unpack(row[1]), row[2])
+
+    @staticmethod
+    def _load_row(conn: sqlite3.Connection, key: Tuple[str, ...]) -> Optional[tuple]:
+        return conn.execute(
+            "SELECT dnis, notas, updated_at FROM snapshots "
+            "WHERE propuesta = ? AND comision = ? AND actividad = ? AND periodo = ?",
+            key,
+        ).fetchone()
+
+    @staticmethod
+    def _save(conn: sqlite3.Connection, key: Tuple[str, ...], dnis: Sequence[str], notas: Sequence[str]):
+        conn.execute(
+            "INSERT OR REPLACE INTO snapshots "
+            "(propuesta, comision, actividad, periodo, updated_at, row_count, dnis, notas) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (*key, time.time(), len(dnis), _pack(dnis), _pack(notas)),
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transacción que se confirma al salir del bloque sin errores"""
+        conn = self._connection()
+        # BEGIN IMMEDIATE: otro proceso no puede modificar la comisión entre la lectura y la escritura
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión SQLite propia del hilo actual (las transacciones se manejan a mano)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def diff_columns(snapshot_dnis: 'np.ndarray', snapshot_notas: 'np.ndarray',
+                 dnis: 'np.ndarray', notas: 'np.ndarray') -> tuple:
+    """Hash join de una exportación con la instantánea de su comisión.
+
+    Retorna las máscaras de filas nuevas y de notas cambiadas de la
+    exportación, y las columnas de la instantánea actualizada.
+    """
+    import numpy as np
+    import pandas as pd
+
+    # Una sola pasada de hash sobre ambas columnas: como la instantánea no
+    # repite DNIs, sus códigos son sus posiciones y los DNIs nuevos reciben
+    # códigos a partir de su largo, en orden de aparición
+    codes, merged_dnis = pd.factorize(np.concatenate([snapshot_dnis, dnis]))
+    codes = codes[len(snapshot_dnis):]
+    is_new = codes >= len(snapshot_dnis)
+    changed = np.zeros(len(dnis), dtype=bool)
+    changed[~is_new] = snapshot_notas[codes[~is_new]] != notas[~is_new]
+
+    # Un DNI repetido en la exportación queda con su última nota
+    last = np.full(len(merged_dnis), -1)
+    np.maximum.at(last, codes, np.arange(len(codes)))
+    merged_notas = np.concatenate([snapshot_notas, np.empty(len(merged_dnis) - len(snapshot_dnis), dtype=object)])
+    exported = last >= 0
+    merged_notas[exported] = notas[last[exported]]
+    return is_new, changed, merged_dnis, merged_notas
+
+
+def _pack(values) -> bytes:
+    """Guardar una columna de texto como líneas comprimidas (los valores no tienen saltos de línea)"""
+    return zlib.compress('\n'.join(values).encode('utf-8'), SNAPSHOT_COMPRESSION_LEVEL)
+
+
+def _unpack(blob: bytes) -> 'np.ndarray':
+    import numpy as np
+
+    return np.array(_unpack_text(blob), dtype=object)
+
+
+def _unpack_text(blob: bytes) -> List[str]:
+    text = zlib.decompress(blob).decode('utf-8')
+    return text.split('\n') if text else []
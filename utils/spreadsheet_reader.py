@@ -0,0 +1,467 @@
+"""
+Módulo para la lectura en streaming de planillas Excel y CSV
+"""
+import codecs
+import csv
+import importlib.util
+import io
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Collection, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from config.settings import READ_CHUNK_SIZE, SPREADSHEET_ENGINE
+from .file_format import (
+    CSV_SAMPLE_SIZE, CSV_SHEET_NAME, detect_delimiter, detect_encoding, sniff_format, utf8_stream,
+)
+from .row_filter import ValueFilter
+from .sheet_rows import SheetRows
+
+logger = logging.getLogger(__name__)
+
+
+class SheetReader(SheetRows, ABC):
+    """Lector en streaming de una hoja de una planilla (por defecto, la primera).
+
+    Cada motor entrega las filas como tuplas y esta clase arma el encabezado y
+    los bloques: el encabezado se lee apenas se abre el archivo y las filas de
+    datos se entregan en DataFrames de tamaño acotado, de modo que la memoria
+    depende del tamaño de bloque y no del de la planilla.
+
+    Si se recibe un ``workbook`` ya abierto (ver ``Workbook``) la hoja se lee
+    de él y el libro no se cierra junto con el lector.
+    """
+    engine = ''
+    module = ''
+
+    def __init__(self, file_stream, chunk_size: int = READ_CHUNK_SIZE,
+                 sheet: Union[int, str] = 0, workbook=None):
+        self.chunk_size = chunk_size
+        self._owns_workbook = workbook is None
+        self._workbook = workbook
+        try:
+            if self._owns_workbook:
+                self._workbook = self.load_workbook(file_stream)
+            self._rows = iter(self._sheet_rows(self._workbook, sheet))
+            self.header = self._read_header()
+            # Se adelanta la primera fila de datos para saber si la hoja está vacía
+            self._pending = self._next_data_row()
+            self._pending_skipped = self._skipped_rows
+        except Exception:
+            self.close()
+            raise
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Indica si la biblioteca del motor está instalada"""
+        return importlib.util.find_spec(cls.module) is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def is_empty(self) -> bool:
+        """Indica si la hoja no tiene filas de datos"""
+        return not self.header or self._pending is None
+
+    def iter_chunks(self, positions: Optional[Sequence[int]] = None,
+                    categories: Collection[int] = (),
+                    row_filter: Optional[ValueFilter] = None) -> Iterator[pd.DataFrame]:
+        """Entregar las filas de datos en DataFrames de a ``chunk_size`` filas.
+
+        Si se indican ``positions`` solo se materializan esas columnas, en ese
+        orden; las columnas cuyas posiciones están en ``categories`` se cargan
+        como categorías. Las filas que no pasan ``row_filter`` se descartan
+        antes de armar los bloques. El índice de cada bloque es la posición de
+        la fila de datos en la hoja, igual que en el DataFrame completo que arma
+        ``pd.read_excel``: las filas vacías no se entregan pero se cuentan.
+        """
+        positions = list(range(len(self.header))) if positions is None else list(positions)
+        names = [self.header[position] for position in positions]
+        width = len(self.header)
+
+        row_number = -1
+        block = []
+        block_rows = []
+        while self._pending is not None:
+            row, skipped = self._pending, self._pending_skipped
+            self._pending = self._next_data_row()
+            self._pending_skipped = self._skipped_rows
+            row_number += 1 + skipped
+
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            if row_filter is None or row_filter.accepts(row[row_filter.position]):
+                block.append(row)
+                block_rows.append(row_number)
+
+            if block and (len(block) >= self.chunk_size or self._pending is None):
+                yield self._build_chunk(block, names, positions, block_rows, categories)
+                block = []
+                block_rows = []
+
+    def read_all(self, categories: Collection[int] = ()) -> pd.DataFrame:
+        """Leer todas las filas de datos en un único DataFrame"""
+        chunks = list(self.iter_chunks(categories=categories))
+        if not chunks:
+            return pd.DataFrame(columns=self.header)
+
+        df = pd.concat(chunks)
+        # concat convierte a object las categorías que difieren entre bloques
+        for position in categories:
+            merged = union_categoricals([chunk.iloc[:, position] for chunk in chunks])
+            df.isetitem(position, pd.Series(merged, index=df.index))
+        return df
+
+    def close(self):
+        """Liberar el archivo subyacente si el lector lo abrió"""
+        if self._workbook is not None and self._owns_workbook:
+            self.close_workbook(self._workbook)
+        self._workbook = None
+
+    @classmethod
+    @abstractmethod
+    def load_workbook(cls, file_stream):
+        """Abrir el libro con la biblioteca del motor"""
+
+    @classmethod
+    @abstractmethod
+    def sheet_names(cls, workbook) -> List[str]:
+        """Nombres de las hojas del libro, en orden"""
+
+    @classmethod
+    def close_workbook(cls, workbook):
+        """Cerrar un libro abierto con ``load_workbook``"""
+
+    @abstractmethod
+    def _sheet_rows(self, workbook, sheet: Union[int, str]) -> Iterable[tuple]:
+        """Filas de una hoja del libro, por posición o por nombre"""
+
+    @staticmethod
+    def _build_chunk(block: List[tuple], names: List[str], positions: List[int], rows: List[int],
+                     categories: Collection[int] = ()) -> pd.DataFrame:
+        """Armar un DataFrame con las columnas proyectadas de un bloque de filas"""
+        data = {
+            i: pd.Series(
+                [_convert_cell(row[position]) for row in block],
+                dtype='category' if position in categories else object,
+            )
+            for i, position in enumerate(positions)
+        }
+        index = _row_index(rows)
+        # Las columnas se nombran al final para admitir encabezados repetidos
+        return pd.DataFrame(data).set_axis(names, axis=1).set_axis(index, axis=0)
+
+
+class OpenpyxlSheetReader(SheetReader):
+    """Lector de .xlsx con openpyxl en modo ``read_only``"""
+    engine = 'openpyxl'
+    module = 'openpyxl'
+
+    @classmethod
+    def load_workbook(cls, file_stream):
+        import openpyxl
+        return openpyxl.load_workbook(file_stream, read_only=True, data_only=True)
+
+    @classmethod
+    def sheet_names(cls, workbook) -> List[str]:
+        return workbook.sheetnames
+
+    @classmethod
+    def close_workbook(cls, workbook):
+        workbook.close()
+
+    def _sheet_rows(self, workbook, sheet: Union[int, str]) -> Iterable[tuple]:
+        worksheet = workbook.worksheets[sheet] if isinstance(sheet, int) else workbook[sheet]
+        return worksheet.iter_rows(values_only=True)
+
+
+class XlrdSheetReader(SheetReader):
+    """Lector de .xls (BIFF) con xlrd"""
+    engine = 'xlrd'
+    module = 'xlrd'
+
+    @classmethod
+    def load_workbook(cls, file_stream):
+        import xlrd
+        return xlrd.open_workbook(file_contents=file_stream.read(), on_demand=True)
+
+    @classmethod
+    def sheet_names(cls, workbook) -> List[str]:
+        return workbook.sheet_names()
+
+    @classmethod
+    def close_workbook(cls, workbook):
+        workbook.release_resources()
+
+    def _sheet_rows(self, workbook, sheet: Union[int, str]) -> Iterable[tuple]:
+        import xlrd
+        # Con on_demand cada hoja se carga recién al pedirla
+        xl_sheet = workbook.sheet_by_index(sheet) if isinstance(sheet, int) else workbook.sheet_by_name(sheet)
+        return self._iter_rows(xlrd, xl_sheet, workbook.datemode)
+
+    @staticmethod
+    def _iter_rows(xlrd, sheet, datemode: int) -> Iterator[tuple]:
+        for row_index in range(sheet.nrows):
+            yield tuple(
+                _convert_xlrd_cell(xlrd, cell_type, value, datemode)
+                for cell_type, value in zip(sheet.row_types(row_index), sheet.row_values(row_index))
+            )
+
+
+class CalamineSheetReader(SheetReader):
+    """Lector de .xlsx y .xls con python-calamine (opcional, implementado en Rust)"""
+    engine = 'calamine'
+    module = 'python_calamine'
+
+    @classmethod
+    def load_workbook(cls, file_stream):
+        from python_calamine import CalamineWorkbook
+        return CalamineWorkbook.from_filelike(file_stream)
+
+    @classmethod
+    def sheet_names(cls, workbook) -> List[str]:
+        return workbook.sheet_names
+
+    @classmethod
+    def close_workbook(cls, workbook):
+        workbook.close()
+
+    def _sheet_rows(self, workbook, sheet: Union[int, str]) -> Iterable[tuple]:
+        sheet = workbook.get_sheet_by_index(sheet) if isinstance(sheet, int) else workbook.get_sheet_by_name(sheet)
+        # Calamine omite las columnas vacías iniciales; se restituyen para conservar posiciones
+        offset = (None,) * (sheet.start[1] if sheet.start else 0)
+        return (
+            offset + tuple(_convert_calamine_cell(value) for value in row)
+            for row in sheet.iter_rows()
+        )
+
+
+class CsvSheetReader(SheetReader):
+    """Lector de CSV y TSV con el parser en C de pandas.
+
+    La codificación (UTF-8 o Latin-1), el separador y el encabezado se
+    detectan sobre una muestra inicial del archivo; un byte que no es UTF-8
+    después de la muestra hace pasar el resto a Latin-1. Luego solo se leen las
+    columnas pedidas, como texto y en bloques de ``chunk_size`` filas. Un CSV
+    es un libro de una sola hoja, ``CSV_SHEET_NAME``.
+    """
+    engine = 'csv'
+    module = 'pandas'
+
+    def __init__(self, file_stream, chunk_size: int = READ_CHUNK_SIZE,
+                 sheet: Union[int, str] = 0, workbook=None):
+        if sheet not in (0, CSV_SHEET_NAME):
+            raise ValueError(f"Un CSV no tiene la hoja {sheet!r}")
+        self.chunk_size = chunk_size
+        self._owns_workbook = workbook is None
+        self._workbook = file_stream if workbook is None else workbook
+        file_stream = self._stream = self._workbook
+        self._start = file_stream.tell()
+        sample = file_stream.read(CSV_SAMPLE_SIZE)
+        file_stream.seek(self._start)
+
+        self.encoding = detect_encoding(sample)
+        text = codecs.getincrementaldecoder(self.encoding)(errors='replace').decode(sample)
+        self.delimiter = detect_delimiter(text)
+
+        self._sample_text = text
+        self._rows = iter(self._sheet_rows(self._workbook, sheet))
+        self.header = self._read_header()
+        # Líneas físicas hasta el encabezado inclusive, que el parser debe saltear
+        self._header_lines = self._sample_reader.line_num
+        has_data = self._next_data_row() is not None
+        # Si la muestra no llegó al final del archivo se asume que hay más datos
+        self._pending = () if has_data or len(sample) == CSV_SAMPLE_SIZE else None
+
+    def iter_chunks(self, positions: Optional[Sequence[int]] = None,
+                    categories: Collection[int] = (),
+                    row_filter: Optional[ValueFilter] = None) -> Iterator[pd.DataFrame]:
+        positions = list(range(len(self.header))) if positions is None else list(positions)
+        names = [self.header[position] for position in positions]
+        if self.is_empty:
+            return
+
+        # La columna del filtro se lee aunque no esté proyectada
+        usecols = sorted(set(positions) | ({row_filter.position} if row_filter else set()))
+        dtypes = {position: 'category' if position in categories else str for position in usecols}
+        self._stream.seek(self._start)
+        parser = pd.read_csv(
+            utf8_stream(self._stream, self.encoding), sep=self.delimiter, encoding=self.encoding, header=None,
+            skiprows=self._header_lines, usecols=usecols, dtype=dtypes,
+            chunksize=self.chunk_size, engine='c', skip_blank_lines=True,
+            names=range(len(self.header)), index_col=False,
+        )
+        row_number = 0
+        for chunk in parser:
+            # Las filas que solo tienen separadores se ignoran y, como las líneas vacías, no se cuentan
+            chunk = chunk.dropna(how='all')
+            rows = np.arange(row_number, row_number + len(chunk))
+            row_number += len(chunk)
+            if row_filter is not None:
+                keep = row_filter.mask(chunk[row_filter.position])
+                chunk = chunk[keep]
+                rows = rows[keep]
+            if chunk.empty:
+                continue
+            yield chunk[positions].set_axis(names, axis=1).set_axis(_row_index(rows), axis=0)
+
+    @classmethod
+    def load_workbook(cls, file_stream):
+        # El propio archivo hace de libro: cada lector lo recorre desde el inicio
+        return file_stream
+
+    @classmethod
+    def sheet_names(cls, workbook) -> List[str]:
+        return [CSV_SHEET_NAME]
+
+    def _sheet_rows(self, workbook, sheet: Union[int, str]) -> Iterable[tuple]:
+        # Filas de la muestra inicial, de las que se toma el encabezado; los datos los lee pandas
+        self._sample_reader = csv.reader(io.StringIO(self._sample_text), delimiter=self.delimiter)
+        return (tuple(value if value != '' else None for value in row) for row in self._sample_reader)
+
+
+class Workbook:
+    """Libro abierto una sola vez del que se leen varias hojas.
+
+    El archivo se interpreta al abrir el libro y cada ``sheet()`` retorna un
+    ``SheetReader`` sobre él. Las hojas pueden leerse desde varios hilos: la
+    apertura de cada hoja (que con calamine y xlrd carga la hoja completa) se
+    serializa y luego cada lector avanza por su cuenta. Con openpyxl abrir una
+    hoja solo lee su encabezado, de modo que descartar las hojas que no
+    corresponden cuesta una fila.
+    """
+
+    def __init__(self, reader_class: type, file_stream, chunk_size: int = READ_CHUNK_SIZE):
+        self.reader_class = reader_class
+        self.engine = reader_class.engine
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._workbook = reader_class.load_workbook(file_stream)
+        self.sheet_names = list(reader_class.sheet_names(self._workbook))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def sheet(self, sheet: Union[int, str]) -> SheetReader:
+        """Abrir una hoja, por posición o por nombre"""
+        with self._lock:
+            return self.reader_class(None, self.chunk_size, sheet=sheet, workbook=self._workbook)
+
+    def close(self):
+        """Cerrar el libro; los lectores de sus hojas dejan de poder usarse"""
+        if self._workbook is not None:
+            self.reader_class.close_workbook(self._workbook)
+            self._workbook = None
+
+
+# Motores registrados por nombre
+READER_ENGINES = {
+    reader.engine: reader
+    for reader in (OpenpyxlSheetReader, XlrdSheetReader, CalamineSheetReader, CsvSheetReader)
+}
+
+# Motores de cada formato, en el orden en que los prueba 'auto'. En .xlsx se
+# prefiere openpyxl, que lee la hoja en streaming y permite rechazar el archivo
+# apenas se lee el encabezado; calamine carga la hoja completa y solo se usa si
+# se pide. En .xls ambos motores cargan la hoja completa y calamine es más rápido.
+ENGINE_PREFERENCE = {
+    'xlsx': ['openpyxl', 'calamine'],
+    'xls': ['calamine', 'xlrd'],
+    'csv': ['csv'],
+}
+
+# Compatibilidad con el nombre anterior del lector de .xlsx
+ExcelSheetReader = OpenpyxlSheetReader
+
+
+def available_engines(file_format: str) -> List[str]:
+    """Motores instalados para un formato, en orden de preferencia"""
+    return [
+        engine for engine in ENGINE_PREFERENCE.get(file_format, [])
+        if READER_ENGINES[engine].is_available()
+    ]
+
+
+def open_sheet_reader(file_stream, chunk_size: int = READ_CHUNK_SIZE,
+                      engine: str = SPREADSHEET_ENGINE) -> SheetReader:
+    """Abrir la primera hoja de una planilla con el motor indicado o, con 'auto', el preferido disponible.
+
+    El formato se detecta por el contenido y no por la extensión del archivo.
+    """
+    file_stream, reader_class = _select_reader(file_stream, engine)
+    return reader_class(file_stream, chunk_size=chunk_size)
+
+
+def open_workbook(file_stream, chunk_size: int = READ_CHUNK_SIZE,
+                  engine: str = SPREADSHEET_ENGINE) -> Workbook:
+    """Abrir un libro para leer varias de sus hojas, eligiendo el motor como ``open_sheet_reader``"""
+    file_stream, reader_class = _select_reader(file_stream, engine)
+    return Workbook(reader_class, file_stream, chunk_size)
+
+
+def _select_reader(file_stream, engine: str) -> tuple:
+    """Detectar el formato y retornar (archivo posicionable, clase del lector)"""
+    if not file_stream.seekable():
+        file_stream = io.BytesIO(file_stream.read())
+    file_format = sniff_format(file_stream)
+    engines = available_engines(file_format)
+    if not engines:
+        raise ValueError(f"Formato de planilla no soportado: {file_format or 'desconocido'}")
+
+    if engine != 'auto':
+        if engine not in engines:
+            raise ValueError(f"El motor '{engine}' no está disponible para archivos {file_format}")
+        engines = [engine]
+
+    logger.info(f"Leyendo planilla {file_format} con el motor {engines[0]}")
+    return file_stream, READER_ENGINES[engines[0]]
+
+
+def _convert_xlrd_cell(xlrd, cell_type: int, value, datemode: int):
+    """Convertir una celda de xlrd a los tipos que entrega openpyxl"""
+    if cell_type in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+        return None
+    if cell_type == xlrd.XL_CELL_DATE:
+        return xlrd.xldate_as_datetime(value, datemode)
+    if cell_type == xlrd.XL_CELL_BOOLEAN:
+        return bool(value)
+    if cell_type == xlrd.XL_CELL_TEXT and value == '':
+        return None
+    return value
+
+
+def _row_index(rows: Sequence[int]) -> pd.Index:
+    """Índice de un bloque: un rango si las filas son consecutivas"""
+    if rows[-1] - rows[0] + 1 == len(rows):
+        return pd.RangeIndex(rows[0], rows[0] + len(rows))
+    return pd.Index(rows, dtype='int64')
+
+
+def _convert_calamine_cell(value):
+    """Convertir una celda de calamine a los tipos que entrega openpyxl"""
+    if value == '':
+        return None
+    if type(value) is date:
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _convert_cell(value):
+    """Normalizar un valor de celda como lo hace ``pd.read_excel``"""
+    if value is None:
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
@@ -0,0 +1,60 @@
+"""
+Módulo de recepción de archivos subidos en streaming
+"""
+import hashlib
+from tempfile import SpooledTemporaryFile
+
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from config.settings import MAX_FILE_SIZE, UPLOAD_SPOOL_MAX_MEMORY
+
+
+class UploadSpool(SpooledTemporaryFile):
+    """Archivo subido que se guarda en memoria hasta ``max_memory`` bytes y luego en disco.
+
+    El parser de multipart escribe el archivo por bloques; cada bloque se
+    suma al hash SHA-256 del contenido y al tamaño recibido, de modo que al
+    terminar la subida no hace falta volver a leerlo. Si se supera
+    ``max_size`` la subida se corta con ``RequestEntityTooLarge``; con
+    ``abort=False`` se descarta lo recibido y se marca ``oversized`` para que
+    quien lo procese informe el error (por ejemplo, un archivo de un lote).
+    """
+
+    def __init__(self, max_size: int = MAX_FILE_SIZE, max_memory: int = UPLOAD_SPOOL_MAX_MEMORY,
+                 abort: bool = True):
+        super().__init__(max_size=max_memory, mode='w+b')
+        self.max_size = max_size
+        self.abort = abort
+        self.size = 0
+        self.oversized = False
+        self.digest = hashlib.sha256()
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        if self.oversized:
+            return len(data)
+        if self.size > self.max_size:
+            if self.abort:
+                raise RequestEntityTooLarge()
+            # El contenido ya no se va a procesar: se libera lo guardado
+            self.oversized = True
+            self.seek(0)
+            self.truncate()
+            return len(data)
+        self.digest.update(data)
+        return super().write(data)
+
+
+class UploadRequest(Request):
+    """Solicitud que recibe cada archivo en un ``UploadSpool``.
+
+    ``max_file_size`` es el límite de cada archivo y ``abort_oversized_files``
+    indica si superarlo corta la solicitud; una ruta puede cambiarlos antes de
+    leer ``request.files``, como ``max_content_length``.
+    """
+    max_file_size = MAX_FILE_SIZE
+    abort_oversized_files = True
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadSpool(self.max_file_size, abort=self.abort_oversized_files)
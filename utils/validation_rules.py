@@ -0,0 +1,259 @@
+"""
+Módulo de reglas de validación de contenido y formato de sus errores (sin pandas)
+"""
+import csv
+import io
+import re
+from abc import ABC, abstractmethod
+from array import array
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Valores especiales de nota que son válidos sin validación numérica
+NOTA_SPECIAL_VALUES = ['-', 'ausente', 'equivalencia', 'equivalente', 'aprobado', 'desaprobado']
+
+# Formatos de fecha aceptados, en una única expresión precompilada
+DATE_PATTERN = re.compile(
+    r'^(?:'
+    r'\d{1,2}/\d{1,2}/\d{4}'                        # DD/MM/YYYY
+    r'|\d{4}-\d{1,2}-\d{1,2}'                       # YYYY-MM-DD
+    r'|\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{1,2}:\d{1,2}'  # YYYY-MM-DD HH:MM:SS
+    r'|\d{1,2}-\d{1,2}-\d{4}'                       # DD-MM-YYYY
+    r'|\d{1,2}/\d{1,2}/\d{2}'                       # DD/MM/YY
+    r'|\d{4}/\d{1,2}/\d{1,2}'                       # YYYY/MM/DD
+    r')$'
+)
+
+# Textos que pandas interpreta como fecha nula (se consideran válidos)
+NULL_DATE_STRINGS = {'', 'nan', 'none', 'nat', 'null'}
+
+# Rango de fechas interpretables: el de pd.Timestamp, que acota a pd.to_datetime
+DATE_MIN = datetime(1677, 9, 21, 0, 12, 44)
+DATE_MAX = datetime(2262, 4, 11, 23, 47, 16)
+
+# Máximo de textos de fecha recordados entre llamadas
+DATE_CACHE_SIZE = 10_000
+
+# Reglas de validación de contenido, en el orden en que se informan los errores de una fila
+RULE_MESSAGES = {
+    'facultad_vacia': "Facultad está vacía",
+    'nota_fuera_de_rango': "Nota {value} fuera del rango {min_grade}-{max_grade}",
+    'nota_invalida': "Nota '{value}' no es un número válido ni un valor especial permitido",
+    'dni_invalido': "DNI '{value}' no es válido (debe ser numérico y tener al menos 7 dígitos)",
+    'fecha_invalida': "Fecha '{value}' no tiene formato válido (acepta DD/MM/YYYY, YYYY-MM-DD, etc.)",
+    'apellido_vacio': "Campo 'Apellido' está vacío",
+    'nombre_vacio': "Campo 'Nombre' está vacío",
+    # Los DNIs repetidos se detectan al terminar la planilla y se exporta una sola de sus filas
+    'dni_repetido': "DNI '{value}' está repetido; se exporta una sola vez",
+    'dni_notas_distintas': "DNI '{value}' está repetido con notas distintas; se exporta {dni_policy}",
+}
+RULES = list(RULE_MESSAGES)
+RULE_IDS = {rule: rule_id for rule_id, rule in enumerate(RULES)}
+
+# Columnas del reporte completo de errores
+REPORT_HEADER = ['fila', 'regla', 'valor', 'mensaje']
+# Errores por bloque al generar el reporte completo
+REPORT_BATCH_SIZE = 10_000
+# Filas con errores a partir de las cuales el resumen agrega un aviso general
+SUMMARY_WARNING_ROWS = 10
+# Filas que se listan por mensaje en el resumen
+SUMMARY_ROWS_PER_MESSAGE = 5
+
+
+def is_valid_date(value) -> bool:
+    """Validar una fecha: vacía, ya convertida por la biblioteca o texto interpretable como fecha"""
+    if value is None or isinstance(value, date):
+        return True
+    text = str(value).strip()
+    return text.lower() in NULL_DATE_STRINGS or bool(DATE_PATTERN.match(text)) or parse_date_text(text)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date_text(text: str) -> bool:
+    """Interpretar un texto de fecha que no coincide con ``DATE_PATTERN``.
+
+    Es el criterio de ambos motores y sigue las reglas de
+    ``pd.to_datetime(format='mixed')``: ISO 8601 o cualquier formato que
+    reconozca dateutil, salvo números sueltos menores que 1000, y dentro del
+    rango de ``pd.Timestamp``.
+    """
+    from dateutil import parser
+
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        try:
+            if float(text) < 1000:
+                return False
+        except ValueError:
+            pass
+        try:
+            parsed = parser.parse(text)
+        except (ValueError, OverflowError):
+            return False
+    return DATE_MIN <= parsed.replace(tzinfo=None) <= DATE_MAX
+
+
+class BaseErrorReport(ABC):
+    """Parte común de los acumuladores de errores de validación.
+
+    Cada error es una terna (regla, fila, referencia al valor); cada valor
+    distinto que causó un error se guarda una sola vez por regla. Las
+    subclases guardan las ternas y las entregan ordenadas por fila y regla en
+    ``_columns``; los mensajes se arman recién al mostrarlos.
+    """
+
+    def __init__(self, params: Dict[str, object] = None):
+        # Parámetros de los mensajes (por ejemplo, el rango de notas)
+        self.params = dict(params or {})
+        self._values = {rule: [] for rule in RULES}
+        self._value_ids = {rule: {} for rule in RULES}
+
+    def __len__(self) -> int:
+        return len(self._columns()[1])
+
+    @property
+    @abstractmethod
+    def row_count(self) -> int:
+        """Cantidad de filas con al menos un error"""
+
+    def message(self, rule_id: int, ref: int) -> str:
+        """Mensaje de un error"""
+        rule = RULES[rule_id]
+        value = self._values[rule][ref] if ref >= 0 else None
+        return RULE_MESSAGES[rule].format(value=value, **self.params)
+
+    def summary(self) -> List[str]:
+        """Mensajes consolidados: uno por mensaje distinto, con sus primeras filas.
+
+        Los mensajes aparecen en el orden de su primera fila y, dentro de una
+        fila, en el orden de las reglas.
+        """
+        consolidated = [
+            summary_line(self.message(rule_id, ref), rows, count)
+            for rule_id, ref, rows, count in self._message_groups()
+        ]
+        row_count = self.row_count
+        if consolidated and row_count > SUMMARY_WARNING_ROWS:
+            consolidated.insert(0, f"⚠️ Se encontraron errores en {row_count} filas del archivo.")
+        return consolidated
+
+    def iter_csv(self, batch_size: int = REPORT_BATCH_SIZE) -> Iterator[bytes]:
+        """Generar por partes el reporte completo en CSV (UTF-8), una línea por error"""
+        rule_ids, rows, refs = self._columns()
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator='\n')
+        writer.writerow(REPORT_HEADER)
+
+        # Cada mensaje se arma una sola vez aunque se repita en muchas filas
+        messages = {}
+        for start in range(0, len(rows), batch_size):
+            for rule_id, row, ref in zip(rule_ids[start:start + batch_size].tolist(),
+                                         rows[start:start + batch_size].tolist(),
+                                         refs[start:start + batch_size].tolist()):
+                entry = messages.get((rule_id, ref))
+                if entry is None:
+                    rule = RULES[rule_id]
+                    value = self._values[rule][ref] if ref >= 0 else ''
+                    entry = messages[(rule_id, ref)] = (rule, value, self.message(rule_id, ref))
+                writer.writerow((row, *entry))
+            yield output.getvalue().encode('utf-8')
+            output.seek(0)
+            output.truncate()
+        if output.tell():
+            yield output.getvalue().encode('utf-8')
+
+    @abstractmethod
+    def _columns(self) -> tuple:
+        """Secuencias (regla, fila, valor) de todos los errores, ordenadas por fila y regla"""
+
+    @abstractmethod
+    def _message_groups(self) -> Iterable[Tuple[int, int, List[int], int]]:
+        """Grupos (regla, valor, primeras filas, cantidad) en el orden de su primera fila"""
+
+    def _value_ref(self, rule: str, value) -> int:
+        """Referencia de un valor en la tabla de la regla, agregándolo si es nuevo"""
+        ids = self._value_ids[rule]
+        value_id = ids.get(value)
+        if value_id is None:
+            table = self._values[rule]
+            value_id = ids[value] = len(table)
+            table.append(value)
+        return value_id
+
+    def _values_nbytes(self) -> int:
+        """Bytes aproximados de los valores guardados"""
+        return sum(len(str(value)) for values in self._values.values() for value in values)
+
+
+class RowErrorReport(BaseErrorReport):
+    """Errores de validación registrados de a uno, en el orden de las filas.
+
+    Versión sin NumPy de ``ErrorReport`` para el procesamiento fila por fila:
+    los errores se agregan normalmente ordenados por fila y, dentro de una
+    fila, por regla, de modo que se guardan en arreglos de ``array`` sin
+    reordenar. Los que llegan fuera de orden (por ejemplo, los DNIs repetidos,
+    que se detectan al final) se reordenan al consultar el reporte.
+    """
+
+    def __init__(self, params: Dict[str, object] = None):
+        super().__init__(params)
+        self._rule_ids = array('b')
+        self._rows = array('q')
+        self._refs = array('i')
+        self._row_count = 0
+        self._sorted = True
+
+    def add(self, rule: str, row: int, value=None):
+        """Registrar un error de una fila (numerada desde 1)"""
+        rule_id = RULE_IDS[rule]
+        if self._rows and (row, rule_id) < (self._rows[-1], self._rule_ids[-1]):
+            self._sorted = False
+        if not self._rows or self._rows[-1] != row:
+            self._row_count += 1
+        self._rule_ids.append(rule_id)
+        self._rows.append(row)
+        self._refs.append(-1 if value is None else self._value_ref(rule, value))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes aproximados que ocupan los errores"""
+        arrays = (self._rule_ids, self._rows, self._refs)
+        return sum(column.itemsize * len(column) for column in arrays) + self._values_nbytes()
+
+    @property
+    def row_count(self) -> int:
+        self._columns()
+        return self._row_count
+
+    def _columns(self) -> tuple:
+        if not self._sorted:
+            errors = sorted(zip(self._rows, self._rule_ids, self._refs), key=lambda error: error[:2])
+            self._rows = array('q', (row for row, _, _ in errors))
+            self._rule_ids = array('b', (rule_id for _, rule_id, _ in errors))
+            self._refs = array('i', (ref for _, _, ref in errors))
+            self._row_count = len(set(self._rows))
+            self._sorted = True
+        return self._rule_ids, self._rows, self._refs
+
+    def _message_groups(self) -> Iterable[Tuple[int, int, List[int], int]]:
+        # Los diccionarios conservan el orden de inserción: el de la primera fila de cada mensaje
+        groups = {}
+        for rule_id, row, ref in zip(*self._columns()):
+            group = groups.get((rule_id, ref))
+            if group is None:
+                group = groups[(rule_id, ref)] = [[], 0]
+            if group[1] < SUMMARY_ROWS_PER_MESSAGE:
+                group[0].append(row)
+            group[1] += 1
+        return [(rule_id, ref, rows, count) for (rule_id, ref), (rows, count) in groups.items()]
+
+
+def summary_line(text: str, rows: List[int], count: int) -> str:
+    """Línea del resumen para un mensaje con sus primeras filas y la cantidad total"""
+    if count == 1:
+        return f"Fila {rows[0]}: {text}"
+    if count <= SUMMARY_ROWS_PER_MESSAGE:
+        return f"Filas {', '.join(map(str, rows))}: {text}"
+    return f"Filas {', '.join(map(str, rows[:3]))} y {count - 3} más: {text}"
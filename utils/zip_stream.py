@@ -0,0 +1,97 @@
+"""
+Módulo para generar archivos ZIP en streaming
+"""
+import io
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple, Union
+
+# Contenido de una entrada: bytes, ruta de un archivo o secuencia de partes
+EntrySource = Union[bytes, Path, Iterable[bytes]]
+
+# Tamaño de los bloques al copiar archivos del disco al ZIP
+COPY_BLOCK_SIZE = 64 * 1024
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Destino no posicionable que acumula lo escrito hasta que se retira"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStream:
+    """Archivo ZIP que se arma de a una entrada por vez.
+
+    Cada método retorna los bytes del ZIP producidos hasta ese momento, de
+    modo que la respuesta puede enviarse a medida que se agregan archivos sin
+    armar el ZIP completo en memoria. Como el destino no es posicionable,
+    ``zipfile`` escribe los tamaños de cada entrada después de sus datos.
+    """
+
+    def __init__(self, compression: int = zipfile.ZIP_DEFLATED):
+        self._buffer = _ChunkBuffer()
+        self._zip = zipfile.ZipFile(self._buffer, 'w', compression)
+        self._names = set()
+
+    def add(self, name: str, data: bytes) -> bytes:
+        """Agregar una entrada con contenido en memoria"""
+        self._zip.writestr(self._unique_name(name), data)
+        return self._buffer.drain()
+
+    def add_file(self, name: str, path: Union[str, Path]) -> Iterator[bytes]:
+        """Agregar una entrada copiando un archivo del disco por bloques"""
+        with open(path, 'rb') as source:
+            yield from self.add_parts(name, iter(lambda: source.read(COPY_BLOCK_SIZE), b''))
+
+    def add_parts(self, name: str, parts: Iterable[bytes]) -> Iterator[bytes]:
+        """Agregar una entrada cuyo contenido se genera por partes"""
+        with self._zip.open(self._unique_name(name), 'w') as target:
+            for part in parts:
+                target.write(part)
+                data = self._buffer.drain()
+                if data:
+                    yield data
+        yield self._buffer.drain()
+
+    def close(self) -> bytes:
+        """Escribir el directorio central y retornar los últimos bytes"""
+        self._zip.close()
+        return self._buffer.drain()
+
+    def _unique_name(self, name: str) -> str:
+        """Evitar entradas repetidas agregando un sufijo numérico"""
+        candidate = name
+        stem, dot, suffix = name.rpartition('.')
+        counter = 2
+        while candidate in self._names:
+            candidate = f"{stem}_{counter}.{suffix}" if dot else f"{name}_{counter}"
+            counter += 1
+        self._names.add(candidate)
+        return candidate
+
+
+def stream_zip(entries: Iterable[Tuple[str, EntrySource]]) -> Iterator[bytes]:
+    """Generar un ZIP por partes a partir de pares (nombre, bytes, ruta de archivo o partes)"""
+    archive = ZipStream()
+    for name, source in entries:
+        if isinstance(source, (bytes, bytearray)):
+            yield archive.add(name, source)
+        elif isinstance(source, (str, Path)):
+            yield from archive.add_file(name, source)
+        else:
+            yield from archive.add_parts(name, source)
+    yield archive.close()